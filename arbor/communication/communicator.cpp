@@ -1,3 +1,4 @@
+#include <algorithm>
 #include <utility>
 #include <vector>
 
@@ -121,13 +122,28 @@ communicator::communicator(const recipe& rec,
             dom_dec.groups,
             [](const group_description& g){return g.gids.size();}));
 
-    // Sort the connections for each domain.
+    // Sort the connections for each domain by source, and the connections
+    // from each source by the local index of their target.
     // This is num_domains_ independent sorts, so it can be parallelized trivially.
     const auto& cp = connection_part_;
     threading::parallel_for::apply(0, num_domains_, thread_pool_.get(),
         [&](cell_size_type i) {
-            util::sort(util::subrange_view(connections_, cp[i], cp[i+1]));
+            util::sort_by(util::subrange_view(connections_, cp[i], cp[i+1]),
+                [](const connection& c) { return std::make_pair(c.source(), c.index_on_domain()); });
         });
+
+    // Build the index from source to connections. Each source lives on one
+    // domain, so after sorting the connections from each source are contiguous.
+    source_divisions_.clear();
+    source_index_.clear();
+    for (auto i: util::make_span(n_cons)) {
+        auto src = connections_[i].source();
+        if (source_divisions_.empty() || connections_[i-1].source()!=src) {
+            source_index_[src] = source_divisions_.size();
+            source_divisions_.push_back(i);
+        }
+    }
+    source_divisions_.push_back(n_cons);
 }
 
 std::pair<cell_size_type, cell_size_type> communicator::group_queue_range(cell_size_type i) {
@@ -145,82 +161,197 @@ time_type communicator::min_delay() {
 }
 
 gathered_vector<spike> communicator::exchange(std::vector<spike> local_spikes) {
+    auto pending = start_exchange(std::move(local_spikes));
+    return complete_exchange(pending);
+}
+
+spike_gather_handle communicator::start_exchange(std::vector<spike> local_spikes) {
     PE(communication_exchange_sort);
-    // sort the spikes in ascending order of source gid
-    util::sort_by(local_spikes, [](spike s){return s.source;});
+    // sort the spikes in ascending order of source gid; spikes gathered from
+    // the thread private spike stores are already sorted.
+    auto by_source = [](const spike& a, const spike& b) { return a.source<b.source; };
+    if (!std::is_sorted(local_spikes.begin(), local_spikes.end(), by_source)) {
+        util::sort_by(local_spikes, [](spike s){return s.source;});
+    }
     PL();
 
+    if (exchange_kind_==spike_exchange_kind::sparse) {
+        return std::make_unique<completed_spike_gather>(exchange_sparse(local_spikes));
+    }
+
     PE(communication_exchange_gather);
     // global all-to-all to gather a local copy of the global spike list on each node.
-    auto global_spikes = distributed_->gather_spikes(local_spikes);
-    num_spikes_ += global_spikes.size();
+    auto pending = distributed_->start_gather_spikes(std::move(local_spikes));
+    PL();
+
+    return pending;
+}
+
+gathered_vector<spike> communicator::complete_exchange(spike_gather_handle& pending) {
+    PE(communication_exchange_gather);
+    auto global_spikes = pending->wait();
+    pending.reset();
+    // The sparse exchange counts the spikes when it is performed.
+    if (exchange_kind_==spike_exchange_kind::dense) {
+        num_spikes_ += global_spikes.size();
+    }
     PL();
 
     return global_spikes;
 }
 
-void communicator::make_event_queues(
-        const gathered_vector<spike>& global_spikes,
-        std::vector<pse_vector>& queues)
-{
-    arb_assert(queues.size()==num_local_cells_);
+void communicator::set_exchange_kind(spike_exchange_kind kind) {
+    exchange_kind_ = kind;
+    if (kind==spike_exchange_kind::sparse && !has_routes_) {
+        make_routes();
+    }
+}
 
-    using util::subrange_view;
-    using util::make_span;
-    using util::make_range;
+void communicator::make_routes() {
+    using count_type = gathered_vector<cell_gid_type>::count_type;
 
-    const auto& sp = global_spikes.partition();
+    // The distinct source gids of the local connections, partitioned by the
+    // domain of the source. The connections in each domain are sorted by
+    // source, so the gids in each partition are sorted too.
+    std::vector<cell_gid_type> requests;
+    std::vector<count_type> request_part = {0u};
     const auto& cp = connection_part_;
-    for (auto dom: make_span(num_domains_)) {
-        auto cons = subrange_view(connections_, cp[dom], cp[dom+1]);
-        auto spks = subrange_view(global_spikes.values(), sp[dom], sp[dom+1]);
-
-        struct spike_pred {
-            bool operator()(const spike& spk, const cell_member_type& src)
-                {return spk.source<src;}
-            bool operator()(const cell_member_type& src, const spike& spk)
-                {return src<spk.source;}
-        };
-
-        // We have a choice of whether to walk spikes or connections:
-        // i.e., we can iterate over the spikes, and for each spike search
-        // the for connections that have the same source; or alternatively
-        // for each connection, we can search the list of spikes for spikes
-        // with the same source.
-        //
-        // We iterate over whichever set is the smallest, which has
-        // complexity of order max(S log(C), C log(S)), where S is the
-        // number of spikes, and C is the number of connections.
-        if (cons.size()<spks.size()) {
-            auto sp = spks.begin();
-            auto cn = cons.begin();
-            while (cn!=cons.end() && sp!=spks.end()) {
-                auto sources = std::equal_range(sp, spks.end(), cn->source(), spike_pred());
-                for (auto s: make_range(sources)) {
-                    queues[cn->index_on_domain()].push_back(cn->make_event(s));
-                }
+    for (auto dom: util::make_span(num_domains_)) {
+        for (auto i: util::make_span(cp[dom], cp[dom+1])) {
+            auto gid = connections_[i].source().gid;
+            if (requests.size()==request_part.back() || requests.back()!=gid) {
+                requests.push_back(gid);
+            }
+        }
+        request_part.push_back(requests.size());
+    }
 
-                sp = sources.first;
-                ++cn;
+    // Send each domain the list of its source gids that we need, which in
+    // turn tells us which of our source gids are needed by each domain.
+    auto needed = distributed_->all_to_all_gids(requests, request_part);
+
+    std::vector<std::pair<cell_gid_type, unsigned>> routes;
+    routes.reserve(needed.size());
+    const auto& np = needed.partition();
+    for (auto dom: util::make_span(num_domains_)) {
+        for (auto i: util::make_span(np[dom], np[dom+1])) {
+            routes.emplace_back(needed.values()[i], dom);
+        }
+    }
+    util::sort(routes);
+
+    route_gids_.clear();
+    route_ranks_.clear();
+    route_divisions_ = {0u};
+    for (auto& r: routes) {
+        if (route_gids_.empty() || route_gids_.back()!=r.first) {
+            if (!route_gids_.empty()) {
+                route_divisions_.push_back(route_ranks_.size());
             }
+            route_gids_.push_back(r.first);
         }
-        else {
-            auto cn = cons.begin();
-            auto sp = spks.begin();
-            while (cn!=cons.end() && sp!=spks.end()) {
-                auto targets = std::equal_range(cn, cons.end(), sp->source);
-                for (auto c: make_range(targets)) {
-                    queues[c.index_on_domain()].push_back(c.make_event(*sp));
-                }
+        route_ranks_.push_back(r.second);
+    }
+    if (!route_gids_.empty()) {
+        route_divisions_.push_back(route_ranks_.size());
+    }
+    has_routes_ = true;
+}
 
-                cn = targets.first;
-                ++sp;
+gathered_vector<spike> communicator::exchange_sparse(const std::vector<spike>& local_spikes) {
+    using count_type = gathered_vector<spike>::count_type;
+
+    PE(communication_exchange_route);
+    // Walk the sorted spikes and the sorted routing table together. First
+    // count the spikes to send to each domain, then fill the send buffer, so
+    // that the spikes for each domain are contiguous and remain sorted.
+    auto for_each_route = [&](auto&& f) {
+        auto r = route_gids_.begin();
+        for (auto& spk: local_spikes) {
+            r = std::lower_bound(r, route_gids_.end(), spk.source.gid);
+            if (r==route_gids_.end()) break;
+            if (*r!=spk.source.gid) continue;
+            auto i = r-route_gids_.begin();
+            for (auto k: util::make_span(route_divisions_[i], route_divisions_[i+1])) {
+                f(spk, route_ranks_[k]);
             }
         }
+    };
+
+    std::vector<count_type> counts(num_domains_);
+    for_each_route([&](const spike&, unsigned dom) { ++counts[dom]; });
+
+    auto send_part = algorithms::make_index(counts);
+    std::vector<spike> send(send_part.back());
+    auto offsets = send_part;
+    for_each_route([&](const spike& spk, unsigned dom) { send[offsets[dom]++] = spk; });
+    PL();
+
+    PE(communication_exchange_gather);
+    auto spikes = distributed_->all_to_all_spikes(send, send_part);
+    num_sparse_local_spikes_ += local_spikes.size();
+    has_sparse_spikes_ = true;
+    PL();
+
+    return spikes;
+}
+
+void communicator::make_event_queues(
+        const gathered_vector<spike>& global_spikes,
+        std::vector<pse_vector>& queues)
+{
+    arb_assert(queues.size()==num_local_cells_);
+
+    // Look up the connections from the source of each spike, so that the
+    // cost per spike is proportional to its fan-out on this domain.
+    PE(communication_walkspikes);
+    std::vector<std::pair<const spike*, cell_size_type>> sources;
+    for (const auto& spk: global_spikes.values()) {
+        auto it = source_index_.find(spk.source);
+        if (it!=source_index_.end()) {
+            sources.emplace_back(&spk, it->second);
+        }
     }
+    PL();
+
+    // Generate the events in parallel over blocks of cell groups. The task
+    // for a block only writes to the queues of the cells in that block, and
+    // visits the spikes in order, so the result does not depend on the
+    // blocking. The connections from each source are sorted by local target
+    // index, so the connections into a block are found by binary search.
+    // Profiler regions are entered inside the tasks, because waiting on the
+    // tasks may run other tasks on this thread.
+    const auto& div = source_divisions_;
+    const cell_size_type num_blocks =
+        std::min<cell_size_type>(num_local_groups_, 4*thread_pool_->get_num_threads());
+    threading::parallel_for::apply(0, num_blocks, thread_pool_.get(),
+        [&](cell_size_type b) {
+            auto first_group = std::size_t(b)*num_local_groups_/num_blocks;
+            auto last_group = std::size_t(b+1)*num_local_groups_/num_blocks;
+            if (first_group==last_group) return;
+
+            PE(communication_walkspikes);
+            auto lo = index_part_[first_group].first;
+            auto hi = index_part_[last_group-1].second;
+            auto by_index = [](const connection& c, cell_size_type i) { return c.index_on_domain()<i; };
+
+            for (const auto& [spk, k]: sources) {
+                auto cons = util::subrange_view(connections_, div[k], div[k+1]);
+                auto c = std::lower_bound(cons.begin(), cons.end(), lo, by_index);
+                for (; c!=cons.end() && c->index_on_domain()<hi; ++c) {
+                    queues[c->index_on_domain()].push_back(c->make_event(*spk));
+                }
+            }
+            PL();
+        });
 }
 
 std::uint64_t communicator::num_spikes() const {
+    // The spikes sent by the sparse exchange are only counted locally, and
+    // summed over the ranks on request rather than in every epoch.
+    if (has_sparse_spikes_) {
+        return num_spikes_ + distributed_->sum(num_sparse_local_spikes_);
+    }
     return num_spikes_;
 }
 
@@ -234,6 +365,8 @@ const std::vector<connection>& communicator::connections() const {
 
 void communicator::reset() {
     num_spikes_ = 0;
+    num_sparse_local_spikes_ = 0;
+    has_sparse_spikes_ = false;
 }
 
 } // namespace arb
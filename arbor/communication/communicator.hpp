@@ -1,5 +1,6 @@
 #pragma once
 
+#include <unordered_map>
 #include <vector>
 
 #include <arbor/common_types.hpp>
@@ -9,6 +10,7 @@
 
 #include "communication/gathered_vector.hpp"
 #include "connection.hpp"
+#include "distributed_context.hpp"
 #include "execution_context.hpp"
 #include "util/partition.hpp"
 
@@ -45,6 +47,19 @@ public:
     /// Returns the full global set of vectors, along with meta data about their partition
     gathered_vector<spike> exchange(std::vector<spike> local_spikes);
 
+    /// Start a non-blocking exchange of spikes.
+    ///
+    /// The exchange is completed by passing the returned handle to
+    /// complete_exchange. Exchanges must be completed in the order in which
+    /// they were started, and the exchange kind must not be changed while
+    /// exchanges are pending. The sparse exchange is not asynchronous: it is
+    /// completed before start_exchange returns.
+    spike_gather_handle start_exchange(std::vector<spike> local_spikes);
+
+    /// Complete an exchange started by start_exchange, and return the result
+    /// as for exchange.
+    gathered_vector<spike> complete_exchange(spike_gather_handle& pending);
+
     /// Check each global spike in turn to see it generates local events.
     /// If so, make the events and insert them into the appropriate event list.
     ///
@@ -57,7 +72,19 @@ public:
             const gathered_vector<spike>& global_spikes,
             std::vector<pse_vector>& queues);
 
-    /// Returns the total number of global spikes over the duration of the simulation
+    /// Select how spikes are exchanged between ranks.
+    ///
+    /// With spike_exchange_kind::sparse, exchange() only sends each spike to
+    /// the ranks that have connections from its source, and returns only the
+    /// spikes that are relevant to this rank. Selecting the sparse mode builds
+    /// the routing tables on first use, which is a collective operation: it
+    /// must be called with the same policy on all ranks.
+    void set_exchange_kind(spike_exchange_kind kind);
+
+    spike_exchange_kind exchange_kind() const { return exchange_kind_; }
+
+    /// Returns the total number of global spikes over the duration of the simulation.
+    /// If the sparse exchange has been used, this is a collective operation.
     std::uint64_t num_spikes() const;
 
     cell_size_type num_local_cells() const;
@@ -75,9 +102,34 @@ private:
     std::vector<cell_size_type> index_divisions_;
     util::partition_view_type<std::vector<cell_size_type>> index_part_;
 
+    // Index from spike source to the connections from that source: the
+    // connections are grouped by source, with source_divisions_ partitioning
+    // connections_ into these groups, and source_index_ mapping each source
+    // to its group.
+    std::vector<cell_size_type> source_divisions_;
+    std::unordered_map<cell_member_type, cell_size_type> source_index_;
+
     distributed_context_handle distributed_;
     task_system_handle thread_pool_;
     std::uint64_t num_spikes_ = 0u;
+
+    // Number of local spikes sent by the sparse exchange, and whether it has
+    // been used since the last reset.
+    std::uint64_t num_sparse_local_spikes_ = 0u;
+    bool has_sparse_spikes_ = false;
+
+    spike_exchange_kind exchange_kind_ = spike_exchange_kind::dense;
+
+    // Routing tables for the sparse spike exchange: the local source gids
+    // that are connected to other ranks, in ascending order, and for each of
+    // them the list of destination ranks, stored as a partition.
+    bool has_routes_ = false;
+    std::vector<cell_gid_type> route_gids_;
+    std::vector<cell_size_type> route_divisions_;
+    std::vector<unsigned> route_ranks_;
+
+    void make_routes();
+    gathered_vector<spike> exchange_sparse(const std::vector<spike>& local_spikes);
 };
 
 } // namespace arb
@@ -4,6 +4,7 @@
 
 #include <arbor/spike.hpp>
 
+#include "communication/spike_encoding.hpp"
 #include <distributed_context.hpp>
 #include <threading/threading.hpp>
 
@@ -15,9 +16,19 @@ struct dry_run_context_impl {
         num_ranks_(num_ranks), num_cells_per_tile_(num_cells_per_tile) {};
 
     gathered_vector<arb::spike>
-    gather_spikes(const std::vector<arb::spike>& local_spikes) const {
+    gather_spikes(const std::vector<arb::spike>& spikes) const {
         using count_type = typename gathered_vector<arb::spike>::count_type;
 
+        // Pass the spikes through the compact encoding, so that the dry run
+        // sees the same rounding of spike times as a distributed run.
+        std::vector<arb::spike> decoded;
+        if (encoding_==spike_encoding_kind::compact) {
+            std::vector<char> buf;
+            encode_spikes(spikes, buf);
+            decode_spikes(buf.data(), buf.data()+buf.size(), decoded);
+        }
+        const auto& local_spikes = encoding_==spike_encoding_kind::compact? decoded: spikes;
+
         count_type local_size = local_spikes.size();
 
         std::vector<arb::spike> gathered_spikes;
@@ -41,6 +52,11 @@ struct dry_run_context_impl {
         return gathered_vector<arb::spike>(std::move(gathered_spikes), std::move(partition));
     }
 
+    spike_gather_handle
+    start_gather_spikes(std::vector<arb::spike> local_spikes) const {
+        return std::make_unique<completed_spike_gather>(gather_spikes(local_spikes));
+    }
+
     gathered_vector<cell_gid_type>
     gather_gids(const std::vector<cell_gid_type>& local_gids) const {
         using count_type = typename gathered_vector<cell_gid_type>::count_type;
@@ -68,6 +84,71 @@ struct dry_run_context_impl {
         return gathered_vector<cell_gid_type>(std::move(gathered_gids), std::move(partition));
     }
 
+    // Rank 0 receives from rank j what rank j sends to rank 0. Every rank is
+    // a copy of rank 0 shifted by j tiles, so this is what rank 0 sends to
+    // rank (n-j)%n, shifted by j tiles with periodic wrap-around.
+    template <typename T, typename Shift>
+    gathered_vector<T>
+    all_to_all(const std::vector<T>& values,
+               const std::vector<typename gathered_vector<T>::count_type>& partition,
+               Shift&& shift) const
+    {
+        using count_type = typename gathered_vector<T>::count_type;
+
+        const count_type n = num_ranks_;
+        const cell_gid_type num_cells = num_cells_per_tile_*num_ranks_;
+
+        std::vector<T> received;
+        std::vector<count_type> received_partition = {0u};
+        for (count_type j = 0; j < n; j++) {
+            auto src = (n-j)%n;
+            for (auto k = partition[src]; k < partition[src+1]; k++) {
+                received.push_back(values[k]);
+                auto& gid = shift(received.back());
+                gid = (gid + num_cells_per_tile_*j)%num_cells;
+            }
+            received_partition.push_back(static_cast<count_type>(received.size()));
+        }
+
+        return gathered_vector<T>(std::move(received), std::move(received_partition));
+    }
+
+    // Values that do not refer to gids are exchanged without shifting.
+    template <typename T>
+    gathered_vector<T>
+    all_to_all(const std::vector<T>& values,
+               const std::vector<typename gathered_vector<T>::count_type>& partition) const
+    {
+        using count_type = typename gathered_vector<T>::count_type;
+
+        const count_type n = num_ranks_;
+        std::vector<T> received;
+        std::vector<count_type> received_partition = {0u};
+        for (count_type j = 0; j < n; j++) {
+            auto src = (n-j)%n;
+            received.insert(received.end(), values.begin()+partition[src], values.begin()+partition[src+1]);
+            received_partition.push_back(static_cast<count_type>(received.size()));
+        }
+
+        return gathered_vector<T>(std::move(received), std::move(received_partition));
+    }
+
+    gathered_vector<arb::spike>
+    all_to_all_spikes(const std::vector<arb::spike>& values,
+                      const std::vector<gathered_vector<arb::spike>::count_type>& partition) const {
+        return all_to_all(values, partition, [](arb::spike& s) -> cell_gid_type& { return s.source.gid; });
+    }
+
+    gathered_vector<cell_gid_type>
+    all_to_all_gids(const std::vector<cell_gid_type>& values,
+                    const std::vector<gathered_vector<cell_gid_type>::count_type>& partition) const {
+        return all_to_all(values, partition, [](cell_gid_type& g) -> cell_gid_type& { return g; });
+    }
+
+    void set_spike_encoding(spike_encoding_kind kind) { encoding_ = kind; }
+
+    spike_encoding_kind spike_encoding() const { return encoding_; }
+
     int id() const { return 0; }
 
     int size() const { return num_ranks_; }
@@ -86,12 +167,31 @@ struct dry_run_context_impl {
         return std::vector<T>(num_ranks_, value);
     }
 
+    template <typename T>
+    std::vector<T> gather_all(T value) const {
+        return std::vector<T>(num_ranks_, value);
+    }
+
+    template <typename T>
+    gathered_vector<T> gather_all(const std::vector<T>& values) const {
+        using count_type = typename gathered_vector<T>::count_type;
+
+        std::vector<T> gathered;
+        std::vector<count_type> partition = {0u};
+        for (unsigned i = 0; i < num_ranks_; i++) {
+            gathered.insert(gathered.end(), values.begin(), values.end());
+            partition.push_back(static_cast<count_type>(gathered.size()));
+        }
+        return gathered_vector<T>(std::move(gathered), std::move(partition));
+    }
+
     void barrier() const {}
 
     std::string name() const { return "dryrun"; }
 
     unsigned num_ranks_;
     unsigned num_cells_per_tile_;
+    spike_encoding_kind encoding_ = spike_encoding_kind::plain;
 };
 
 std::shared_ptr<distributed_context> make_dry_run_context(unsigned num_ranks, unsigned num_cells_per_tile) {
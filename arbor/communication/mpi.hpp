@@ -178,6 +178,167 @@ gathered_vector<T> gather_all_with_partition(const std::vector<T>& values, MPI_C
     );
 }
 
+/// Non-blocking gather_all_with_partition.
+///
+/// The counts are gathered with MPI_Iallgather, and once they are known the
+/// values are gathered with MPI_Iallgatherv. Progress from the first stage to
+/// the second is made in test() and wait(), so test() should be called
+/// periodically while other work is done.
+///
+/// MPI holds pointers into the request, so it can be neither copied nor moved.
+template <typename T>
+class gather_all_request {
+public:
+    gather_all_request(std::vector<T> values, MPI_Comm comm):
+        comm_(comm),
+        values_(std::move(values)),
+        count_(int(values_.size()*traits::count())),
+        counts_(size(comm))
+    {
+        MPI_OR_THROW(MPI_Iallgather,
+                &count_, 1, MPI_INT,
+                counts_.data(), 1, MPI_INT,
+                comm_, &request_);
+    }
+
+    gather_all_request(const gather_all_request&) = delete;
+    gather_all_request& operator=(const gather_all_request&) = delete;
+
+    // The other ranks can only complete the second stage once this rank has
+    // posted its part of it, so a request that is destroyed before it is
+    // complete, e.g. while unwinding after an exception, is still driven to
+    // completion. Otherwise the other ranks would wait forever. The buffers
+    // must also outlive the request. Errors can not be reported from here.
+    ~gather_all_request() {
+        if (stage_==stage::counts) {
+            if (MPI_Wait(&request_, MPI_STATUS_IGNORE)!=MPI_SUCCESS) return;
+            if (start_values()!=MPI_SUCCESS) return;
+        }
+        if (stage_==stage::values) {
+            MPI_Wait(&request_, MPI_STATUS_IGNORE);
+        }
+    }
+
+    // Make progress without blocking. Returns true if the gather is complete.
+    bool test() {
+        return progress(false);
+    }
+
+    // Block until the gather is complete, and return the result.
+    gathered_vector<T> wait() {
+        using count_type = typename gathered_vector<T>::count_type;
+
+        progress(true);
+        for (auto& d: displs_) {
+            d /= traits::count();
+        }
+        return gathered_vector<T>(
+            std::move(buffer_),
+            std::vector<count_type>(displs_.begin(), displs_.end()));
+    }
+
+private:
+    using traits = mpi_traits<T>;
+    enum class stage {counts, values, complete};
+
+    MPI_Comm comm_;
+    std::vector<T> values_;
+    int count_;
+    std::vector<int> counts_;
+    std::vector<int> displs_;
+    std::vector<T> buffer_;
+    MPI_Request request_ = MPI_REQUEST_NULL;
+    stage stage_ = stage::counts;
+
+    // Post the second stage, once the counts are known. Returns the MPI error code.
+    int start_values() noexcept {
+        try {
+            displs_ = algorithms::make_index(counts_);
+            buffer_.resize(displs_.back()/traits::count());
+        }
+        catch (...) {
+            stage_ = stage::complete;
+            return MPI_ERR_NO_MEM;
+        }
+        int r = MPI_Iallgatherv(
+                values_.data(), count_, traits::mpi_type(),
+                buffer_.data(), counts_.data(), displs_.data(), traits::mpi_type(),
+                comm_, &request_);
+        // Nothing is in flight if the second stage could not be posted.
+        stage_ = r==MPI_SUCCESS? stage::values: stage::complete;
+        return r;
+    }
+
+    bool progress(bool block) {
+        while (stage_!=stage::complete) {
+            int flag = 1;
+            if (block) {
+                MPI_OR_THROW(MPI_Wait, &request_, MPI_STATUS_IGNORE);
+            }
+            else {
+                MPI_OR_THROW(MPI_Test, &request_, &flag, MPI_STATUS_IGNORE);
+            }
+            if (!flag) return false;
+
+            if (stage_==stage::counts) {
+                if (int r = start_values()) throw mpi_error(r, "MPI_Iallgatherv");
+            }
+            else {
+                stage_ = stage::complete;
+            }
+        }
+        return true;
+    }
+};
+
+/// Personalised all-to-all exchange of a vector.
+/// The values in [partition[i], partition[i+1]) are sent to rank i, and the
+/// values received are returned partitioned by the rank that sent them.
+template <typename T>
+gathered_vector<T> all_to_all_with_partition(
+        const std::vector<T>& values,
+        const std::vector<typename gathered_vector<T>::count_type>& partition,
+        MPI_Comm comm)
+{
+    using gathered_type = gathered_vector<T>;
+    using count_type = typename gathered_vector<T>::count_type;
+    using traits = mpi_traits<T>;
+
+    const auto nranks = size(comm);
+    arb_assert(partition.size()==std::size_t(nranks)+1);
+
+    // As for gather_all_with_partition, counts and displacements have to be int.
+    std::vector<int> send_counts(nranks), send_displs(nranks);
+    for (int i=0; i<nranks; ++i) {
+        send_counts[i] = int(partition[i+1]-partition[i])*traits::count();
+        send_displs[i] = int(partition[i])*traits::count();
+    }
+
+    std::vector<int> recv_counts(nranks);
+    MPI_OR_THROW(MPI_Alltoall,
+            send_counts.data(), 1, MPI_INT,
+            recv_counts.data(), 1, MPI_INT,
+            comm);
+    auto recv_displs = algorithms::make_index(recv_counts);
+
+    std::vector<T> buffer(recv_displs.back()/traits::count());
+
+    MPI_OR_THROW(MPI_Alltoallv,
+            // const_cast required for MPI implementations that don't use const* in their interfaces
+            const_cast<T*>(values.data()), send_counts.data(), send_displs.data(), traits::mpi_type(), // send buffer
+            buffer.data(), recv_counts.data(), recv_displs.data(), traits::mpi_type(), // receive buffer
+            comm);
+
+    for (auto& d : recv_displs) {
+        d /= traits::count();
+    }
+
+    return gathered_type(
+        std::move(buffer),
+        std::vector<count_type>(recv_displs.begin(), recv_displs.end())
+    );
+}
+
 template <typename T>
 T reduce(T value, MPI_Op op, int root, MPI_Comm comm) {
     using traits = mpi_traits<T>;
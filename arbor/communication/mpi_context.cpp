@@ -13,15 +13,61 @@
 #include <arbor/spike.hpp>
 
 #include "communication/mpi.hpp"
+#include "communication/spike_encoding.hpp"
 #include "distributed_context.hpp"
 
 namespace arb {
 
+namespace {
+gathered_vector<arb::spike> decode_gathered_spikes(const gathered_vector<char>& encoded) {
+    using count_type = typename gathered_vector<arb::spike>::count_type;
+
+    std::vector<arb::spike> spikes;
+    std::vector<count_type> partition = {0u};
+    const char* data = encoded.values().data();
+    const auto& part = encoded.partition();
+    for (std::size_t i = 0; i+1<part.size(); ++i) {
+        decode_spikes(data+part[i], data+part[i+1], spikes);
+        partition.push_back(spikes.size());
+    }
+    return gathered_vector<arb::spike>(std::move(spikes), std::move(partition));
+}
+
+struct mpi_spike_gather: spike_gather_request {
+    mpi_spike_gather(std::vector<arb::spike> spikes, MPI_Comm comm):
+        request(std::move(spikes), comm)
+    {}
+
+    bool test() override { return request.test(); }
+    gathered_vector<arb::spike> wait() override { return request.wait(); }
+
+    mpi::gather_all_request<arb::spike> request;
+};
+
+struct mpi_compact_spike_gather: spike_gather_request {
+    mpi_compact_spike_gather(const std::vector<arb::spike>& spikes, MPI_Comm comm):
+        request(encode(spikes), comm)
+    {}
+
+    bool test() override { return request.test(); }
+    gathered_vector<arb::spike> wait() override { return decode_gathered_spikes(request.wait()); }
+
+    static std::vector<char> encode(const std::vector<arb::spike>& spikes) {
+        std::vector<char> buf;
+        encode_spikes(spikes, buf);
+        return buf;
+    }
+
+    mpi::gather_all_request<char> request;
+};
+} // anonymous namespace
+
 // Throws arb::mpi::mpi_error if MPI calls fail.
 struct mpi_context_impl {
     int size_;
     int rank_;
     MPI_Comm comm_;
+    spike_encoding_kind encoding_ = spike_encoding_kind::plain;
 
     explicit mpi_context_impl(MPI_Comm comm): comm_(comm) {
         size_ = mpi::size(comm_);
@@ -30,14 +76,49 @@ struct mpi_context_impl {
 
     gathered_vector<arb::spike>
     gather_spikes(const std::vector<arb::spike>& local_spikes) const {
+        if (encoding_==spike_encoding_kind::compact) {
+            return gather_compact_spikes(local_spikes);
+        }
         return mpi::gather_all_with_partition(local_spikes, comm_);
     }
 
+    // Gather the encoded spikes from each rank, and decode them.
+    gathered_vector<arb::spike>
+    gather_compact_spikes(const std::vector<arb::spike>& local_spikes) const {
+        std::vector<char> buf;
+        encode_spikes(local_spikes, buf);
+        return decode_gathered_spikes(mpi::gather_all_with_partition(buf, comm_));
+    }
+
+    spike_gather_handle
+    start_gather_spikes(std::vector<arb::spike> local_spikes) const {
+        if (encoding_==spike_encoding_kind::compact) {
+            return std::make_unique<mpi_compact_spike_gather>(local_spikes, comm_);
+        }
+        return std::make_unique<mpi_spike_gather>(std::move(local_spikes), comm_);
+    }
+
+    void set_spike_encoding(spike_encoding_kind kind) { encoding_ = kind; }
+
+    spike_encoding_kind spike_encoding() const { return encoding_; }
+
     gathered_vector<cell_gid_type>
     gather_gids(const std::vector<cell_gid_type>& local_gids) const {
         return mpi::gather_all_with_partition(local_gids, comm_);
     }
 
+    gathered_vector<arb::spike>
+    all_to_all_spikes(const std::vector<arb::spike>& values,
+                      const std::vector<gathered_vector<arb::spike>::count_type>& partition) const {
+        return mpi::all_to_all_with_partition(values, partition, comm_);
+    }
+
+    gathered_vector<cell_gid_type>
+    all_to_all_gids(const std::vector<cell_gid_type>& values,
+                    const std::vector<gathered_vector<cell_gid_type>::count_type>& partition) const {
+        return mpi::all_to_all_with_partition(values, partition, comm_);
+    }
+
     std::string name() const { return "MPI"; }
     int id() const { return rank_; }
     int size() const { return size_; }
@@ -62,6 +143,22 @@ struct mpi_context_impl {
         return mpi::gather(value, root, comm_);
     }
 
+    template <typename T>
+    std::vector<T> gather_all(T value) const {
+        return mpi::gather_all(value, comm_);
+    }
+
+    template <typename T>
+    gathered_vector<T> gather_all(const std::vector<T>& values) const {
+        return mpi::gather_all_with_partition(values, comm_);
+    }
+
+    template <typename T>
+    gathered_vector<T> all_to_all(const std::vector<T>& values,
+                                  const std::vector<typename gathered_vector<T>::count_type>& partition) const {
+        return mpi::all_to_all_with_partition(values, partition, comm_);
+    }
+
     void barrier() const {
         mpi::barrier(comm_);
     }
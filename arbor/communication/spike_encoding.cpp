@@ -0,0 +1,97 @@
+#include <algorithm>
+#include <cstddef>
+#include <cstdint>
+#include <cstring>
+#include <vector>
+
+#include <arbor/arbexcept.hpp>
+#include <arbor/spike.hpp>
+
+#include "communication/spike_encoding.hpp"
+
+namespace arb {
+
+namespace {
+void put_varint(std::uint64_t v, std::vector<char>& buf) {
+    while (v>=0x80) {
+        buf.push_back(char((v&0x7f)|0x80));
+        v >>= 7;
+    }
+    buf.push_back(char(v));
+}
+
+template <typename T>
+void put_raw(T v, std::vector<char>& buf) {
+    char bytes[sizeof(T)];
+    std::memcpy(bytes, &v, sizeof(T));
+    buf.insert(buf.end(), bytes, bytes+sizeof(T));
+}
+
+std::uint64_t get_varint(const char*& p, const char* end) {
+    std::uint64_t v = 0;
+    for (unsigned shift = 0; shift<64; shift += 7) {
+        if (p==end) break;
+        auto byte = static_cast<unsigned char>(*p++);
+        v |= std::uint64_t(byte&0x7f)<<shift;
+        if (!(byte&0x80)) return v;
+    }
+    throw arbor_internal_error("decode_spikes: malformed spike encoding");
+}
+
+template <typename T>
+T get_raw(const char*& p, const char* end) {
+    if (end-p<std::ptrdiff_t(sizeof(T))) {
+        throw arbor_internal_error("decode_spikes: truncated spike encoding");
+    }
+    T v;
+    std::memcpy(&v, p, sizeof(T));
+    p += sizeof(T);
+    return v;
+}
+
+std::uint64_t zigzag(std::int64_t v) {
+    return (std::uint64_t(v)<<1)^std::uint64_t(v>>63);
+}
+
+std::int64_t unzigzag(std::uint64_t v) {
+    return std::int64_t(v>>1)^-std::int64_t(v&1);
+}
+} // anonymous namespace
+
+void encode_spikes(const std::vector<spike>& spikes, std::vector<char>& buf) {
+    put_varint(spikes.size(), buf);
+    if (spikes.empty()) return;
+
+    time_type t0 = spikes.front().time;
+    for (auto& s: spikes) {
+        t0 = std::min(t0, s.time);
+    }
+    put_raw<double>(t0, buf);
+
+    std::int64_t prev = 0;
+    for (auto& s: spikes) {
+        put_varint(zigzag(std::int64_t(s.source.gid)-prev), buf);
+        put_varint(s.source.index, buf);
+        put_raw<float>(float(s.time-t0), buf);
+        prev = s.source.gid;
+    }
+}
+
+const char* decode_spikes(const char* begin, const char* end, std::vector<spike>& out) {
+    const char* p = begin;
+    auto n = get_varint(p, end);
+    if (!n) return p;
+
+    auto t0 = get_raw<double>(p, end);
+    std::int64_t prev = 0;
+    out.reserve(out.size()+n);
+    for (std::uint64_t i = 0; i<n; ++i) {
+        prev += unzigzag(get_varint(p, end));
+        auto index = get_varint(p, end);
+        auto dt = get_raw<float>(p, end);
+        out.push_back(spike({cell_gid_type(prev), cell_lid_type(index)}, t0+dt));
+    }
+    return p;
+}
+
+} // namespace arb
@@ -0,0 +1,38 @@
+#pragma once
+
+#include <vector>
+
+#include <arbor/spike.hpp>
+
+// Compact encoding of spikes for exchange between ranks.
+//
+// A block of n spikes is encoded as
+//
+//     varint n                  number of spikes
+//     float64 t0                earliest spike time in the block (if n>0)
+//
+// followed by, for each spike,
+//
+//     varint d                  zigzag encoded difference from the previous gid
+//     varint index              source index
+//     float32 dt                spike time relative to t0
+//
+// Varints use seven bits per byte, least significant group first. Spikes
+// sorted by source gid have small gid differences, and the spike times in one
+// exchange span at most half the minimum network delay, so most spikes take
+// 6 or 7 bytes, against 16 bytes for arb::spike.
+//
+// The encoding of the spike times is lossy: times are rounded to single
+// precision relative to t0.
+
+namespace arb {
+
+// Append the encoding of spikes to buf.
+void encode_spikes(const std::vector<spike>& spikes, std::vector<char>& buf);
+
+// Decode a block of spikes from [begin, end), appending to out. Returns a
+// pointer to the end of the block. Throws arb::arbor_internal_error if the
+// block is malformed.
+const char* decode_spikes(const char* begin, const char* end, std::vector<spike>& out);
+
+} // namespace arb
@@ -3,6 +3,7 @@
 #include <memory>
 #include <string>
 
+#include <arbor/context.hpp>
 #include <arbor/spike.hpp>
 #include <arbor/util/pp_util.hpp>
 
@@ -14,22 +15,61 @@ namespace arb {
     T min(T value) const { return impl_->min(value); }\
     T max(T value) const { return impl_->max(value); }\
     T sum(T value) const { return impl_->sum(value); }\
-    std::vector<T> gather(T value, int root) const { return impl_->gather(value, root); }
+    std::vector<T> gather(T value, int root) const { return impl_->gather(value, root); }\
+    std::vector<T> gather_all(T value) const { return impl_->gather_all(value); }\
+    gathered_vector<T> gather_all(const std::vector<T>& values) const { return impl_->gather_all(values); }\
+    gathered_vector<T> all_to_all(const std::vector<T>& values, const count_vector& partition) const { return impl_->all_to_all(values, partition); }
 
 #define ARB_INTERFACE_COLLECTIVES_(T) \
     virtual T min(T value) const = 0;\
     virtual T max(T value) const = 0;\
     virtual T sum(T value) const = 0;\
-    virtual std::vector<T> gather(T value, int root) const = 0;
+    virtual std::vector<T> gather(T value, int root) const = 0;\
+    virtual std::vector<T> gather_all(T value) const = 0;\
+    virtual gathered_vector<T> gather_all(const std::vector<T>& values) const = 0;\
+    virtual gathered_vector<T> all_to_all(const std::vector<T>& values, const count_vector& partition) const = 0;
 
 #define ARB_WRAP_COLLECTIVES_(T) \
     T min(T value) const override { return wrapped.min(value); }\
     T max(T value) const override { return wrapped.max(value); }\
     T sum(T value) const override { return wrapped.sum(value); }\
-    std::vector<T> gather(T value, int root) const override { return wrapped.gather(value, root); }
+    std::vector<T> gather(T value, int root) const override { return wrapped.gather(value, root); }\
+    std::vector<T> gather_all(T value) const override { return wrapped.gather_all(value); }\
+    gathered_vector<T> gather_all(const std::vector<T>& values) const override { return wrapped.gather_all(values); }\
+    gathered_vector<T> all_to_all(const std::vector<T>& values, const count_vector& partition) const override { return wrapped.all_to_all(values, partition); }
 
 #define ARB_COLLECTIVE_TYPES_ float, double, int, unsigned, long, unsigned long, long long, unsigned long long
 
+// Handle on a spike gather started with distributed_context::start_gather_spikes.
+class spike_gather_request {
+public:
+    virtual ~spike_gather_request() = default;
+
+    // Make progress on the gather without blocking. Returns true if the
+    // gather is complete.
+    virtual bool test() = 0;
+
+    // Wait for the gather to complete, and return the gathered spikes.
+    // Must be called at most once.
+    virtual gathered_vector<arb::spike> wait() = 0;
+};
+
+using spike_gather_handle = std::unique_ptr<spike_gather_request>;
+
+// A spike gather that was completed when it was started.
+class completed_spike_gather: public spike_gather_request {
+public:
+    explicit completed_spike_gather(gathered_vector<arb::spike> spikes):
+        spikes_(std::move(spikes))
+    {}
+
+    bool test() override { return true; }
+    gathered_vector<arb::spike> wait() override { return std::move(spikes_); }
+
+private:
+    gathered_vector<arb::spike> spikes_;
+};
+
 // Defines the concept/interface for a distributed communication context.
 //
 // Uses value-semantic type erasure to define the interface, so that
@@ -43,6 +83,7 @@ class distributed_context {
 public:
     using spike_vector = std::vector<arb::spike>;
     using gid_vector = std::vector<cell_gid_type>;
+    using count_vector = std::vector<gathered_vector<arb::spike>::count_type>;
 
     // default constructor uses a local context: see below.
     distributed_context();
@@ -63,6 +104,33 @@ public:
         return impl_->gather_gids(local_gids);
     }
 
+    // Non-blocking gather_spikes: the gather is started, and completed
+    // by calling wait() on the returned handle. Spike gathers must be
+    // started and completed in the same order on all ranks.
+    spike_gather_handle start_gather_spikes(spike_vector local_spikes) const {
+        return impl_->start_gather_spikes(std::move(local_spikes));
+    }
+
+    // Personalised exchange: the values in [partition[i], partition[i+1])
+    // are sent to rank i. The result holds the values received from each
+    // rank, partitioned by source rank.
+    gathered_vector<arb::spike> all_to_all_spikes(const spike_vector& values, const count_vector& partition) const {
+        return impl_->all_to_all_spikes(values, partition);
+    }
+
+    gathered_vector<cell_gid_type> all_to_all_gids(const gid_vector& values, const count_vector& partition) const {
+        return impl_->all_to_all_gids(values, partition);
+    }
+
+    // Encoding used by gather_spikes.
+    void set_spike_encoding(spike_encoding_kind kind) {
+        impl_->set_spike_encoding(kind);
+    }
+
+    spike_encoding_kind spike_encoding() const {
+        return impl_->spike_encoding();
+    }
+
     int id() const {
         return impl_->id();
     }
@@ -79,6 +147,8 @@ public:
         return impl_->name();
     }
 
+    // Reductions and gathers, and all_to_all as above for values that do
+    // not refer to gids, which the dry run context exchanges unchanged.
     ARB_PP_FOREACH(ARB_PUBLIC_COLLECTIVES_, ARB_COLLECTIVE_TYPES_);
 
     std::vector<std::string> gather(std::string value, int root) const {
@@ -91,6 +161,14 @@ private:
             gather_spikes(const spike_vector& local_spikes) const = 0;
         virtual gathered_vector<cell_gid_type>
             gather_gids(const gid_vector& local_gids) const = 0;
+        virtual spike_gather_handle
+            start_gather_spikes(spike_vector local_spikes) const = 0;
+        virtual gathered_vector<arb::spike>
+            all_to_all_spikes(const spike_vector& values, const count_vector& partition) const = 0;
+        virtual gathered_vector<cell_gid_type>
+            all_to_all_gids(const gid_vector& values, const count_vector& partition) const = 0;
+        virtual void set_spike_encoding(spike_encoding_kind kind) = 0;
+        virtual spike_encoding_kind spike_encoding() const = 0;
         virtual int id() const = 0;
         virtual int size() const = 0;
         virtual void barrier() const = 0;
@@ -115,6 +193,24 @@ private:
         gather_gids(const gid_vector& local_gids) const override {
             return wrapped.gather_gids(local_gids);
         }
+        spike_gather_handle
+        start_gather_spikes(spike_vector local_spikes) const override {
+            return wrapped.start_gather_spikes(std::move(local_spikes));
+        }
+        gathered_vector<arb::spike>
+        all_to_all_spikes(const spike_vector& values, const count_vector& partition) const override {
+            return wrapped.all_to_all_spikes(values, partition);
+        }
+        gathered_vector<cell_gid_type>
+        all_to_all_gids(const gid_vector& values, const count_vector& partition) const override {
+            return wrapped.all_to_all_gids(values, partition);
+        }
+        void set_spike_encoding(spike_encoding_kind kind) override {
+            wrapped.set_spike_encoding(kind);
+        }
+        spike_encoding_kind spike_encoding() const override {
+            return wrapped.spike_encoding();
+        }
         int id() const override {
             return wrapped.id();
         }
@@ -157,6 +253,36 @@ struct local_context {
                 {0u, static_cast<count_type>(local_gids.size())}
         );
     }
+    spike_gather_handle
+    start_gather_spikes(std::vector<arb::spike> local_spikes) const {
+        return std::make_unique<completed_spike_gather>(gather_spikes(local_spikes));
+    }
+    gathered_vector<arb::spike>
+    all_to_all_spikes(const std::vector<arb::spike>& values,
+                      const std::vector<gathered_vector<arb::spike>::count_type>& partition) const {
+        return all_to_all(values, partition);
+    }
+    gathered_vector<cell_gid_type>
+    all_to_all_gids(const std::vector<cell_gid_type>& values,
+                    const std::vector<gathered_vector<cell_gid_type>::count_type>& partition) const {
+        return all_to_all(values, partition);
+    }
+
+    // With a single rank everything is sent to, and received from, ourselves.
+    template <typename T>
+    gathered_vector<T>
+    all_to_all(const std::vector<T>& values,
+               const std::vector<typename gathered_vector<T>::count_type>& partition) const {
+        return gathered_vector<T>(
+            std::vector<T>(values.begin()+partition.front(), values.begin()+partition.back()),
+            {0u, partition.back()-partition.front()}
+        );
+    }
+
+    // Spikes are never communicated, so the encoding has no effect.
+    void set_spike_encoding(spike_encoding_kind kind) { encoding_ = kind; }
+
+    spike_encoding_kind spike_encoding() const { return encoding_; }
 
     int id() const { return 0; }
 
@@ -174,9 +300,20 @@ struct local_context {
     template <typename T>
     std::vector<T> gather(T value, int) const { return {std::move(value)}; }
 
+    template <typename T>
+    std::vector<T> gather_all(T value) const { return {std::move(value)}; }
+
+    template <typename T>
+    gathered_vector<T> gather_all(const std::vector<T>& values) const {
+        using count_type = typename gathered_vector<T>::count_type;
+        return gathered_vector<T>(std::vector<T>(values), {0u, static_cast<count_type>(values.size())});
+    }
+
     void barrier() const {}
 
     std::string name() const { return "local"; }
+
+    spike_encoding_kind encoding_ = spike_encoding_kind::plain;
 };
 
 inline distributed_context::distributed_context():
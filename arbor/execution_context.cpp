@@ -20,7 +20,7 @@ void execution_context_deleter::operator()(execution_context* p) const {
 
 execution_context::execution_context(const proc_allocation& resources):
     distributed(make_local_context()),
-    thread_pool(std::make_shared<threading::task_system>(resources.num_threads)),
+    thread_pool(std::make_shared<threading::task_system>(resources.num_threads, resources.scheduler, resources.bind_threads)),
     gpu(resources.has_gpu()? std::make_shared<gpu_context>(resources.gpu_id)
                            : std::make_shared<gpu_context>())
 {}
@@ -33,7 +33,7 @@ context make_context(const proc_allocation& p) {
 template <>
 execution_context::execution_context(const proc_allocation& resources, MPI_Comm comm):
     distributed(make_mpi_context(comm)),
-    thread_pool(std::make_shared<threading::task_system>(resources.num_threads)),
+    thread_pool(std::make_shared<threading::task_system>(resources.num_threads, resources.scheduler, resources.bind_threads)),
     gpu(resources.has_gpu()? std::make_shared<gpu_context>(resources.gpu_id)
                            : std::make_shared<gpu_context>())
 {}
@@ -48,7 +48,7 @@ execution_context::execution_context(
         const proc_allocation& resources,
         dry_run_info d):
         distributed(make_dry_run_context(d.num_ranks, d.num_cells_per_rank)),
-        thread_pool(std::make_shared<threading::task_system>(resources.num_threads)),
+        thread_pool(std::make_shared<threading::task_system>(resources.num_threads, resources.scheduler, resources.bind_threads)),
         gpu(resources.has_gpu()? std::make_shared<gpu_context>(resources.gpu_id)
                                : std::make_shared<gpu_context>())
 {}
@@ -70,6 +70,14 @@ unsigned num_threads(const context& ctx) {
     return ctx->thread_pool->get_num_threads();
 }
 
+task_scheduler_kind task_scheduler(const context& ctx) {
+    return ctx->thread_pool->scheduler();
+}
+
+thread_binding_kind thread_binding(const context& ctx) {
+    return ctx->thread_pool->binding();
+}
+
 unsigned num_ranks(const context& ctx) {
     return ctx->distributed->size();
 }
@@ -78,6 +86,14 @@ unsigned rank(const context& ctx) {
     return ctx->distributed->id();
 }
 
+void set_spike_encoding(const context& ctx, spike_encoding_kind kind) {
+    ctx->distributed->set_spike_encoding(kind);
+}
+
+spike_encoding_kind spike_encoding(const context& ctx) {
+    return ctx->distributed->spike_encoding();
+}
+
 bool has_mpi(const context& ctx) {
     return ctx->distributed->name() == "MPI";
 }
@@ -11,11 +11,9 @@
 #include <iterator>
 #include <memory>
 #include <optional>
-#include <queue>
 #include <stdexcept>
 #include <utility>
 #include <vector>
-#include <unordered_set>
 
 #include <arbor/assert.hpp>
 #include <arbor/common_types.hpp>
@@ -27,6 +25,7 @@
 #include "execution_context.hpp"
 #include "fvm_layout.hpp"
 #include "fvm_lowered_cell.hpp"
+#include "gap_junction_components.hpp"
 #include "matrix.hpp"
 #include "profile/profiler_macro.hpp"
 #include "sampler_map.hpp"
@@ -624,48 +623,10 @@ fvm_size_type fvm_lowered_cell_impl<Backend>::fvm_intdom(
         const std::vector<cell_gid_type>& gids,
         std::vector<fvm_index_type>& cell_to_intdom) {
 
-    cell_to_intdom.resize(gids.size());
+    auto gj = find_gap_junction_components(rec, gids, true, context_.thread_pool);
+    cell_to_intdom.assign(gj.component.begin(), gj.component.end());
 
-    std::unordered_map<cell_gid_type, cell_size_type> gid_to_loc;
-    for (auto i: util::count_along(gids)) {
-        gid_to_loc[gids[i]] = i;
-    }
-
-    std::unordered_set<cell_gid_type> visited;
-    std::queue<cell_gid_type> intdomq;
-    cell_size_type intdom_id = 0;
-
-    for (auto gid: gids) {
-        if (visited.count(gid)) continue;
-        visited.insert(gid);
-
-        intdomq.push(gid);
-        while (!intdomq.empty()) {
-            auto g = intdomq.front();
-            intdomq.pop();
-
-            cell_to_intdom[gid_to_loc[g]] = intdom_id;
-
-            for (auto gj: rec.gap_junctions_on(g)) {
-                cell_gid_type peer =
-                        gj.local.gid==g? gj.peer.gid:
-                        gj.peer.gid==g?  gj.local.gid:
-                        throw bad_cell_description(cell_kind::cable, g);
-
-                if (!gid_to_loc.count(peer)) {
-                    throw gj_unsupported_domain_decomposition(g, peer);
-                }
-
-                if (!visited.count(peer)) {
-                    visited.insert(peer);
-                    intdomq.push(peer);
-                }
-            }
-        }
-        intdom_id++;
-    }
-
-    return intdom_id;
+    return gj.num_components;
 }
 
 // Resolution of probe addresses into a specific fvm_probe_data draws upon data
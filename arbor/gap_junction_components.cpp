@@ -0,0 +1,161 @@
+#include <algorithm>
+#include <atomic>
+#include <iterator>
+#include <memory>
+#include <numeric>
+#include <utility>
+#include <vector>
+
+#include <arbor/arbexcept.hpp>
+#include <arbor/common_types.hpp>
+#include <arbor/recipe.hpp>
+
+#include "gap_junction_components.hpp"
+#include "threading/threading.hpp"
+
+namespace arb {
+
+namespace {
+
+// Disjoint sets of the integers [0, n), which can be joined concurrently,
+// after Anderson and Woll, "Wait-free parallel algorithms for the union-find
+// problem" (STOC 1991).
+//
+// A root is only ever linked to a root with a smaller index, so that the
+// root of each set is its smallest element.
+class disjoint_sets {
+public:
+    explicit disjoint_sets(unsigned n): parent_(new std::atomic<unsigned>[n]) {
+        for (unsigned i = 0; i<n; ++i) {
+            parent_[i].store(i, std::memory_order_relaxed);
+        }
+    }
+
+    // The root of the set of u, halving the path to it on the way.
+    unsigned find(unsigned u) {
+        for (;;) {
+            unsigned p = parent_[u].load(std::memory_order_relaxed);
+            if (p==u) return u;
+
+            unsigned gp = parent_[p].load(std::memory_order_relaxed);
+            if (gp!=p) {
+                // Parents only ever move towards the root, so gp remains an
+                // ancestor of u if another thread changed the parent of u.
+                parent_[u].compare_exchange_weak(p, gp, std::memory_order_relaxed);
+            }
+            u = gp;
+        }
+    }
+
+    void unite(unsigned a, unsigned b) {
+        for (;;) {
+            a = find(a);
+            b = find(b);
+            if (a==b) return;
+            if (a<b) std::swap(a, b);
+
+            // Fails if a is no longer a root, in which case try again.
+            unsigned expected = a;
+            if (parent_[a].compare_exchange_strong(expected, b, std::memory_order_relaxed)) return;
+        }
+    }
+
+private:
+    std::unique_ptr<std::atomic<unsigned>[]> parent_;
+};
+
+cell_gid_type peer_gid(cell_gid_type gid, const gap_junction_connection& c) {
+    return c.local.gid==gid? c.peer.gid: c.local.gid;
+}
+
+} // anonymous namespace
+
+gap_junction_components find_gap_junction_components(
+    const recipe& rec,
+    std::vector<cell_gid_type> gids,
+    bool closed,
+    const task_system_handle& ts)
+{
+    gap_junction_components result;
+    auto& cells = result.gids;
+    auto& gj = result.gap_junctions;
+
+    cells = std::move(gids);
+
+    // The gids of all cells found so far, sorted.
+    std::vector<cell_gid_type> known = cells;
+    std::sort(known.begin(), known.end());
+
+    // Query the gap junctions of the cells found in the last round, then
+    // add the cells they lead to that have not been found yet.
+    for (std::size_t begin = 0; begin<cells.size(); ) {
+        const std::size_t end = cells.size();
+
+        gj.resize(end);
+        for (auto i = begin; i<end; ++i) {
+            auto gid = cells[i];
+            gj[i] = rec.gap_junctions_on(gid);
+            for (const auto& c: gj[i]) {
+                if (gid!=c.local.gid && gid!=c.peer.gid) {
+                    throw bad_gj_connection_gid(gid, c.local.gid, c.peer.gid);
+                }
+            }
+        }
+        if (closed) break;
+
+        std::vector<cell_gid_type> reached;
+        for (auto i = begin; i<end; ++i) {
+            for (const auto& c: gj[i]) {
+                reached.push_back(peer_gid(cells[i], c));
+            }
+        }
+        std::sort(reached.begin(), reached.end());
+        reached.erase(std::unique(reached.begin(), reached.end()), reached.end());
+
+        std::vector<cell_gid_type> added;
+        std::set_difference(reached.begin(), reached.end(), known.begin(), known.end(), std::back_inserter(added));
+        cells.insert(cells.end(), added.begin(), added.end());
+
+        auto mid = known.insert(known.end(), added.begin(), added.end());
+        std::inplace_merge(known.begin(), mid, known.end());
+
+        begin = end;
+    }
+
+    const unsigned n = cells.size();
+
+    // Indices of the cells in order of increasing gid, for lookup by gid.
+    std::vector<unsigned> order(n);
+    std::iota(order.begin(), order.end(), 0u);
+    std::sort(order.begin(), order.end(), [&cells](unsigned a, unsigned b) { return cells[a]<cells[b]; });
+
+    auto index_of = [&](cell_gid_type gid) {
+        auto it = std::lower_bound(order.begin(), order.end(), gid,
+            [&cells](unsigned i, cell_gid_type gid) { return cells[i]<gid; });
+        return it!=order.end() && cells[*it]==gid? *it: n;
+    };
+
+    disjoint_sets sets(n);
+    threading::parallel_for::apply(0, n, ts.get(),
+        [&](int i) {
+            for (const auto& c: gj[i]) {
+                auto peer = peer_gid(cells[i], c);
+                auto j = index_of(peer);
+                if (j==n) {
+                    throw gj_unsupported_domain_decomposition(cells[i], peer);
+                }
+                sets.unite(i, j);
+            }
+        });
+
+    // The root of each component is its first cell.
+    result.component.resize(n);
+    for (unsigned i = 0; i<n; ++i) {
+        auto root = sets.find(i);
+        result.component[i] = root==i? result.num_components++: result.component[root];
+    }
+
+    return result;
+}
+
+} // namespace arb
@@ -0,0 +1,47 @@
+#pragma once
+
+#include <vector>
+
+#include <arbor/common_types.hpp>
+#include <arbor/recipe.hpp>
+
+#include "threading/threading.hpp"
+
+namespace arb {
+
+// The cells connected by gap junctions to a set of cells, with their gap
+// junctions and the connected components, or super cells, that they form.
+struct gap_junction_components {
+    // The given cells, in the given order, followed by any other cells that
+    // are reachable from them through gap junctions.
+    std::vector<cell_gid_type> gids;
+
+    // The gap junctions on each cell, as returned by the recipe.
+    std::vector<std::vector<gap_junction_connection>> gap_junctions;
+
+    // The component of each cell. Components are numbered in the order of
+    // their first cell in gids.
+    std::vector<unsigned> component;
+    unsigned num_components = 0;
+};
+
+// Find the components of the cells connected by gap junctions to the cells
+// gids, which must be unique.
+//
+// The gap junctions of each cell are queried from the recipe exactly once,
+// on the calling thread, as recipes implemented in Python can not be called
+// from the thread pool while the caller holds the interpreter lock. The
+// components are then found by a concurrent union-find over the gap
+// junctions.
+//
+// If closed is true, a gap junction to a cell that is not in gids is an error
+// (gj_unsupported_domain_decomposition). Otherwise such cells are added, and
+// their gap junctions are followed in turn. A gap junction on a cell that is
+// not one of its end points is an error (bad_gj_connection_gid).
+gap_junction_components find_gap_junction_components(
+    const recipe& rec,
+    std::vector<cell_gid_type> gids,
+    bool closed,
+    const task_system_handle& ts);
+
+} // namespace arb
@@ -0,0 +1,321 @@
+#include <algorithm>
+#include <cstddef>
+#include <numeric>
+#include <queue>
+#include <utility>
+#include <vector>
+
+#include "graph_partition.hpp"
+
+namespace arb {
+
+weighted_graph make_weighted_graph(
+    std::vector<double> vertex_weights,
+    const std::vector<std::pair<unsigned, unsigned>>& edges)
+{
+    weighted_graph g;
+    g.vertex_weights = std::move(vertex_weights);
+    const auto n = g.num_vertices();
+
+    // Both directions of every edge, sorted by source then target.
+    std::vector<std::pair<unsigned, unsigned>> arcs;
+    arcs.reserve(2*edges.size());
+    for (auto [u, v]: edges) {
+        if (u==v) continue;
+        arcs.push_back({u, v});
+        arcs.push_back({v, u});
+    }
+    std::sort(arcs.begin(), arcs.end());
+
+    g.offsets.assign(n+1, 0);
+    for (std::size_t i = 0; i<arcs.size(); ++i) {
+        if (i>0 && arcs[i]==arcs[i-1]) {
+            g.edge_weights.back() += 1;
+        }
+        else {
+            g.adjacency.push_back(arcs[i].second);
+            g.edge_weights.push_back(1);
+            ++g.offsets[arcs[i].first+1];
+        }
+    }
+    std::partial_sum(g.offsets.begin(), g.offsets.end(), g.offsets.begin());
+
+    return g;
+}
+
+double edge_cut(const weighted_graph& g, const std::vector<unsigned>& part) {
+    double cut = 0;
+    for (std::size_t v = 0; v<g.num_vertices(); ++v) {
+        for (auto i = g.offsets[v]; i<g.offsets[v+1]; ++i) {
+            if (part[g.adjacency[i]]!=part[v]) cut += g.edge_weights[i];
+        }
+    }
+    return cut/2;
+}
+
+namespace {
+
+// Contract a heavy edge matching: each vertex is matched with the unmatched
+// neighbour to which it has the heaviest edge, as long as their combined
+// weight does not exceed max_vertex_weight. Vertices are visited in order of
+// increasing degree, so that vertices with few neighbours are more likely
+// to find a partner.
+//
+// Returns the coarse graph, and the coarse vertex of each vertex.
+std::pair<weighted_graph, std::vector<unsigned>> coarsen(const weighted_graph& g, double max_vertex_weight) {
+    const unsigned n = g.num_vertices();
+    const unsigned unmatched = -1;
+
+    auto degree = [&g](unsigned v) { return g.offsets[v+1]-g.offsets[v]; };
+    std::vector<unsigned> order(n);
+    std::iota(order.begin(), order.end(), 0u);
+    std::stable_sort(order.begin(), order.end(),
+        [&degree](unsigned a, unsigned b) { return degree(a)<degree(b); });
+
+    std::vector<unsigned> match(n, unmatched);
+    for (auto v: order) {
+        if (match[v]!=unmatched) continue;
+
+        unsigned best = v;
+        double best_weight = 0;
+        for (auto i = g.offsets[v]; i<g.offsets[v+1]; ++i) {
+            auto u = g.adjacency[i];
+            if (match[u]==unmatched && g.edge_weights[i]>best_weight &&
+                g.vertex_weights[v]+g.vertex_weights[u]<=max_vertex_weight)
+            {
+                best = u;
+                best_weight = g.edge_weights[i];
+            }
+        }
+        match[v] = best;
+        match[best] = v;
+    }
+
+    // Number the coarse vertices in the order of their first fine vertex.
+    std::vector<unsigned> cmap(n, unmatched);
+    std::vector<std::pair<unsigned, unsigned>> members;
+    for (unsigned v = 0; v<n; ++v) {
+        if (cmap[v]!=unmatched) continue;
+        cmap[v] = cmap[match[v]] = members.size();
+        members.push_back({v, match[v]});
+    }
+
+    const unsigned nc = members.size();
+    weighted_graph c;
+    c.vertex_weights.reserve(nc);
+    c.offsets.reserve(nc+1);
+
+    // Position of the edge to each coarse vertex in the adjacency list of
+    // the current coarse vertex, if any.
+    const std::size_t npos = -1;
+    std::vector<std::size_t> pos(nc, npos);
+
+    for (unsigned cv = 0; cv<nc; ++cv) {
+        auto [a, b] = members[cv];
+        c.vertex_weights.push_back(g.vertex_weights[a] + (a!=b? g.vertex_weights[b]: 0));
+
+        auto first = c.adjacency.size();
+        for (auto v: {a, b}) {
+            for (auto i = g.offsets[v]; i<g.offsets[v+1]; ++i) {
+                auto cu = cmap[g.adjacency[i]];
+                if (cu==cv) continue;
+                if (pos[cu]==npos) {
+                    pos[cu] = c.adjacency.size();
+                    c.adjacency.push_back(cu);
+                    c.edge_weights.push_back(g.edge_weights[i]);
+                }
+                else {
+                    c.edge_weights[pos[cu]] += g.edge_weights[i];
+                }
+            }
+            if (a==b) break;
+        }
+        for (auto i = first; i<c.adjacency.size(); ++i) {
+            pos[c.adjacency[i]] = npos;
+        }
+        c.offsets.push_back(c.adjacency.size());
+    }
+
+    return {std::move(c), std::move(cmap)};
+}
+
+// Greedy graph growing: the parts are grown one after the other from a seed
+// vertex, by adding the unassigned vertex most strongly connected to the part,
+// until the part holds its share of the remaining weight. The last part takes
+// all remaining vertices.
+std::vector<unsigned> initial_partition(const weighted_graph& g, unsigned num_parts) {
+    const unsigned n = g.num_vertices();
+    const unsigned unassigned = num_parts;
+
+    std::vector<unsigned> part(n, unassigned);
+    std::vector<double> conn(n, 0.);
+    double remaining = std::accumulate(g.vertex_weights.begin(), g.vertex_weights.end(), 0.);
+    unsigned seed = 0;
+
+    for (unsigned p = 0; p+1<num_parts; ++p) {
+        const double target = remaining/(num_parts-p);
+        double weight = 0;
+
+        std::priority_queue<std::pair<double, unsigned>> frontier;
+        while (weight<target) {
+            // Discard stale entries, for vertices that have been assigned or
+            // whose connectivity has increased since they were pushed.
+            while (!frontier.empty() &&
+                   (part[frontier.top().second]!=unassigned || frontier.top().first!=conn[frontier.top().second]))
+            {
+                frontier.pop();
+            }
+
+            unsigned v;
+            if (frontier.empty()) {
+                while (seed<n && part[seed]!=unassigned) ++seed;
+                if (seed==n) break;
+                v = seed;
+            }
+            else {
+                v = frontier.top().second;
+                frontier.pop();
+            }
+
+            // Stop if adding v would overshoot the target by more than
+            // stopping short of it.
+            if (weight>0 && weight+g.vertex_weights[v]-target>target-weight) break;
+
+            part[v] = p;
+            weight += g.vertex_weights[v];
+            for (auto i = g.offsets[v]; i<g.offsets[v+1]; ++i) {
+                auto u = g.adjacency[i];
+                if (part[u]==unassigned) {
+                    conn[u] += g.edge_weights[i];
+                    frontier.push({conn[u], u});
+                }
+            }
+        }
+        remaining -= weight;
+
+        for (unsigned v = 0; v<n; ++v) conn[v] = 0;
+    }
+
+    for (auto& p: part) {
+        if (p==unassigned) p = num_parts-1;
+    }
+    return part;
+}
+
+// Greedy k-way refinement: boundary vertices are moved to the adjacent part
+// that reduces the edge cut the most, provided that part does not exceed
+// max_part_weight. Moves that leave the cut unchanged are made only if they
+// improve the balance, and vertices of parts that exceed max_part_weight are
+// moved even if that increases the cut.
+void refine(const weighted_graph& g, std::vector<unsigned>& part, unsigned num_parts, double max_part_weight) {
+    const unsigned n = g.num_vertices();
+    const auto& vw = g.vertex_weights;
+
+    std::vector<double> part_weight(num_parts, 0.);
+    for (unsigned v = 0; v<n; ++v) part_weight[part[v]] += vw[v];
+
+    std::vector<double> conn(num_parts, 0.);
+    std::vector<unsigned> adjacent;
+
+    const unsigned max_passes = 8;
+    for (unsigned pass = 0; pass<max_passes; ++pass) {
+        unsigned moves = 0;
+
+        for (unsigned v = 0; v<n; ++v) {
+            const auto p = part[v];
+            const bool overweight = part_weight[p]>max_part_weight;
+
+            double internal = 0;
+            adjacent.clear();
+            for (auto i = g.offsets[v]; i<g.offsets[v+1]; ++i) {
+                auto q = part[g.adjacency[i]];
+                if (q==p) {
+                    internal += g.edge_weights[i];
+                }
+                else {
+                    if (conn[q]==0) adjacent.push_back(q);
+                    conn[q] += g.edge_weights[i];
+                }
+            }
+
+            unsigned best = p;
+            double best_gain = 0;
+            for (auto q: adjacent) {
+                if (part_weight[q]+vw[v]>max_part_weight) continue;
+
+                double gain = conn[q]-internal;
+                bool better = best==p?
+                    gain>0 || (gain==0 && part_weight[q]+vw[v]<part_weight[p]) || overweight:
+                    gain>best_gain || (gain==best_gain && part_weight[q]<part_weight[best]);
+                if (better) {
+                    best = q;
+                    best_gain = gain;
+                }
+            }
+            for (auto q: adjacent) conn[q] = 0;
+
+            if (best==p && overweight) {
+                auto lightest = std::min_element(part_weight.begin(), part_weight.end())-part_weight.begin();
+                if (part_weight[lightest]+vw[v]<=max_part_weight) best = lightest;
+            }
+
+            if (best!=p) {
+                part[v] = best;
+                part_weight[p] -= vw[v];
+                part_weight[best] += vw[v];
+                ++moves;
+            }
+        }
+
+        if (!moves) break;
+    }
+}
+
+} // anonymous namespace
+
+std::vector<unsigned> partition_graph(const weighted_graph& g, unsigned num_parts, double imbalance) {
+    const std::size_t n = g.num_vertices();
+    if (num_parts<=1 || n==0) {
+        return std::vector<unsigned>(n, 0);
+    }
+
+    const double total = std::accumulate(g.vertex_weights.begin(), g.vertex_weights.end(), 0.);
+    const double max_part_weight = imbalance*total/num_parts;
+
+    // Coarsen until the graph has about 20 vertices per part, or until
+    // coarsening no longer reduces the size of the graph substantially.
+    const std::size_t coarsen_to = 20*std::size_t(num_parts);
+    const double max_vertex_weight = 1.5*total/coarsen_to;
+
+    std::vector<weighted_graph> levels;
+    std::vector<std::vector<unsigned>> maps;
+    while ((levels.empty()? g: levels.back()).num_vertices()>coarsen_to) {
+        const auto& fine = levels.empty()? g: levels.back();
+        auto [coarse, cmap] = coarsen(fine, max_vertex_weight);
+        if (coarse.num_vertices()>0.95*fine.num_vertices()) break;
+
+        levels.push_back(std::move(coarse));
+        maps.push_back(std::move(cmap));
+    }
+
+    const auto& coarsest = levels.empty()? g: levels.back();
+    auto part = initial_partition(coarsest, num_parts);
+    refine(coarsest, part, num_parts, max_part_weight);
+
+    // Project the partition back to the finer levels, refining on the way.
+    for (auto l = levels.size(); l>0; --l) {
+        const auto& fine = l>1? levels[l-2]: g;
+        const auto& cmap = maps[l-1];
+
+        std::vector<unsigned> fine_part(fine.num_vertices());
+        for (std::size_t v = 0; v<fine_part.size(); ++v) {
+            fine_part[v] = part[cmap[v]];
+        }
+        part = std::move(fine_part);
+        refine(fine, part, num_parts, max_part_weight);
+    }
+
+    return part;
+}
+
+} // namespace arb
@@ -0,0 +1,48 @@
+#pragma once
+
+#include <cstddef>
+#include <utility>
+#include <vector>
+
+namespace arb {
+
+// Undirected graph with weighted vertices and edges, stored in compressed
+// sparse row format: the neighbours of vertex v are
+// adjacency[offsets[v]] ... adjacency[offsets[v+1]-1], connected by edges
+// with weights edge_weights[offsets[v]] ... edge_weights[offsets[v+1]-1].
+// Every edge is stored once for each of its end points.
+struct weighted_graph {
+    std::vector<double> vertex_weights;
+    std::vector<std::size_t> offsets = {0};
+    std::vector<unsigned> adjacency;
+    std::vector<double> edge_weights;
+
+    std::size_t num_vertices() const { return vertex_weights.size(); }
+};
+
+// Build a graph from a list of edges (u, v), each with weight 1.
+// Parallel edges are merged into one edge of the accumulated weight,
+// and self loops are dropped.
+weighted_graph make_weighted_graph(
+    std::vector<double> vertex_weights,
+    const std::vector<std::pair<unsigned, unsigned>>& edges);
+
+// Partition the vertices of a graph into num_parts parts, such that the total
+// weight of the edges between parts is small, while the total vertex weight
+// of each part is kept below a factor imbalance above the average where
+// possible: the refinement never moves a vertex into a part if that would
+// exceed the bound.
+//
+// Multilevel k-way partitioning after Karypis and Kumar, "Multilevel k-way
+// partitioning scheme for irregular graphs" (JPDC 1998): the graph is
+// coarsened by contracting heavy edge matchings, the coarsest graph is
+// partitioned by greedy graph growing, and the partition is projected back
+// through the levels with greedy boundary refinement on each level.
+//
+// The result is deterministic, and gives the part of each vertex.
+std::vector<unsigned> partition_graph(const weighted_graph& g, unsigned num_parts, double imbalance = 1.03);
+
+// Total weight of the edges between vertices in different parts.
+double edge_cut(const weighted_graph& g, const std::vector<unsigned>& part);
+
+} // namespace arb
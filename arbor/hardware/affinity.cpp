@@ -0,0 +1,110 @@
+#include <algorithm>
+#include <cstdlib>
+#include <fstream>
+#include <sstream>
+#include <string>
+#include <vector>
+
+#ifdef __linux__
+#ifndef _GNU_SOURCE
+#define _GNU_SOURCE
+#endif
+extern "C" {
+    #include <pthread.h>
+    #include <sched.h>
+}
+#endif
+
+#include "affinity.hpp"
+
+namespace arb {
+namespace hw {
+
+std::vector<int> parse_cpu_list(const std::string& list) {
+    std::vector<int> cpus;
+    std::istringstream in(list);
+    std::string range;
+    while (std::getline(in, range, ',')) {
+        // Remove trailing white space, e.g. the newline at the end of a file.
+        range.erase(range.find_last_not_of(" \t\n")+1);
+        if (range.empty()) continue;
+
+        char* end = nullptr;
+        long lo = std::strtol(range.c_str(), &end, 10);
+        long hi = lo;
+        if (*end=='-') {
+            const char* p = end+1;
+            hi = std::strtol(p, &end, 10);
+            if (end==p) return {};
+        }
+        if (*end || end==range.c_str() || lo<0 || hi<lo) return {};
+        for (long i=lo; i<=hi; ++i) {
+            cpus.push_back(i);
+        }
+    }
+    std::sort(cpus.begin(), cpus.end());
+    cpus.erase(std::unique(cpus.begin(), cpus.end()), cpus.end());
+    return cpus;
+}
+
+#if defined(__linux__)
+std::vector<int> get_thread_affinity() {
+    std::vector<int> cpus;
+    cpu_set_t mask;
+    CPU_ZERO(&mask);
+    if (pthread_getaffinity_np(pthread_self(), sizeof(cpu_set_t), &mask)) {
+        return cpus;
+    }
+    for (int i=0; i<CPU_SETSIZE; ++i) {
+        if (CPU_ISSET(i, &mask)) {
+            cpus.push_back(i);
+        }
+    }
+    return cpus;
+}
+
+bool set_thread_affinity(const std::vector<int>& cpus) {
+    cpu_set_t mask;
+    CPU_ZERO(&mask);
+    int n = 0;
+    for (auto c: cpus) {
+        if (c>=0 && c<CPU_SETSIZE) {
+            CPU_SET(c, &mask);
+            ++n;
+        }
+    }
+    return n && !pthread_setaffinity_np(pthread_self(), sizeof(cpu_set_t), &mask);
+}
+
+std::vector<std::vector<int>> numa_node_cpus() {
+    std::vector<std::vector<int>> nodes;
+    const std::string root = "/sys/devices/system/node/";
+
+    std::ifstream online(root+"online");
+    std::string list;
+    if (!std::getline(online, list)) return nodes;
+
+    for (auto node: parse_cpu_list(list)) {
+        std::ifstream cpulist(root+"node"+std::to_string(node)+"/cpulist");
+        std::string cpus;
+        std::getline(cpulist, cpus);
+        nodes.push_back(parse_cpu_list(cpus));
+    }
+    return nodes;
+}
+#else
+std::vector<int> get_thread_affinity() {
+    return {};
+}
+
+bool set_thread_affinity(const std::vector<int>&) {
+    return false;
+}
+
+std::vector<std::vector<int>> numa_node_cpus() {
+    return {};
+}
+#endif
+
+} // namespace hw
+} // namespace arb
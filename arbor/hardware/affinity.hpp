@@ -0,0 +1,26 @@
+#pragma once
+
+#include <string>
+#include <vector>
+
+namespace arb {
+namespace hw {
+
+// Parse a Linux cpu list, e.g. "0-3,8,10-11", into the sorted list of
+// cpu ids. Returns an empty vector if the list is malformed.
+std::vector<int> parse_cpu_list(const std::string& list);
+
+// The cpus on which the calling thread may run.
+// Returns an empty vector if not supported on the target architecture.
+std::vector<int> get_thread_affinity();
+
+// Restrict the calling thread to the given cpus.
+// Returns false on error, if cpus is empty, or if not supported.
+bool set_thread_affinity(const std::vector<int>& cpus);
+
+// The cpus of each NUMA node, as reported by the operating system.
+// Returns an empty vector if not supported on the target architecture.
+std::vector<std::vector<int>> numa_node_cpus();
+
+} // namespace hw
+} // namespace arb
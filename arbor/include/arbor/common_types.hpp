@@ -91,6 +91,12 @@ enum class binning_kind {
     following, // => round times down to previous event if within binning interval.
 };
 
+// Policy for exchanging spikes between ranks.
+enum class spike_exchange_kind {
+    dense,     // => every spike is gathered on every rank.
+    sparse,    // => spikes are only sent to ranks with connections from their source.
+};
+
 std::ostream& operator<<(std::ostream& o, cell_member_type m);
 std::ostream& operator<<(std::ostream& o, cell_kind k);
 std::ostream& operator<<(std::ostream& o, backend_kind k);
@@ -13,6 +13,19 @@ struct dry_run_info {
             num_cells_per_rank(cells_per_rank) {}
 };
 
+// Scheduling of tasks on the threads of the thread pool.
+enum class task_scheduler_kind {
+    queue,           // => one locked task queue per thread.
+    work_stealing,   // => one lock-free work-stealing deque per thread.
+};
+
+// Binding of the threads of the thread pool to cpus.
+enum class thread_binding_kind {
+    none,    // => threads are not bound.
+    cores,   // => each thread is bound to one cpu.
+    numa,    // => each thread is bound to the cpus of one NUMA node.
+};
+
 // A description of local computation resources to use in a computation.
 // By default, a proc_allocation will comprise one thread and no GPU.
 
@@ -25,11 +38,23 @@ struct proc_allocation {
     // See documenation for cuda[/hip]SetDevice and cuda[/hip]DeviceGetAttribute.
     int gpu_id;
 
+    // The scheduler used by the thread pool.
+    task_scheduler_kind scheduler = task_scheduler_kind::queue;
+
+    // The binding of the threads of the thread pool to cpus. When threads
+    // are bound, each cell group is also assigned to a thread, which
+    // constructs and advances it.
+    thread_binding_kind bind_threads = thread_binding_kind::none;
+
     proc_allocation(): proc_allocation(1, -1) {}
 
-    proc_allocation(unsigned threads, int gpu):
+    proc_allocation(unsigned threads, int gpu,
+                    task_scheduler_kind sched = task_scheduler_kind::queue,
+                    thread_binding_kind bind = thread_binding_kind::none):
         num_threads(threads),
-        gpu_id(gpu)
+        gpu_id(gpu),
+        scheduler(sched),
+        bind_threads(bind)
     {}
 
     bool has_gpu() const {
@@ -69,8 +94,23 @@ context make_context(const proc_allocation& resources, Comm comm);
 std::string distribution_type(const context&);
 bool has_gpu(const context&);
 unsigned num_threads(const context&);
+task_scheduler_kind task_scheduler(const context&);
+thread_binding_kind thread_binding(const context&);
 bool has_mpi(const context&);
 unsigned num_ranks(const context&);
 unsigned rank(const context&);
 
+// Encoding of the spikes exchanged between ranks.
+enum class spike_encoding_kind {
+    plain,     // => spikes are sent as they are.
+    compact,   // => gids are delta encoded and times sent as single precision offsets.
+};
+
+// Set the encoding used for spike exchange. The compact encoding reduces the
+// volume of spike communication at the cost of rounding spike times to single
+// precision relative to the earliest spike in each exchange. It has no effect
+// on non-distributed contexts.
+void set_spike_encoding(const context&, spike_encoding_kind);
+spike_encoding_kind spike_encoding(const context&);
+
 }
@@ -1,7 +1,9 @@
 #pragma once
 
 #include <cstddef>
+#include <functional>
 #include <unordered_map>
+#include <vector>
 
 #include <arbor/context.hpp>
 #include <arbor/domain_decomposition.hpp>
@@ -24,4 +26,48 @@ domain_decomposition partition_load_balance(
     const context& ctx,
     partition_hint_map hint_map = {});
 
+// Estimated relative cost of simulating the cell with a given gid.
+// Must return a non-negative value, and must be safe to call for any gid
+// on any rank.
+using cell_cost_function = std::function<double(cell_gid_type)>;
+
+// Distribute the cells over ranks and cell groups according to their cost:
+// each rank is assigned a contiguous range of gids of about the same total
+// cost, and the cells on each rank are packed into groups of about the same
+// total cost. Each rank calls the cost function for an equal share of the gids,
+// so that it is called once for each gid.
+domain_decomposition partition_load_balance_weighted(
+    const recipe& rec,
+    const context& ctx,
+    const cell_cost_function& cost,
+    partition_hint_map hint_map = {});
+
+// Distribute the cells over ranks such that few connections cross ranks, by
+// partitioning the connectivity graph of the model, with each rank assigned
+// cells of about the same total cost. The cells on each rank are packed into
+// groups of about the same total cost.
+domain_decomposition partition_load_balance_graph(
+    const recipe& rec,
+    const context& ctx,
+    const cell_cost_function& cost,
+    partition_hint_map hint_map = {});
+
+// The cost of each cell measured in a simulation: the wall time spent
+// advancing its cell group, as given by simulation::group_advance_times,
+// divided by the number of cells in the group. Cells that are not in the
+// domain decomposition have the mean cost of the cells that are.
+// The load balancers only call the cost function on each rank for an equal
+// share of the gids, so each rank only receives the costs of the cells in its
+// share, and returns the mean cost for all other gids. This is collective, so
+// must be called on all ranks.
+cell_cost_function measured_cell_cost(
+    const domain_decomposition& decomp,
+    const std::vector<double>& group_times,
+    const context& ctx);
+
+// An estimate of the cost of a cell derived from its description: for cable
+// cells the number of CVs times one plus the number of painted density
+// mechanisms, plus the number of placed point mechanisms; 1 for other cells.
+double estimate_cell_cost(const recipe& rec, cell_gid_type gid);
+
 } // namespace arb
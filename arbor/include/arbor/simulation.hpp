@@ -45,9 +45,27 @@ public:
 
     std::size_t num_spikes() const;
 
+    // Return the wall time in seconds spent advancing each local cell group,
+    // in the order of the groups in the domain decomposition, since
+    // construction or the last reset. In each epoch the groups are started in
+    // descending order of this time.
+    std::vector<double> group_advance_times() const;
+
     // Set event binning policy on all our groups.
     void set_binning_policy(binning_kind policy, time_type bin_interval);
 
+    // Set the spike exchange policy. Must be called with the same policy on
+    // all ranks. With spike_exchange_kind::sparse, the global spike callback
+    // is only passed the spikes that were delivered to this rank.
+    void set_spike_exchange(spike_exchange_kind kind);
+
+    // Set the number of epochs over which each spike exchange may overlap
+    // with cell updates (default 1). The epoch length is min_delay/(depth+1),
+    // so a deeper pipeline uses shorter epochs, but lets slow ranks and
+    // network jitter be absorbed without stalling the other ranks. Must be
+    // called with the same depth on all ranks.
+    void set_spike_exchange_depth(unsigned depth);
+
     // Register a callback that will perform a export of the global
     // spike vector.
     void set_global_spike_callback(spike_export_function = spike_export_function{});
@@ -1,9 +1,17 @@
+#include <algorithm>
+#include <any>
+#include <cmath>
+#include <functional>
+#include <memory>
+#include <numeric>
 #include <queue>
 #include <unordered_map>
-#include <unordered_set>
+#include <utility>
 #include <vector>
 
 #include <arbor/arbexcept.hpp>
+#include <arbor/cable_cell.hpp>
+#include <arbor/cv_policy.hpp>
 #include <arbor/domain_decomposition.hpp>
 #include <arbor/load_balance.hpp>
 #include <arbor/recipe.hpp>
@@ -12,124 +20,168 @@
 
 #include "cell_group_factory.hpp"
 #include "execution_context.hpp"
+#include "fvm_layout.hpp"
+#include "gap_junction_components.hpp"
+#include "graph_partition.hpp"
 #include "gpu_context.hpp"
 #include "util/maputil.hpp"
 #include "util/partition.hpp"
+#include "util/rangeutil.hpp"
 #include "util/span.hpp"
 #include "util/strprintf.hpp"
 
 namespace arb {
 
-domain_decomposition partition_load_balance(
-    const recipe& rec,
-    const context& ctx,
-    partition_hint_map hint_map)
-{
-    const bool gpu_avail = ctx->gpu->has_gpu();
-
-    struct partition_gid_domain {
-        partition_gid_domain(const gathered_vector<cell_gid_type>& divs, unsigned domains) {
-            auto rank_part = util::partition_view(divs.partition());
-            for (auto rank: count_along(rank_part)) {
-                for (auto gid: util::subrange_view(divs.values(), rank_part[rank])) {
-                    gid_map[gid] = rank;
-                }
+namespace {
+
+// Domain of a gid given a table of disjoint intervals of gids, each of which
+// belongs to one domain. Lookup is a binary search over the intervals, so
+// that the table is compact and fast when the domains hold few, long runs of
+// consecutive gids.
+struct interval_gid_domain {
+    struct interval {
+        cell_gid_type begin;
+        cell_gid_type end;
+        int domain;
+    };
+
+    explicit interval_gid_domain(std::vector<interval> table) {
+        std::sort(table.begin(), table.end(),
+            [](const interval& a, const interval& b) { return a.begin<b.begin; });
+
+        // Merge adjacent intervals of the same domain.
+        for (const auto& i: table) {
+            if (!begins.empty() && ends.back()==i.begin && domains.back()==i.domain) {
+                ends.back() = i.end;
+            }
+            else {
+                begins.push_back(i.begin);
+                ends.push_back(i.end);
+                domains.push_back(i.domain);
             }
         }
+    }
 
-        int operator()(cell_gid_type gid) const {
-            return gid_map.at(gid);
+    int operator()(cell_gid_type gid) const {
+        auto k = std::upper_bound(begins.begin(), begins.end(), gid)-begins.begin();
+        if (k==0 || gid>=ends[k-1]) {
+            throw std::out_of_range(util::pprintf("gid {} is not in the domain decomposition", gid));
         }
+        return domains[k-1];
+    }
 
-        std::unordered_map<cell_gid_type, int> gid_map;
-    };
+    std::vector<cell_gid_type> begins;
+    std::vector<cell_gid_type> ends;
+    std::vector<int> domains;
+};
 
-    struct cell_identifier {
-        cell_gid_type id;
-        bool is_super_cell;
-    };
+// The intervals of consecutive gids in a set of gids, as a flat list of
+// boundaries: begin_0, end_0, begin_1, end_1, ...
+std::vector<cell_gid_type> gid_intervals(std::vector<cell_gid_type> gids) {
+    std::sort(gids.begin(), gids.end());
 
-    using util::make_span;
+    std::vector<cell_gid_type> bounds;
+    for (auto gid: gids) {
+        if (!bounds.empty() && bounds.back()==gid) {
+            ++bounds.back();
+        }
+        else {
+            bounds.push_back(gid);
+            bounds.push_back(gid+1);
+        }
+    }
+    return bounds;
+}
 
-    unsigned num_domains = ctx->distributed->size();
-    unsigned domain_id = ctx->distributed->id();
-    auto num_global_cells = rec.num_cells();
+// The gid_domain of a decomposition where each domain holds the given local
+// gids. Only the boundaries of the intervals of consecutive local gids are
+// exchanged between domains, not the gids themselves.
+interval_gid_domain gather_gid_domain(const std::vector<cell_gid_type>& local_gids, const context& ctx) {
+    auto bounds = ctx->distributed->gather_gids(gid_intervals(local_gids));
+    const auto& values = bounds.values();
+    auto dom_part = util::partition_view(bounds.partition());
+
+    std::vector<interval_gid_domain::interval> table;
+    for (auto dom: count_along(dom_part)) {
+        for (auto i = dom_part[dom].first; i<dom_part[dom].second; i += 2) {
+            table.push_back({values[i], values[i+1], int(dom)});
+        }
+    }
+    return interval_gid_domain(std::move(table));
+}
 
-    auto dom_size = [&](unsigned dom) -> cell_gid_type {
-        const cell_gid_type B = num_global_cells/num_domains;
-        const cell_gid_type R = num_global_cells - num_domains*B;
-        return B + (dom<R);
-    };
+// Domain of a gid when each domain holds a contiguous range of gids:
+// domain i holds the gids in [divisions[i], divisions[i+1]).
+struct range_gid_domain {
+    explicit range_gid_domain(std::vector<cell_gid_type> divs): divisions(std::move(divs)) {}
 
-    // Global load balance
+    int operator()(cell_gid_type gid) const {
+        auto it = std::upper_bound(divisions.begin()+1, divisions.end()-1, gid);
+        return int(it-divisions.begin())-1;
+    }
 
-    std::vector<cell_gid_type> gid_divisions;
-    auto gid_part = make_partition(
-        gid_divisions, transform_view(make_span(num_domains), dom_size));
+    std::vector<cell_gid_type> divisions;
+};
 
-    // Local load balance
+struct cell_identifier {
+    cell_gid_type id;
+    bool is_super_cell;
+};
 
-    std::vector<std::vector<cell_gid_type>> super_cells; //cells connected by gj
+// The cells that are simulated on the domain that is assigned the gids
+// in [lo, hi): cells without gap junctions in the range, and the super cells
+// of cells connected by gap junctions whose smallest gid is in the range.
+struct local_cells {
+    // Cells connected by gap junctions, with sorted gids.
+    std::vector<std::vector<cell_gid_type>> super_cells;
+
+    // All local gids.
+    std::vector<cell_gid_type> gids;
+
+    // Maps a cell_kind to a vector of either:
+    // 1. gids of regular cells
+    // 2. indices of super cells (in super_cells)
+    std::unordered_map<cell_kind, std::vector<cell_identifier>> kind_lists;
+};
+
+local_cells find_local_cells(const recipe& rec, cell_gid_type lo, cell_gid_type hi, const context& ctx) {
+    local_cells local;
+    auto& super_cells = local.super_cells;
     std::vector<cell_gid_type> reg_cells; //independent cells
 
-    // Map to track visited cells (cells that already belong to a group)
-    std::unordered_set<cell_gid_type> visited;
-
-    // Connected components algorithm using BFS
-    std::queue<cell_gid_type> q;
-    for (auto gid: make_span(gid_part[domain_id])) {
-        if (!rec.gap_junctions_on(gid).empty()) {
-            // If cell hasn't been visited yet, must belong to new super_cell
-            // Perform BFS starting from that cell
-            if (!visited.count(gid)) {
-                visited.insert(gid);
-                std::vector<cell_gid_type> cg;
-                q.push(gid);
-                while (!q.empty()) {
-                    auto element = q.front();
-                    q.pop();
-                    cg.push_back(element);
-                    // Adjacency list
-                    auto conns = rec.gap_junctions_on(element);
-                    for (auto c: conns) {
-                        if (element != c.local.gid && element != c.peer.gid) {
-                            throw bad_gj_connection_gid(element, c.local.gid, c.peer.gid);
-                        }
-                        cell_member_type other = c.local.gid == element ? c.peer : c.local;
-
-                        if (!visited.count(other.gid)) {
-                            visited.insert(other.gid);
-                            q.push(other.gid);
-                        }
-                    }
-                }
-                super_cells.push_back(cg);
-            }
+    std::vector<cell_gid_type> range(hi-lo);
+    std::iota(range.begin(), range.end(), lo);
+    auto gj = find_gap_junction_components(rec, std::move(range), false, ctx->thread_pool);
+
+    std::vector<std::vector<cell_gid_type>> components(gj.num_components);
+    for (auto i: util::count_along(gj.gids)) {
+        components[gj.component[i]].push_back(gj.gids[i]);
+    }
+
+    // Every component has its first cell in [lo, hi), as the other cells
+    // were found through the gap junctions of the cells in the range.
+    unsigned next = 0;
+    for (auto i: util::make_span(hi-lo)) {
+        auto c = gj.component[i];
+        if (c<next) continue;
+        ++next;
+
+        auto& cg = components[c];
+        if (cg.size()==1 && gj.gap_junctions[i].empty()) {
+            // If cell has no gap_junctions, put in separate group of independent cells
+            reg_cells.push_back(cg.front());
         }
         else {
-            // If cell has no gap_junctions, put in separate group of independent cells
-            reg_cells.push_back(gid);
+            // Only keep super cells where the first element in the group belongs to domain
+            std::sort(cg.begin(), cg.end());
+            if (cg.front()>=lo) super_cells.push_back(std::move(cg));
         }
     }
 
-    // Sort super_cell groups and only keep those where the first element in the group belongs to domain
-    super_cells.erase(std::remove_if(super_cells.begin(), super_cells.end(),
-            [gid_part, domain_id](std::vector<cell_gid_type>& cg)
-            {
-                std::sort(cg.begin(), cg.end());
-                return cg.front() < gid_part[domain_id].first;
-            }), super_cells.end());
-
     // Collect local gids that belong to this rank, and sort gids into kind lists
-    // kind_lists maps a cell_kind to a vector of either:
-    // 1. gids of regular cells (in reg_cells)
-    // 2. indices of supercells (in super_cells)
-
-    std::vector<cell_gid_type> local_gids;
-    std::unordered_map<cell_kind, std::vector<cell_identifier>> kind_lists;
     for (auto gid: reg_cells) {
-        local_gids.push_back(gid);
-        kind_lists[rec.get_cell_kind(gid)].push_back({gid, false});
+        local.gids.push_back(gid);
+        local.kind_lists[rec.get_cell_kind(gid)].push_back({gid, false});
     }
 
     for (unsigned i = 0; i < super_cells.size(); i++) {
@@ -138,57 +190,244 @@ domain_decomposition partition_load_balance(
             if (rec.get_cell_kind(gid) != kind) {
                 throw gj_kind_mismatch(gid, super_cells[i].front());
             }
-            local_gids.push_back(gid);
+            local.gids.push_back(gid);
         }
-        kind_lists[kind].push_back({i, true});
+        local.kind_lists[kind].push_back({i, true});
     }
 
+    return local;
+}
 
-    // Create a flat vector of the cell kinds present on this node,
-    // partitioned such that kinds for which GPU implementation are
-    // listed before the others. This is a very primitive attempt at
-    // scheduling; the cell_groups that run on the GPU will be executed
-    // before other cell_groups, which is likely to be more efficient.
-    //
-    // TODO: This creates an dependency between the load balancer and
-    // the threading internals. We need support for setting the priority
-    // of cell group updates according to rules such as the back end on
-    // which the cell group is running.
-
+// Create a flat vector of the cell kinds present on this node,
+// partitioned such that kinds for which GPU implementation are
+// listed before the others, so that the cell_groups that run on the
+// GPU are started first in the first epoch of a simulation. After
+// that, the simulation starts the cell groups in order of their
+// measured advance times, longest first.
+std::vector<cell_kind> local_kinds(const local_cells& local, const context& ctx) {
     auto has_gpu_backend = [&ctx](cell_kind c) {
         return cell_kind_supported(c, backend_kind::gpu, *ctx);
     };
 
     std::vector<cell_kind> kinds;
-    for (auto l: kind_lists) {
+    for (auto l: local.kind_lists) {
         kinds.push_back(cell_kind(l.first));
     }
     std::partition(kinds.begin(), kinds.end(), has_gpu_backend);
+    return kinds;
+}
+
+// The back end and the suggested number of cells in each group for cells of kind k.
+std::pair<backend_kind, std::size_t> group_backend_size(cell_kind k, const partition_hint_map& hint_map, const context& ctx) {
+    partition_hint hint;
+    if (auto opt_hint = util::value_by_key(hint_map, k)) {
+        hint = opt_hint.value();
+        if(!hint.cpu_group_size) {
+            throw arbor_exception(arb::util::pprintf("unable to perform load balancing because {} has invalid suggested cpu_cell_group size of {}", k, hint.cpu_group_size));
+        }
+        if(hint.prefer_gpu && !hint.gpu_group_size) {
+            throw arbor_exception(arb::util::pprintf("unable to perform load balancing because {} has invalid suggested gpu_cell_group size of {}", k, hint.gpu_group_size));
+        }
+    }
+
+    backend_kind backend = backend_kind::multicore;
+    std::size_t group_size = hint.cpu_group_size;
+
+    if (hint.prefer_gpu && ctx->gpu->has_gpu() && cell_kind_supported(k, backend_kind::gpu, *ctx)) {
+        backend = backend_kind::gpu;
+        group_size = hint.gpu_group_size;
+    }
+    return {backend, group_size};
+}
+
+// Pack the local cells of each kind into groups of about the same total cost,
+// where the number of groups is chosen such that groups hold
+// hint.cpu_group_size (or gpu_group_size) cells on average. Cells are
+// assigned in descending order of cost to the group with the lowest total
+// cost so far, keeping the members of each super cell together.
+//
+// The cost of each local cell is given by local_cost, which looks up the
+// costs already evaluated for the global load balance.
+std::vector<group_description> pack_groups_by_cost(
+    const local_cells& local,
+    const std::function<double(cell_gid_type)>& local_cost,
+    const partition_hint_map& hint_map,
+    const context& ctx)
+{
+    const auto& super_cells = local.super_cells;
 
     std::vector<group_description> groups;
-    for (auto k: kinds) {
-        partition_hint hint;
-        if (auto opt_hint = util::value_by_key(hint_map, k)) {
-            hint = opt_hint.value();
-            if(!hint.cpu_group_size) {
-                throw arbor_exception(arb::util::pprintf("unable to perform load balancing because {} has invalid suggested cpu_cell_group size of {}", k, hint.cpu_group_size));
+    for (auto k: local_kinds(local, ctx)) {
+        auto [backend, group_size] = group_backend_size(k, hint_map, ctx);
+        const auto& cells = local.kind_lists.at(k);
+
+        struct item {
+            double cost;
+            cell_identifier cell;
+        };
+        std::vector<item> items;
+        std::size_t num_cells = 0;
+        for (auto cell: cells) {
+            double c = 0;
+            if (cell.is_super_cell) {
+                for (auto gid: super_cells[cell.id]) c += local_cost(gid);
+                num_cells += super_cells[cell.id].size();
             }
-            if(hint.prefer_gpu && !hint.gpu_group_size) {
-                throw arbor_exception(arb::util::pprintf("unable to perform load balancing because {} has invalid suggested gpu_cell_group size of {}", k, hint.gpu_group_size));
+            else {
+                c = local_cost(cell.id);
+                ++num_cells;
             }
+            items.push_back({c, cell});
+        }
+        std::stable_sort(items.begin(), items.end(),
+            [](const item& a, const item& b) { return a.cost>b.cost; });
+
+        const std::size_t num_groups = std::min(items.size(), num_cells/group_size + (num_cells%group_size!=0));
+
+        // Min-heap of (cost, group index), to find the least expensive group.
+        using bin = std::pair<double, std::size_t>;
+        std::priority_queue<bin, std::vector<bin>, std::greater<bin>> bins;
+        for (std::size_t b = 0; b < num_groups; ++b) bins.push({0., b});
+
+        std::vector<std::vector<cell_identifier>> group_cells(num_groups);
+        for (auto& it: items) {
+            auto [c, b] = bins.top();
+            bins.pop();
+            group_cells[b].push_back(it.cell);
+            bins.push({c+it.cost, b});
         }
 
-        backend_kind backend = backend_kind::multicore;
-        std::size_t group_size = hint.cpu_group_size;
-
-        if (hint.prefer_gpu && gpu_avail && has_gpu_backend(k)) {
-            backend = backend_kind::gpu;
-            group_size = hint.gpu_group_size;
+        // The members of a super cell are consecutive in the group, and the
+        // cells of a group are sorted by their first gid.
+        auto first_gid = [&](const cell_identifier& cell) {
+            return cell.is_super_cell? super_cells[cell.id].front(): cell.id;
+        };
+        for (auto& gc: group_cells) {
+            std::sort(gc.begin(), gc.end(),
+                [&](const cell_identifier& a, const cell_identifier& b) { return first_gid(a)<first_gid(b); });
+            std::vector<cell_gid_type> group_elements;
+            for (auto cell: gc) {
+                if (cell.is_super_cell) {
+                    util::append(group_elements, super_cells[cell.id]);
+                }
+                else {
+                    group_elements.push_back(cell.id);
+                }
+            }
+            groups.push_back({k, std::move(group_elements), backend});
         }
+    }
+    return groups;
+}
+
+// The gid_domain of a decomposition in which domain i is assigned the gids in
+// [divisions[i], divisions[i+1]), and holds the given local cells. Super
+// cells are simulated on the domain of their smallest gid, so if a super cell
+// has members in the ranges of more than one domain, the domains do not hold
+// contiguous ranges of gids, and the intervals of the local gids of all
+// domains are gathered instead.
+std::function<int(cell_gid_type)> make_gid_domain(
+    const local_cells& local,
+    std::vector<cell_gid_type> divisions,
+    const context& ctx)
+{
+    const auto hi = divisions[ctx->distributed->id()+1];
+    int spans_domains = std::any_of(local.super_cells.begin(), local.super_cells.end(),
+        [hi](const std::vector<cell_gid_type>& cg) { return cg.back()>=hi; });
+
+    if (ctx->distributed->max(spans_domains)) {
+        return gather_gid_domain(local.gids, ctx);
+    }
+    return range_gid_domain(std::move(divisions));
+}
+
+// The division of the gids [0, num_cells) into equal shares, one for each
+// domain: the load balancers evaluate the cost function on each domain for
+// the gids in its share.
+std::vector<cell_gid_type> cost_share_divisions(cell_size_type num_cells, unsigned num_domains) {
+    auto dom_size = [&](unsigned dom) -> cell_gid_type {
+        const cell_gid_type B = num_cells/num_domains;
+        const cell_gid_type R = num_cells - num_domains*B;
+        return B + (dom<R);
+    };
+
+    std::vector<cell_gid_type> divisions;
+    make_partition(divisions, transform_view(util::make_span(num_domains), dom_size));
+    return divisions;
+}
+
+// The partition of sorted gids by the shares given by divisions, for
+// sending each gid to the domain whose share holds it.
+distributed_context::count_vector share_partition(
+    const std::vector<cell_gid_type>& gids,
+    const std::vector<cell_gid_type>& divisions)
+{
+    const auto num_domains = divisions.size()-1;
+    distributed_context::count_vector partition = {0};
+    for (unsigned d = 0; d<num_domains; ++d) {
+        auto end = std::lower_bound(gids.begin(), gids.end(), divisions[d+1]);
+        partition.push_back(d+1<num_domains? end-gids.begin(): gids.size());
+    }
+    return partition;
+}
+
+// The costs of the cells with the sorted gids, where each domain holds the
+// costs share_cost of the gids in its share: the gids are sent to the
+// domains whose shares hold them, which send back their costs.
+std::vector<double> fetch_share_costs(
+    const std::vector<cell_gid_type>& gids,
+    const std::vector<double>& share_cost,
+    const std::vector<cell_gid_type>& share_divisions,
+    const context& ctx)
+{
+    auto requests = ctx->distributed->all_to_all_gids(gids, share_partition(gids, share_divisions));
+
+    const auto lo = share_divisions[ctx->distributed->id()];
+    std::vector<double> replies;
+    replies.reserve(requests.values().size());
+    for (auto gid: requests.values()) {
+        replies.push_back(share_cost[gid-lo]);
+    }
+    return ctx->distributed->all_to_all(replies, requests.partition()).values();
+}
+
+} // namespace
+
+domain_decomposition partition_load_balance(
+    const recipe& rec,
+    const context& ctx,
+    partition_hint_map hint_map)
+{
+    using util::make_span;
+
+    unsigned num_domains = ctx->distributed->size();
+    unsigned domain_id = ctx->distributed->id();
+    auto num_global_cells = rec.num_cells();
+
+    auto dom_size = [&](unsigned dom) -> cell_gid_type {
+        const cell_gid_type B = num_global_cells/num_domains;
+        const cell_gid_type R = num_global_cells - num_domains*B;
+        return B + (dom<R);
+    };
+
+    // Global load balance
+
+    std::vector<cell_gid_type> gid_divisions;
+    auto gid_part = make_partition(
+        gid_divisions, transform_view(make_span(num_domains), dom_size));
+
+    // Local load balance
+
+    auto local = find_local_cells(rec, gid_part[domain_id].first, gid_part[domain_id].second, ctx);
+    auto& super_cells = local.super_cells;
+
+    std::vector<group_description> groups;
+    for (auto k: local_kinds(local, ctx)) {
+        auto [backend, group_size] = group_backend_size(k, hint_map, ctx);
 
         std::vector<cell_gid_type> group_elements;
         // group_elements are sorted such that the gids of all members of a super_cell are consecutive.
-        for (auto cell: kind_lists[k]) {
+        for (auto cell: local.kind_lists[k]) {
             if (cell.is_super_cell == false) {
                 group_elements.push_back(cell.id);
             } else {
@@ -210,11 +449,7 @@ domain_decomposition partition_load_balance(
         }
     }
 
-    cell_size_type num_local_cells = local_gids.size();
-
-    // Exchange gid list with all other nodes
-    // global all-to-all to gather a local copy of the global gid list on each node.
-    auto global_gids = ctx->distributed->gather_gids(local_gids);
+    cell_size_type num_local_cells = local.gids.size();
 
     domain_decomposition d;
     d.num_domains = num_domains;
@@ -222,10 +457,318 @@ domain_decomposition partition_load_balance(
     d.num_local_cells = num_local_cells;
     d.num_global_cells = num_global_cells;
     d.groups = std::move(groups);
-    d.gid_domain = partition_gid_domain(global_gids, num_domains);
+    d.gid_domain = make_gid_domain(local, gid_divisions, ctx);
 
     return d;
 }
 
-} // namespace arb
+domain_decomposition partition_load_balance_weighted(
+    const recipe& rec,
+    const context& ctx,
+    const cell_cost_function& cost,
+    partition_hint_map hint_map)
+{
+    using util::make_span;
+
+    unsigned num_domains = ctx->distributed->size();
+    unsigned domain_id = ctx->distributed->id();
+    auto num_global_cells = rec.num_cells();
+
+    // Each domain evaluates the cost of an equal share of the gids.
+
+    auto share_divisions = cost_share_divisions(num_global_cells, num_domains);
+    auto share = util::partition_view(share_divisions)[domain_id];
+
+    std::vector<double> share_cost;
+    share_cost.reserve(share.second-share.first);
+    for (auto gid: make_span(share)) {
+        double c = cost(gid);
+        if (!(c>=0)) {
+            throw arbor_exception(util::pprintf("unable to perform load balancing because cell {} has invalid cost {}", gid, c));
+        }
+        share_cost.push_back(c);
+    }
+
+    // Global load balance: the gids are partitioned contiguously such that
+    // each domain has about the same total cost. A cell belongs to the domain
+    // in whose cost interval the midpoint of its cost falls, according to the
+    // prefix sum of the costs over all gids.
+
+    double share_total = 0;
+    for (auto c: share_cost) share_total += c;
+    auto share_totals = ctx->distributed->gather_all(share_total);
+
+    std::vector<double> share_offsets(num_domains+1, 0.);
+    std::partial_sum(share_totals.begin(), share_totals.end(), share_offsets.begin()+1);
+    const double total = share_offsets.back();
+
+    // Find the first gid of each domain d>0 whose cost target d*total/D
+    // falls in the costs of our share. Concatenated in the order of the
+    // domains, these are the divisions between all domains.
+    std::vector<cell_gid_type> local_divisions;
+    double prefix = share_offsets[domain_id];
+    std::size_t i = 0;
+    for (unsigned d = 1; total>0 && d < num_domains; ++d) {
+        double target = d*total/num_domains;
+        if (target<share_offsets[domain_id] || target>=share_offsets[domain_id+1]) continue;
+
+        // Skip the cells whose cost midpoint is before the target.
+        while (i<share_cost.size() && prefix+0.5*share_cost[i]<target) {
+            prefix += share_cost[i++];
+        }
+        local_divisions.push_back(share.first+i);
+    }
+
+    std::vector<cell_gid_type> gid_divisions = {0};
+    util::append(gid_divisions, ctx->distributed->gather_gids(local_divisions).values());
+    gid_divisions.push_back(num_global_cells);
+
+    // Fall back to equal numbers of cells per domain if no cell has a cost,
+    // or if the divisions are inconsistent due to rounding.
+    if (gid_divisions.size()!=num_domains+1 || !std::is_sorted(gid_divisions.begin(), gid_divisions.end())) {
+        gid_divisions = share_divisions;
+    }
 
+    const cell_gid_type lo = gid_divisions[domain_id];
+    const cell_gid_type hi = gid_divisions[domain_id+1];
+
+    // Local load balance: the local cells are packed by the costs evaluated
+    // above, which are fetched from the domains whose shares hold them.
+
+    auto local = find_local_cells(rec, lo, hi, ctx);
+
+    auto local_gids = local.gids;
+    std::sort(local_gids.begin(), local_gids.end());
+    auto local_costs = fetch_share_costs(local_gids, share_cost, share_divisions, ctx);
+    auto local_cost = [&](cell_gid_type gid) {
+        auto i = std::lower_bound(local_gids.begin(), local_gids.end(), gid)-local_gids.begin();
+        return local_costs[i];
+    };
+    auto groups = pack_groups_by_cost(local, local_cost, hint_map, ctx);
+
+    domain_decomposition d;
+    d.num_domains = num_domains;
+    d.domain_id = domain_id;
+    d.num_local_cells = local.gids.size();
+    d.num_global_cells = num_global_cells;
+    d.groups = std::move(groups);
+
+    d.gid_domain = make_gid_domain(local, gid_divisions, ctx);
+
+    return d;
+}
+
+domain_decomposition partition_load_balance_graph(
+    const recipe& rec,
+    const context& ctx,
+    const cell_cost_function& cost,
+    partition_hint_map hint_map)
+{
+    using util::make_span;
+
+    unsigned num_domains = ctx->distributed->size();
+    unsigned domain_id = ctx->distributed->id();
+    auto num_global_cells = rec.num_cells();
+
+    // Every domain builds the connectivity graph of the whole model and
+    // partitions it with the same deterministic algorithm, so that all
+    // domains arrive at the same decomposition without communication.
+    // The vertices of the graph are the cells, where the cells of each
+    // super cell are contracted to a single vertex.
+
+    auto all = find_local_cells(rec, 0, num_global_cells, ctx);
+
+    const unsigned no_vertex = -1;
+    std::vector<unsigned> vertex_of(num_global_cells, no_vertex);
+    unsigned num_vertices = 0;
+    for (const auto& cg: all.super_cells) {
+        for (auto gid: cg) vertex_of[gid] = num_vertices;
+        ++num_vertices;
+    }
+    for (auto gid: make_span(num_global_cells)) {
+        if (vertex_of[gid]==no_vertex) vertex_of[gid] = num_vertices++;
+    }
+
+    // As for partition_load_balance_weighted, each domain evaluates the
+    // cost of an equal share of the gids, and the costs are gathered.
+    auto share_divisions = cost_share_divisions(num_global_cells, num_domains);
+    auto share = util::partition_view(share_divisions)[domain_id];
+    std::vector<double> share_cost;
+    share_cost.reserve(share.second-share.first);
+    for (auto gid: make_span(share)) {
+        double c = cost(gid);
+        if (!(c>=0)) {
+            throw arbor_exception(util::pprintf("unable to perform load balancing because cell {} has invalid cost {}", gid, c));
+        }
+        share_cost.push_back(c);
+    }
+    auto costs = ctx->distributed->gather_all(share_cost);
+
+    std::vector<double> weights(num_vertices, 0.);
+    double total = 0;
+    for (auto gid: make_span(num_global_cells)) {
+        double c = costs.values()[gid];
+        weights[vertex_of[gid]] += c;
+        total += c;
+    }
+    // Balance the number of cells if no cell has a cost.
+    if (total==0) {
+        for (auto gid: make_span(num_global_cells)) weights[vertex_of[gid]] += 1;
+    }
+
+    std::vector<std::pair<unsigned, unsigned>> edges;
+    for (auto gid: make_span(num_global_cells)) {
+        for (const auto& c: rec.connections_on(gid)) {
+            if (c.source.gid<num_global_cells) {
+                edges.push_back({vertex_of[c.source.gid], vertex_of[gid]});
+            }
+        }
+    }
+
+    auto part = partition_graph(make_weighted_graph(std::move(weights), edges), num_domains);
+
+    // Local load balance
+
+    local_cells local;
+    local.super_cells = std::move(all.super_cells);
+    for (const auto& [k, cells]: all.kind_lists) {
+        for (auto cell: cells) {
+            const cell_gid_type* first = &cell.id;
+            const cell_gid_type* last = first+1;
+            if (cell.is_super_cell) {
+                first = local.super_cells[cell.id].data();
+                last = first+local.super_cells[cell.id].size();
+            }
+            auto gids = util::make_range(first, last);
+            if (part[vertex_of[*gids.begin()]]==domain_id) {
+                util::append(local.gids, gids);
+                local.kind_lists[k].push_back(cell);
+            }
+        }
+    }
+    std::sort(local.gids.begin(), local.gids.end());
+
+    domain_decomposition d;
+    d.num_domains = num_domains;
+    d.domain_id = domain_id;
+    d.num_local_cells = local.gids.size();
+    d.num_global_cells = num_global_cells;
+    d.groups = pack_groups_by_cost(local, [&costs](cell_gid_type gid) { return costs.values()[gid]; }, hint_map, ctx);
+
+    // The partition is known on every domain, so the table of the intervals
+    // of consecutive gids on the same domain is built without communication.
+    std::vector<interval_gid_domain::interval> table;
+    for (auto gid: make_span(num_global_cells)) {
+        int dom = part[vertex_of[gid]];
+        if (!table.empty() && table.back().domain==dom) {
+            table.back().end = gid+1;
+        }
+        else {
+            table.push_back({gid, gid+1, dom});
+        }
+    }
+    d.gid_domain = interval_gid_domain(std::move(table));
+
+    return d;
+}
+
+cell_cost_function measured_cell_cost(
+    const domain_decomposition& decomp,
+    const std::vector<double>& group_times,
+    const context& ctx)
+{
+    if (group_times.size()!=decomp.groups.size()) {
+        throw arbor_exception(util::pprintf("the number of group times {} does not match the number of cell groups {}",
+            group_times.size(), decomp.groups.size()));
+    }
+
+    // Send the measured cost of each local cell to the domain whose share
+    // of the gids holds the cell, so that each domain only holds the costs
+    // of the gids for which the load balancers evaluate the cost function.
+    const unsigned num_domains = ctx->distributed->size();
+    const auto divisions = cost_share_divisions(decomp.num_global_cells, num_domains);
+
+    std::vector<std::pair<cell_gid_type, double>> local;
+    for (auto i: util::count_along(decomp.groups)) {
+        const auto& group = decomp.groups[i];
+        for (auto gid: group.gids) {
+            local.push_back({gid, group_times[i]/group.gids.size()});
+        }
+    }
+    std::sort(local.begin(), local.end());
+
+    std::vector<cell_gid_type> gids;
+    std::vector<double> costs;
+    double local_total = 0;
+    for (auto [gid, c]: local) {
+        gids.push_back(gid);
+        costs.push_back(c);
+        local_total += c;
+    }
+
+    auto partition = share_partition(gids, divisions);
+    auto share_gids = ctx->distributed->all_to_all_gids(gids, partition);
+    auto share_costs = ctx->distributed->all_to_all(costs, partition);
+
+    const double total = ctx->distributed->sum(local_total);
+    const auto count = ctx->distributed->sum((unsigned long long)gids.size());
+    const double mean = count? total/count: 0.;
+
+    // The costs of the gids in the share, where NaN marks gids without a measurement.
+    const auto share = util::partition_view(divisions)[ctx->distributed->id()];
+    auto table = std::make_shared<std::vector<double>>(share.second-share.first, std::nan(""));
+    for (auto i: util::count_along(share_gids.values())) {
+        auto gid = share_gids.values()[i];
+        if (gid>=share.first && gid<share.second) {
+            (*table)[gid-share.first] = share_costs.values()[i];
+        }
+    }
+
+    return [table, lo = share.first, mean](cell_gid_type gid) {
+        if (gid<lo || gid-lo>=table->size() || std::isnan((*table)[gid-lo])) return mean;
+        return (*table)[gid-lo];
+    };
+}
+
+double estimate_cell_cost(const recipe& rec, cell_gid_type gid) {
+    using std::any_cast;
+
+    if (rec.get_cell_kind(gid)!=cell_kind::cable) return 1.;
+
+    cable_cell cell;
+    try {
+        cell = any_cast<cable_cell&&>(rec.get_cell_description(gid));
+    }
+    catch (std::bad_any_cast&) {
+        throw bad_cell_description(cell_kind::cable, gid);
+    }
+
+    cable_cell_global_properties global_props;
+    try {
+        std::any rec_props = rec.get_global_properties(cell_kind::cable);
+        if (rec_props.has_value()) {
+            global_props = any_cast<cable_cell_global_properties>(rec_props);
+        }
+    }
+    catch (std::bad_any_cast&) {
+        throw bad_global_property(cell_kind::cable);
+    }
+
+    const auto& dflt = cell.default_parameters();
+    const auto& global_dflt = global_props.default_parameters;
+    auto boundaries =
+        dflt.discretization? dflt.discretization->cv_boundary_points(cell):
+        global_dflt.discretization? global_dflt.discretization->cv_boundary_points(cell):
+        default_cv_policy().cv_boundary_points(cell);
+
+    double num_cv = std::max<std::size_t>(cv_geometry_from_ends(cell, boundaries).size(), 1);
+    double num_density = cell.region_assignments().get<mechanism_desc>().size();
+    double num_point = 0;
+    for (const auto& [name, placed]: cell.synapses()) {
+        num_point += placed.size();
+    }
+
+    return num_cv*(1+num_density) + num_point;
+}
+
+} // namespace arb
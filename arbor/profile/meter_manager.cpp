@@ -1,3 +1,5 @@
+#include <algorithm>
+
 #include <arbor/profile/timer.hpp>
 
 #include <arbor/profile/meter_manager.hpp>
@@ -11,6 +13,7 @@
 #include "util/hostname.hpp"
 #include "util/strprintf.hpp"
 #include "util/rangeutil.hpp"
+#include "util/span.hpp"
 
 namespace arb {
 namespace profile {
@@ -134,6 +137,7 @@ std::ostream& operator<<(std::ostream& o, const meter_report& report) {
     for (auto const& m: report.meters) {
         if (m.name=="time") {
             o << strprintf("%16s", "time(s)");
+            o << strprintf("%16s", "imbalance");
         }
         else if (m.name.find("memory")!=std::string::npos) {
             o << strprintf("%16s", m.name+"(MB)");
@@ -147,6 +151,13 @@ std::ostream& operator<<(std::ostream& o, const meter_report& report) {
     }
     o << "\n-------------------------------------------------------------------------------------------\n";
     std::vector<double> sums(report.meters.size());
+    // The load imbalance of an interval is the ratio of the maximum to the
+    // mean time over the ranks.
+    auto imbalance = [](const std::vector<double>& times) {
+        double mean = algorithms::mean(times);
+        return mean>0? *std::max_element(times.begin(), times.end())/mean: 1.;
+    };
+    std::vector<double> rank_times;
     int cp_index = 0;
     for (auto name: report.checkpoints) {
         name.resize(20);
@@ -158,6 +169,13 @@ std::ostream& operator<<(std::ostream& o, const meter_report& report) {
                 double time = algorithms::mean(m.measurements[cp_index]);
                 sums[m_index] += time;
                 o << strprintf("%16.3f", time);
+                o << strprintf("%16.3f", imbalance(m.measurements[cp_index]));
+
+                // Accumulate the time of each rank over the checkpoints.
+                rank_times.resize(m.measurements[cp_index].size());
+                for (auto i: util::count_along(rank_times)) {
+                    rank_times[i] += m.measurements[cp_index][i];
+                }
             }
             else if (m.name.find("memory")!=std::string::npos) {
                 // Calculate the average memory per rank in MB.
@@ -188,8 +206,11 @@ std::ostream& operator<<(std::ostream& o, const meter_report& report) {
 
     // Print a final line with the accumulated values of each meter.
     o << strprintf("%-21s", "meter-total");
-    for (const auto& v: sums) {
-        o << strprintf("%16.3f", v);
+    for (auto i: util::count_along(sums)) {
+        o << strprintf("%16.3f", sums[i]);
+        if (report.meters[i].name=="time") {
+            o << strprintf("%16.3f", rank_times.empty()? 1.: imbalance(rank_times));
+        }
     }
     o << "\n";
 
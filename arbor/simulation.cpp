@@ -1,4 +1,9 @@
+#include <algorithm>
+#include <deque>
+#include <functional>
 #include <memory>
+#include <numeric>
+#include <queue>
 #include <set>
 #include <vector>
 
@@ -6,6 +11,7 @@
 #include <arbor/context.hpp>
 #include <arbor/domain_decomposition.hpp>
 #include <arbor/generic_event.hpp>
+#include <arbor/profile/timer.hpp>
 #include <arbor/recipe.hpp>
 #include <arbor/schedule.hpp>
 #include <arbor/simulation.hpp>
@@ -71,10 +77,25 @@ public:
         return communicator_.num_spikes();
     }
 
+    const std::vector<double>& group_advance_times() const {
+        return group_advance_time_;
+    }
+
     void set_binning_policy(binning_kind policy, time_type bin_interval);
 
     void inject_events(const pse_vector& events);
 
+    void set_spike_exchange(spike_exchange_kind kind) {
+        communicator_.set_exchange_kind(kind);
+    }
+
+    void set_spike_exchange_depth(unsigned depth) {
+        if (!depth) {
+            throw arbor_exception("spike exchange depth must be at least 1");
+        }
+        exchange_depth_ = depth;
+    }
+
     spike_export_function global_export_callback_;
     spike_export_function local_export_callback_;
 
@@ -92,8 +113,27 @@ private:
 
     time_type t_ = 0.;
     time_type min_delay_;
+
+    // Number of epochs over which each spike exchange is overlapped with
+    // cell updates.
+    unsigned exchange_depth_ = 1;
     std::vector<cell_group_ptr> cell_groups_;
 
+    // Wall time in seconds spent advancing each cell group since
+    // construction or the last reset.
+    std::vector<double> group_advance_time_;
+
+    // The order in which the tasks of the cell groups are started: in
+    // descending order of advance time, so that the most expensive groups
+    // are not left until last (longest processing time first).
+    std::vector<cell_size_type> group_order_;
+
+    // If the threads of the thread pool are bound to cpus, the thread that
+    // updates each cell group, and the advance times of the groups at the
+    // last time the groups were assigned to threads.
+    std::vector<int> group_thread_;
+    std::vector<double> group_advance_time_mark_;
+
     // one set of event_generators for each local cell
     std::vector<std::vector<event_generator>> event_generators_;
 
@@ -120,16 +160,85 @@ private:
     // Apply a functional to each cell group in parallel.
     template <typename L>
     void foreach_group(L&& fn) {
-        threading::parallel_for::apply(0, cell_groups_.size(), task_system_.get(),
-            [&, fn = std::forward<L>(fn)](int i) { fn(cell_groups_[i]); });
+        foreach_group_index([&](cell_group_ptr& group, int) { fn(group); });
     }
 
     // Apply a functional to each cell group in parallel, supplying
     // the cell group pointer reference and index.
+    // If the threads of the thread pool are bound to cpus, each cell group
+    // is assigned to the thread given by group_thread_, on which its state
+    // is allocated when it is constructed, and which updates it thereafter.
+    // The tasks are started in the order given by group_order_.
     template <typename L>
     void foreach_group_index(L&& fn) {
-        threading::parallel_for::apply(0, cell_groups_.size(), task_system_.get(),
-            [&, fn = std::forward<L>(fn)](int i) { fn(cell_groups_[i], i); });
+        const int n = cell_groups_.size();
+        if (task_system_->binding()==thread_binding_kind::none) {
+            threading::parallel_for::apply(0, n, 1, task_system_.get(),
+                [&](int k) { int i = group_order_[k]; fn(cell_groups_[i], i); });
+            return;
+        }
+
+        threading::task_group g(task_system_.get());
+        for (int i: group_order_) {
+            g.run([&, i] { fn(cell_groups_[i], i); }, group_thread_[i]);
+        }
+        g.wait();
+    }
+
+    // Reassign the cell groups to threads according to the advance times
+    // measured since the last assignment: in descending order of advance
+    // time, each group is assigned to the thread with the lowest total.
+    // The state of a group stays in the memory local to the thread that
+    // allocated it, so the new assignment is only used if it reduces the
+    // advance time of the slowest thread by more than 10%.
+    void rebalance_threads() {
+        const auto nthreads = task_system_->get_num_threads();
+        const auto n = cell_groups_.size();
+
+        std::vector<double> times(n);
+        for (std::size_t i = 0; i<n; ++i) {
+            times[i] = group_advance_time_[i]-group_advance_time_mark_[i];
+        }
+        group_advance_time_mark_ = group_advance_time_;
+
+        std::vector<double> current(nthreads, 0.);
+        for (std::size_t i = 0; i<n; ++i) {
+            current[group_thread_[i]] += times[i];
+        }
+        const double current_max = *std::max_element(current.begin(), current.end());
+        if (current_max==0) return;
+
+        std::vector<cell_size_type> order(n);
+        std::iota(order.begin(), order.end(), 0);
+        std::stable_sort(order.begin(), order.end(),
+            [&](cell_size_type a, cell_size_type b) { return times[a]>times[b]; });
+
+        // Min-heap of (advance time, thread).
+        using bin = std::pair<double, int>;
+        std::priority_queue<bin, std::vector<bin>, std::greater<bin>> bins;
+        for (int t = 0; t<nthreads; ++t) bins.push({0., t});
+
+        std::vector<int> thread(n);
+        double balanced_max = 0;
+        for (auto i: order) {
+            auto [time, t] = bins.top();
+            bins.pop();
+            thread[i] = t;
+            bins.push({time+times[i], t});
+            balanced_max = std::max(balanced_max, time+times[i]);
+        }
+
+        if (balanced_max<0.9*current_max) {
+            group_thread_ = std::move(thread);
+        }
+    }
+
+    // Order the cell groups for longest processing time first scheduling.
+    void update_group_order() {
+        std::stable_sort(group_order_.begin(), group_order_.end(),
+            [&](cell_size_type a, cell_size_type b) {
+                return group_advance_time_[a]>group_advance_time_[b];
+            });
     }
 };
 
@@ -168,6 +277,15 @@ simulation_state::simulation_state(
 
     // Generate the cell groups in parallel, with one task per cell group.
     cell_groups_.resize(decomp.groups.size());
+    group_advance_time_.assign(cell_groups_.size(), 0.);
+    group_order_.resize(cell_groups_.size());
+    std::iota(group_order_.begin(), group_order_.end(), 0);
+    group_advance_time_mark_.assign(cell_groups_.size(), 0.);
+    group_thread_.resize(cell_groups_.size());
+    for (auto i: util::count_along(group_thread_)) {
+        // Contiguous blocks of groups of about the same size.
+        group_thread_[i] = i*task_system_->get_num_threads()/cell_groups_.size();
+    }
     foreach_group_index(
         [&](cell_group_ptr& group, int i) {
             const auto& group_info = decomp.groups[i];
@@ -185,9 +303,12 @@ simulation_state::simulation_state(
 void simulation_state::reset() {
     t_ = 0.;
 
-    // Reset cell group state.
+    // Reset cell group state. The measured advance times are cleared, but
+    // the order in which the groups are scheduled is kept.
     foreach_group(
         [](cell_group_ptr& group) { group->reset(); });
+    std::fill(group_advance_time_.begin(), group_advance_time_.end(), 0.);
+    std::fill(group_advance_time_mark_.begin(), group_advance_time_mark_.end(), 0.);
 
     // Clear all pending events in the event lanes.
     for (auto& lanes: event_lanes_) {
@@ -218,15 +339,27 @@ time_type simulation_state::run(time_type tfinal, time_type dt) {
     // before communication of spikes is required.
     // If spike exchange and cell update are serialized, this is the
     // minimum delay of the network, however we use half this period
-    // to overlap communication and computation.
-    const time_type t_interval = min_delay_/2;
+    // to overlap communication and computation. With a deeper exchange
+    // pipeline, the period is min_delay/(depth+1), so that each exchange
+    // can overlap depth epochs of cell updates.
+    const time_type t_interval = min_delay_/(exchange_depth_+1);
+
+    // Cell groups bound to threads are rebalanced over the threads according
+    // to their advance times in the previous run.
+    if (task_system_->binding()!=thread_binding_kind::none) {
+        rebalance_threads();
+    }
 
     // task that updates cell state in parallel.
+    // The groups that took longest to advance so far are started first.
     auto update_cells = [&] () {
+        update_group_order();
         foreach_group_index(
             [&](cell_group_ptr& group, int i) {
                 auto queues = util::subrange_view(event_lanes(epoch_.id), communicator_.group_queue_range(i));
+                auto t0 = profile::timer<>::tic();
                 group->advance(epoch_, dt, queues);
+                group_advance_time_[i] += profile::timer<>::toc(t0);
 
                 PE(advance_spikes);
                 local_spikes_->current().insert(group->spikes());
@@ -235,28 +368,54 @@ time_type simulation_state::run(time_type tfinal, time_type dt) {
             });
     };
 
+    // Spike exchanges that have been started but not completed, in the
+    // order in which they were started.
+    std::deque<spike_gather_handle> pending_exchanges;
+
+    // Complete the oldest pending exchange, and generate the events from it.
+    auto complete_exchange = [&] () {
+        auto global_spikes = communicator_.complete_exchange(pending_exchanges.front());
+        pending_exchanges.pop_front();
+
+        PE(communication_spikeio);
+        if (global_export_callback_) {
+            global_export_callback_(global_spikes.values());
+        }
+        PL();
+
+        communicator_.make_event_queues(global_spikes, pending_events_);
+    };
+
     // task that performs spike exchange with the spikes generated in
     // the previous integration period, generating the postsynaptic
     // events that must be delivered at the start of the next
     // integration period at the latest.
+    //
+    // The spikes generated in epoch k-1 are sent during epoch k. The
+    // earliest events they generate are min_delay after the start of epoch
+    // k-1, that is, at the start of epoch k+depth. So the exchange only has
+    // to be completed in epoch k+depth-1, allowing up to depth-1 exchanges
+    // to be in flight while cells are updated.
     auto exchange = [&] () {
-        PE(communication_exchange_gatherlocal);
+        // gather() profiles its own parallel tasks.
         auto local_spikes = local_spikes_->previous().gather();
-        PL();
-        auto global_spikes = communicator_.exchange(local_spikes);
 
         PE(communication_spikeio);
         if (local_export_callback_) {
             local_export_callback_(local_spikes);
         }
-        if (global_export_callback_) {
-            global_export_callback_(global_spikes.values());
-        }
         PL();
 
-        PE(communication_walkspikes);
-        communicator_.make_event_queues(global_spikes, pending_events_);
-        PL();
+        pending_exchanges.push_back(communicator_.start_exchange(std::move(local_spikes)));
+
+        // Make progress on the exchanges that stay in flight, and complete
+        // those whose events may be due in the next epoch.
+        for (auto& pending: pending_exchanges) {
+            pending->test();
+        }
+        while (pending_exchanges.size()>=exchange_depth_) {
+            complete_exchange();
+        }
 
         const auto t0 = epoch_.tfinal;
         const auto t1 = std::min(tfinal, t0+t_interval);
@@ -286,9 +445,23 @@ time_type simulation_state::run(time_type tfinal, time_type dt) {
         epoch_.advance(tuntil);
     }
 
-    // Run the exchange one last time to ensure that all spikes are output to file.
+    // Run the exchange one last time to ensure that all spikes are output to file,
+    // and complete all pending exchanges, so that their events are delivered in
+    // subsequent runs.
     local_spikes_->exchange();
-    exchange();
+    // The current buffer holds the spikes from the penultimate epoch, which
+    // have been exchanged already: clear it so that they are not exchanged
+    // again at the start of the next run.
+    local_spikes_->current().clear();
+    auto local_spikes = local_spikes_->previous().gather();
+    if (local_export_callback_) {
+        local_export_callback_(local_spikes);
+    }
+    pending_exchanges.push_back(communicator_.start_exchange(std::move(local_spikes)));
+    while (!pending_exchanges.empty()) {
+        complete_exchange();
+    }
+    setup_events(epoch_.tfinal, std::min(tfinal, epoch_.tfinal+t_interval), epoch_.id);
 
     return t_;
 }
@@ -477,10 +650,22 @@ std::size_t simulation::num_spikes() const {
     return impl_->num_spikes();
 }
 
+std::vector<double> simulation::group_advance_times() const {
+    return impl_->group_advance_times();
+}
+
 void simulation::set_binning_policy(binning_kind policy, time_type bin_interval) {
     impl_->set_binning_policy(policy, bin_interval);
 }
 
+void simulation::set_spike_exchange(spike_exchange_kind kind) {
+    impl_->set_spike_exchange(kind);
+}
+
+void simulation::set_spike_exchange_depth(unsigned depth) {
+    impl_->set_spike_exchange_depth(depth);
+}
+
 void simulation::set_global_spike_callback(spike_export_function export_callback) {
     impl_->global_export_callback_ = std::move(export_callback);
 }
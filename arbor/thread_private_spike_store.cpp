@@ -1,8 +1,10 @@
+#include <algorithm>
 #include <vector>
 
 #include <arbor/common_types.hpp>
 #include <arbor/spike.hpp>
 
+#include "profile/profiler_macro.hpp"
 #include "threading/enumerable_thread_specific.hpp"
 #include "threading/threading.hpp"
 #include "thread_private_spike_store.hpp"
@@ -11,8 +13,9 @@ namespace arb {
 
 struct local_spike_store_type {
     threading::enumerable_thread_specific<std::vector<spike>> buffers_;
+    task_system_handle task_system_;
 
-    local_spike_store_type(const task_system_handle& ts): buffers_(ts) {};
+    local_spike_store_type(const task_system_handle& ts): buffers_(ts), task_system_(ts) {};
 };
 
 thread_private_spike_store::thread_private_spike_store(thread_private_spike_store&& t):
@@ -25,17 +28,61 @@ thread_private_spike_store::thread_private_spike_store(const task_system_handle&
 
 thread_private_spike_store::~thread_private_spike_store() {}
 
-std::vector<spike> thread_private_spike_store::gather() const {
-    std::vector<spike> spikes;
-    unsigned num_spikes = 0u;
-    for (auto& b: impl_->buffers_) {
+std::vector<spike> thread_private_spike_store::gather() {
+    using iter = std::vector<spike>::const_iterator;
+    auto by_source = [](const spike& a, const spike& b) { return a.source<b.source; };
+
+    auto& buffers = impl_->buffers_;
+    const int num_buffers = buffers.size();
+
+    // Sort the thread private buffers independently of each other. The
+    // profiler regions are entered inside the tasks, because a thread waiting
+    // on the parallel_for can execute other profiled tasks.
+    threading::parallel_for::apply(0, num_buffers, impl_->task_system_.get(),
+        [&](int i) {
+            PE(communication_exchange_gatherlocal);
+            auto& b = *(buffers.begin()+i);
+            if (!std::is_sorted(b.begin(), b.end(), by_source)) {
+                std::sort(b.begin(), b.end(), by_source);
+            }
+            PL();
+        });
+
+    PE(communication_exchange_gatherlocal);
+    // k-way merge of the sorted buffers, using a heap of the ranges that
+    // still hold spikes, ordered such that the range with the smallest
+    // leading source is at the front.
+    std::size_t num_spikes = 0;
+    std::vector<std::pair<iter, iter>> ranges;
+    for (const auto& b: buffers) {
         num_spikes += b.size();
+        if (!b.empty()) ranges.emplace_back(b.begin(), b.end());
     }
+
+    std::vector<spike> spikes;
     spikes.reserve(num_spikes);
 
-    for (auto& b: impl_->buffers_) {
-        spikes.insert(spikes.begin(), b.begin(), b.end());
+    if (ranges.size()==1) {
+        spikes.assign(ranges.front().first, ranges.front().second);
+    }
+    else if (!ranges.empty()) {
+        auto heap_order = [](const std::pair<iter, iter>& a, const std::pair<iter, iter>& b) {
+            return b.first->source<a.first->source;
+        };
+        std::make_heap(ranges.begin(), ranges.end(), heap_order);
+        while (!ranges.empty()) {
+            std::pop_heap(ranges.begin(), ranges.end(), heap_order);
+            auto& r = ranges.back();
+            spikes.push_back(*r.first);
+            if (++r.first==r.second) {
+                ranges.pop_back();
+            }
+            else {
+                std::push_heap(ranges.begin(), ranges.end(), heap_order);
+            }
+        }
     }
+    PL();
 
     return spikes;
 }
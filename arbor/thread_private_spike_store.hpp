@@ -17,7 +17,7 @@ struct local_spike_store_type;
 /// This can be accessed directly using the get() method, which returns a reference to
 /// The thread private buffer of the calling thread.
 /// The insert() and gather() methods add a vector of spikes to the buffer,
-/// and collate all of the buffers into a single vector respectively.
+/// and collate all of the buffers into a single vector sorted by source respectively.
 class thread_private_spike_store {
 public :
     thread_private_spike_store();
@@ -26,9 +26,11 @@ public :
     thread_private_spike_store(thread_private_spike_store&& t);
     thread_private_spike_store(const task_system_handle& ts);
 
-    /// Collate all of the individual buffers into a single vector of spikes.
-    /// Does not modify the buffer contents.
-    std::vector<spike> gather() const;
+    /// Collate all of the individual buffers into a single vector of spikes,
+    /// sorted in ascending order of source.
+    /// The buffers are sorted in parallel and then merged, so the order of the
+    /// spikes in each buffer is modified, but not their contents.
+    std::vector<spike> gather();
 
     /// Return a reference to the thread private buffer of the calling thread
     std::vector<spike>& get();
@@ -14,6 +14,11 @@ class enumerable_thread_specific {
     using storage_class = std::vector<T>;
     storage_class data;
 
+    std::size_t index() const {
+        auto it = thread_ids_.find(std::this_thread::get_id());
+        return it==thread_ids_.end()? 0: it->second;
+    }
+
 public:
     using iterator = typename storage_class::iterator;
     using const_iterator = typename storage_class::const_iterator;
@@ -28,11 +33,13 @@ public:
         data{std::vector<T>(ts->get_num_threads(), init)}
     {}
 
+    // Threads outside the pool share the storage of thread 0, whose place
+    // they take when running tasks.
     T& local() {
-        return data[thread_ids_.at(std::this_thread::get_id())];
+        return data[index()];
     }
     const T& local() const {
-        return data[thread_ids_.at(std::this_thread::get_id())];
+        return data[index()];
     }
 
     auto size() const { return data.size(); }
@@ -1,11 +1,48 @@
+#include <algorithm>
 #include <atomic>
+#include <iterator>
 
+#include "hardware/affinity.hpp"
 #include "threading.hpp"
 
 using namespace arb::threading::impl;
 using namespace arb::threading;
 using namespace arb;
 
+namespace {
+// The cpus to bind each of nthreads threads to, chosen from the cpus
+// available to the calling thread. Empty if threads are not to be bound.
+std::vector<std::vector<int>> binding_cpus(unsigned nthreads, thread_binding_kind binding) {
+    std::vector<std::vector<int>> cpus(nthreads);
+    auto allowed = hw::get_thread_affinity();
+    if (binding==thread_binding_kind::none || allowed.empty()) return cpus;
+
+    if (binding==thread_binding_kind::cores) {
+        for (unsigned i = 0; i < nthreads; i++) {
+            cpus[i] = {allowed[i % allowed.size()]};
+        }
+        return cpus;
+    }
+
+    // Distribute the threads in contiguous blocks over the NUMA nodes with
+    // available cpus, treating all cpus as one node if there is no NUMA
+    // information.
+    std::vector<std::vector<int>> nodes;
+    for (auto& node: hw::numa_node_cpus()) {
+        std::vector<int> available;
+        std::set_intersection(node.begin(), node.end(), allowed.begin(), allowed.end(),
+                              std::back_inserter(available));
+        if (!available.empty()) nodes.push_back(std::move(available));
+    }
+    if (nodes.empty()) nodes.push_back(allowed);
+
+    for (unsigned i = 0; i < nthreads; i++) {
+        cpus[i] = nodes[std::size_t(i)*nodes.size()/nthreads];
+    }
+    return cpus;
+}
+} // namespace
+
 task notification_queue::try_pop() {
     task tsk;
     lock q_lock{q_mutex_, std::try_to_lock};
@@ -16,13 +53,27 @@ task notification_queue::try_pop() {
     return tsk;
 }
 
+task notification_queue::try_pop_bound() {
+    task tsk;
+    lock q_lock{q_mutex_};
+    if (!q_bound_.empty()) {
+        tsk = std::move(q_bound_.front());
+        q_bound_.pop_front();
+    }
+    return tsk;
+}
+
 task notification_queue::pop() {
     task tsk;
     lock q_lock{q_mutex_};
-    while (q_tasks_.empty() && !quit_) {
+    while (q_tasks_.empty() && q_bound_.empty() && !quit_) {
         q_tasks_available_.wait(q_lock);
     }
-    if (!q_tasks_.empty()) {
+    if (!q_bound_.empty()) {
+        tsk = std::move(q_bound_.front());
+        q_bound_.pop_front();
+    }
+    else if (!q_tasks_.empty()) {
         tsk = std::move(q_tasks_.front());
         q_tasks_.pop_front();
     }
@@ -48,6 +99,14 @@ void notification_queue::push(task&& tsk) {
     q_tasks_available_.notify_all();
 }
 
+void notification_queue::push_bound(task&& tsk) {
+    {
+        lock q_lock{q_mutex_};
+        q_bound_.push_back(std::move(tsk));
+    }
+    q_tasks_available_.notify_all();
+}
+
 void notification_queue::quit() {
     {
         lock q_lock{q_mutex_};
@@ -57,11 +116,17 @@ void notification_queue::quit() {
 }
 
 void task_system::run_tasks_loop(int i){
+    if (!thread_cpus_[i].empty()) {
+        hw::set_thread_affinity(thread_cpus_[i]);
+    }
+    if (scheduler_==task_scheduler_kind::work_stealing) {
+        run_tasks_loop_stealing(i);
+        return;
+    }
     while (true) {
-        task tsk;
-        for (unsigned n = 0; n != count_; n++) {
+        task tsk = q_[i].try_pop_bound();
+        for (unsigned n = 0; !tsk && n != count_; n++) {
             tsk = q_[(i + n) % count_].try_pop();
-            if (tsk) break;
         }
         if (!tsk) tsk = q_[i].pop();
         if (!tsk) break;
@@ -69,25 +134,102 @@ void task_system::run_tasks_loop(int i){
     }
 }
 
+void task_system::run_tasks_loop_stealing(int i) {
+    while (true) {
+        if (task* tsk = take_task(i)) {
+            (*tsk)();
+            delete tsk;
+            continue;
+        }
+
+        // Sleep until a task is submitted. The counters are sequentially
+        // consistent, so either a thread submitting a task sees this thread
+        // as sleeping and notifies it, or this thread sees the task as
+        // pending and does not wait.
+        ++sleepers_;
+        {
+            lock sleep_lock{sleep_mutex_};
+            sleep_cv_.wait(sleep_lock, [this, i] { return pending_>0 || bound_pending_[i]>0 || quit_; });
+        }
+        --sleepers_;
+        if (quit_ && pending_==0 && bound_pending_[i]==0) break;
+    }
+}
+
+int task_system::thread_index() const {
+    auto it = thread_ids_.find(std::this_thread::get_id());
+    return it==thread_ids_.end()? -1: int(it->second);
+}
+
+task* task_system::take_task(int i) {
+    task* tsk = nullptr;
+    if (i>=0) tsk = deques_[i]->pop();
+
+    // Threads outside the pool run the tasks bound to thread 0.
+    const int b = std::max(i, 0);
+    if (!tsk && bound_pending_[b]>0) {
+        if (task t = q_[b].try_pop_bound()) {
+            --bound_pending_[b];
+            return new task(std::move(t));
+        }
+    }
+    if (!tsk) {
+        lock q_lock{injected_mutex_, std::try_to_lock};
+        if (q_lock && !injected_.empty()) {
+            tsk = injected_.front();
+            injected_.pop_front();
+        }
+    }
+    for (unsigned n = 1; !tsk && n <= count_; n++) {
+        unsigned victim = (i + n) % count_;
+        if (int(victim) != i) tsk = deques_[victim]->steal();
+    }
+    if (tsk) --pending_;
+    return tsk;
+}
+
 void task_system::try_run_task() {
-    auto nthreads = get_num_threads();
-    task tsk;
-    for (int n = 0; n != nthreads; n++) {
-        tsk = q_[n % nthreads].try_pop();
-        if (tsk) {
-            tsk();
-            break;
+    if (scheduler_==task_scheduler_kind::work_stealing) {
+        if (task* tsk = take_task(thread_index())) {
+            (*tsk)();
+            delete tsk;
         }
+        return;
     }
+
+    // Start with the tasks bound to the calling thread, then its queue.
+    // Threads outside the pool take the place of thread 0.
+    auto nthreads = get_num_threads();
+    auto i = std::max(thread_index(), 0);
+    task tsk = q_[i].try_pop_bound();
+    for (int n = 0; !tsk && n != nthreads; n++) {
+        tsk = q_[(i + n) % nthreads].try_pop();
+    }
+    if (tsk) tsk();
 }
 
 // Default construct with one thread.
 task_system::task_system(): task_system(1) {}
 
-task_system::task_system(int nthreads): count_(nthreads), q_(nthreads) {
+task_system::task_system(int nthreads, task_scheduler_kind scheduler, thread_binding_kind binding):
+    count_(nthreads), scheduler_(scheduler), binding_(binding), q_(nthreads)
+{
     if (nthreads <= 0)
         throw std::runtime_error("Non-positive number of threads in thread pool");
 
+    // The calling thread is thread 0 of the pool. It is not bound, as the
+    // pool does not own it, and the tasks bound to thread 0 are run by any
+    // thread outside the pool that waits on a task group.
+    thread_cpus_ = binding_cpus(count_, binding_);
+
+    if (scheduler_==task_scheduler_kind::work_stealing) {
+        bound_pending_.reset(new std::atomic<long>[count_]);
+        for (unsigned i = 0; i < count_; i++) {
+            deques_.emplace_back(new impl::work_stealing_deque<task*>());
+            bound_pending_[i] = 0;
+        }
+    }
+
     // Main thread
     auto tid = std::this_thread::get_id();
     thread_ids_[tid] = 0;
@@ -100,11 +242,42 @@ task_system::task_system(int nthreads): count_(nthreads), q_(nthreads) {
 }
 
 task_system::~task_system() {
+    if (scheduler_==task_scheduler_kind::work_stealing) {
+        {
+            lock sleep_lock{sleep_mutex_};
+            quit_ = true;
+        }
+        sleep_cv_.notify_all();
+    }
     for (auto& e: q_) e.quit();
     for (auto& e: threads_) e.join();
+
+    // Release tasks that were never run.
+    for (auto& d: deques_) {
+        while (task* tsk = d->pop()) delete tsk;
+    }
+    for (task* tsk: injected_) delete tsk;
 }
 
 void task_system::async(task tsk) {
+    if (scheduler_==task_scheduler_kind::work_stealing) {
+        auto t = new task(std::move(tsk));
+        ++pending_;
+        auto i = thread_index();
+        if (i>=0) {
+            deques_[i]->push(t);
+        }
+        else {
+            lock q_lock{injected_mutex_};
+            injected_.push_back(t);
+        }
+        if (sleepers_>0) {
+            lock sleep_lock{sleep_mutex_};
+            sleep_cv_.notify_one();
+        }
+        return;
+    }
+
     auto i = index_++;
 
     for (unsigned n = 0; n != count_; n++) {
@@ -113,6 +286,22 @@ void task_system::async(task tsk) {
     q_[i % count_].push(std::move(tsk));
 }
 
+void task_system::async(task tsk, int thread) {
+    auto i = thread % count_;
+    if (scheduler_==task_scheduler_kind::work_stealing) {
+        q_[i].push_bound(std::move(tsk));
+        ++bound_pending_[i];
+        // Wake all sleeping threads, so that the thread the task is pushed
+        // for is among them.
+        if (sleepers_>0) {
+            lock sleep_lock{sleep_mutex_};
+            sleep_cv_.notify_all();
+        }
+        return;
+    }
+    q_[i].push_bound(std::move(tsk));
+}
+
 int task_system::get_num_threads() const {
     return threads_.size() + 1;
 }
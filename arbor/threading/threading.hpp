@@ -7,6 +7,7 @@
 #include <cstddef>
 #include <deque>
 #include <functional>
+#include <memory>
 #include <mutex>
 #include <string>
 #include <thread>
@@ -14,6 +15,10 @@
 #include <unordered_map>
 #include <utility>
 
+#include <arbor/context.hpp>
+
+#include "work_stealing_deque.hpp"
+
 namespace arb {
 namespace threading {
 
@@ -31,6 +36,9 @@ private:
     // FIFO of pending tasks.
     std::deque<task> q_tasks_;
 
+    // FIFO of pending tasks that only the thread owning the queue may run.
+    std::deque<task> q_bound_;
+
     // Lock and signal on task availability change this is the crucial bit.
     mutex q_mutex_;
     condition_variable q_tasks_available_;
@@ -40,13 +48,22 @@ private:
 
 public:
     // Pops a task from the task queue returns false when queue is empty.
+    // Tasks bound to the owning thread are not returned.
     task try_pop();
+
+    // Pops a task bound to the owning thread, if any.
+    task try_pop_bound();
+
+    // Owning thread only: waits for a task, bound or not, and pops it.
     task pop();
 
     // Pushes a task into the task queue and increases task group counter.
     void push(task&& tsk); // TODO: need to use value?
     bool try_push(task& tsk);
 
+    // Pushes a task that only the owning thread may run.
+    void push_bound(task&& tsk);
+
     // Finish popping all waiting tasks on queue then stop trying to pop new tasks
     void quit();
 };
@@ -56,9 +73,18 @@ class task_system {
 private:
     unsigned count_;
 
+    task_scheduler_kind scheduler_;
+
+    thread_binding_kind binding_;
+
+    // The cpus to which each thread is bound; empty if not bound. Thread 0,
+    // the thread that created the task system, is never bound.
+    std::vector<std::vector<int>> thread_cpus_;
+
     std::vector<std::thread> threads_;
 
-    // queue of tasks
+    // queue of tasks, and of the tasks bound to each thread; with the work
+    // stealing scheduler, only the latter are used.
     std::vector<impl::notification_queue> q_;
 
     // threads -> index
@@ -67,10 +93,38 @@ private:
     // total number of tasks pushed in all queues
     std::atomic<unsigned> index_{0};
 
+    // State of the work stealing scheduler: one deque per thread, and a
+    // locked queue for tasks submitted by threads outside the pool.
+    std::vector<std::unique_ptr<impl::work_stealing_deque<task*>>> deques_;
+    std::deque<task*> injected_;
+    mutex injected_mutex_;
+
+    // Number of tasks submitted and not yet taken by a thread, and of those
+    // bound to each thread, used by idle threads to decide whether to sleep.
+    std::atomic<long> pending_{0};
+    std::unique_ptr<std::atomic<long>[]> bound_pending_;
+    std::atomic<unsigned> sleepers_{0};
+    std::atomic<bool> quit_{false};
+    mutex sleep_mutex_;
+    condition_variable sleep_cv_;
+
+    // Index of the calling thread in the pool, or -1 if it is not a member.
+    int thread_index() const;
+
+    // Take a task for the thread with index i, which is -1 for threads
+    // outside the pool: first from its own deque and bound tasks, then from
+    // the injected tasks, and finally by stealing from the deques of the
+    // other threads. Tasks bound to other threads are never taken.
+    task* take_task(int i);
+
+    void run_tasks_loop_stealing(int i);
+
 public:
     task_system();
     // Create nthreads-1 new c std threads
-    task_system(int nthreads);
+    task_system(int nthreads,
+                task_scheduler_kind scheduler = task_scheduler_kind::queue,
+                thread_binding_kind binding = thread_binding_kind::none);
 
     // task_system is a singleton.
     task_system(const task_system&) = delete;
@@ -81,6 +135,12 @@ public:
     // Pushes tasks into notification queue.
     void async(task tsk);
 
+    // Pushes a task bound to the thread with index thread, which is the only
+    // thread in the pool that runs it. The tasks bound to thread 0 are run
+    // by the threads outside the pool, such as the thread that created the
+    // task system, while they wait on a task group.
+    void async(task tsk, int thread);
+
     // Runs tasks until quit is true.
     void run_tasks_loop(int i);
 
@@ -91,6 +151,10 @@ public:
     // Includes master thread.
     int get_num_threads() const;
 
+    task_scheduler_kind scheduler() const { return scheduler_; }
+
+    thread_binding_kind binding() const { return binding_; }
+
     // Returns the thread_id map
     std::unordered_map<std::thread::id, std::size_t> get_thread_ids() const;
 };
@@ -199,6 +263,14 @@ public:
         task_system_->async(make_wrapped_function(std::forward<F>(f), in_flight_, exception_status_));
     }
 
+    // Run f on the thread with index thread.
+    template<typename F>
+    void run(F&& f, int thread) {
+        running_ = true;
+        ++in_flight_;
+        task_system_->async(make_wrapped_function(std::forward<F>(f), in_flight_, exception_status_), thread);
+    }
+
     // Wait till all tasks in this group are done.
     void wait() {
         while (in_flight_) {
@@ -220,14 +292,38 @@ public:
 // algorithms
 ///////////////////////////////////////////////////////////////////////
 struct parallel_for {
+    // Number of tasks per thread used when the range is partitioned
+    // automatically: more than one per thread, so that the load can be
+    // balanced when the cost per index varies.
+    static constexpr int chunks_per_thread = 8;
+
+    // Apply f to each index in [left, right), with one task for each
+    // contiguous chunk of grain indices.
     template <typename F>
-    static void apply(int left, int right, task_system* ts, F f) {
+    static void apply(int left, int right, int grain, task_system* ts, F f) {
+        grain = std::max(grain, 1);
         task_group g(ts);
-        for (int i = left; i < right; ++i) {
-          g.run([=] {f(i);});
+        for (int lo = left; lo < right; ) {
+            int hi = right-lo > grain? lo+grain: right;
+            g.run([=] {
+                for (int i = lo; i < hi; ++i) {
+                    f(i);
+                }
+            });
+            lo = hi;
         }
         g.wait();
     }
+
+    // Apply f to each index in [left, right), partitioning the range into
+    // about chunks_per_thread chunks for each thread of the task system.
+    // Ranges with no more indices than chunks are run with one task per index.
+    template <typename F>
+    static void apply(int left, int right, task_system* ts, F f) {
+        const int n = right-left;
+        const int num_chunks = chunks_per_thread*ts->get_num_threads();
+        apply(left, right, n>num_chunks? (n+num_chunks-1)/num_chunks: 1, ts, std::move(f));
+    }
 };
 } // namespace threading
 
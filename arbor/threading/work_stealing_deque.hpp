@@ -0,0 +1,136 @@
+#pragma once
+
+#include <atomic>
+#include <cstdint>
+#include <memory>
+#include <vector>
+
+namespace arb {
+namespace threading {
+namespace impl {
+
+// Lock-free work-stealing deque after Chase and Lev, "Dynamic circular
+// work-stealing deque" (SPAA 2005), with the memory orderings of Lê et al.,
+// "Correct and efficient work-stealing for weak memory models" (PPoPP 2013).
+//
+// The owning thread pushes and pops items at the bottom of the deque, while
+// any other thread may steal items from the top. T must be a trivially
+// copyable type, typically a pointer; pop and steal return a value
+// initialised T{} when no item could be taken.
+//
+// When the circular buffer is full it is replaced by one of twice the size.
+// Thieves may still read from the old buffer, so buffers are only released
+// when the deque is destroyed.
+
+template <typename T>
+class work_stealing_deque {
+    using index_type = std::int64_t;
+
+    struct buffer {
+        index_type capacity;
+        std::unique_ptr<std::atomic<T>[]> items;
+
+        explicit buffer(index_type capacity):
+            capacity(capacity), items(new std::atomic<T>[capacity])
+        {}
+
+        T get(index_type i) const {
+            return items[i&(capacity-1)].load(std::memory_order_relaxed);
+        }
+
+        void put(index_type i, T x) {
+            items[i&(capacity-1)].store(x, std::memory_order_relaxed);
+        }
+    };
+
+    alignas(64) std::atomic<index_type> top_{0};
+    alignas(64) std::atomic<index_type> bottom_{0};
+    std::atomic<buffer*> buffer_;
+
+    // All buffers allocated by the owner, the last of which is current.
+    std::vector<std::unique_ptr<buffer>> buffers_;
+
+public:
+    // The capacity must be a power of two.
+    explicit work_stealing_deque(index_type capacity = 256) {
+        buffers_.emplace_back(new buffer(capacity));
+        buffer_.store(buffers_.back().get(), std::memory_order_relaxed);
+    }
+
+    work_stealing_deque(const work_stealing_deque&) = delete;
+    work_stealing_deque& operator=(const work_stealing_deque&) = delete;
+
+    // Push an item at the bottom: owner only.
+    void push(T x) {
+        index_type b = bottom_.load(std::memory_order_relaxed);
+        index_type t = top_.load(std::memory_order_acquire);
+        buffer* a = buffer_.load(std::memory_order_relaxed);
+        if (b-t>a->capacity-1) {
+            buffers_.emplace_back(new buffer(2*a->capacity));
+            buffer* grown = buffers_.back().get();
+            for (index_type i = t; i<b; ++i) {
+                grown->put(i, a->get(i));
+            }
+            buffer_.store(grown, std::memory_order_release);
+            a = grown;
+        }
+        a->put(b, x);
+        std::atomic_thread_fence(std::memory_order_release);
+        bottom_.store(b+1, std::memory_order_relaxed);
+    }
+
+    // Pop the item at the bottom: owner only.
+    T pop() {
+        index_type b = bottom_.load(std::memory_order_relaxed)-1;
+        buffer* a = buffer_.load(std::memory_order_relaxed);
+        bottom_.store(b, std::memory_order_relaxed);
+        std::atomic_thread_fence(std::memory_order_seq_cst);
+        index_type t = top_.load(std::memory_order_relaxed);
+
+        T x{};
+        if (t<=b) {
+            x = a->get(b);
+            if (t==b) {
+                // Last item: race against thieves for it.
+                if (!top_.compare_exchange_strong(t, t+1, std::memory_order_seq_cst, std::memory_order_relaxed)) {
+                    x = T{};
+                }
+                bottom_.store(b+1, std::memory_order_relaxed);
+            }
+        }
+        else {
+            bottom_.store(b+1, std::memory_order_relaxed);
+        }
+        return x;
+    }
+
+    // Steal the item at the top: any thread.
+    // Returns T{} if the deque is empty, or if another thread took the item.
+    T steal() {
+        index_type t = top_.load(std::memory_order_acquire);
+        std::atomic_thread_fence(std::memory_order_seq_cst);
+        index_type b = bottom_.load(std::memory_order_acquire);
+
+        T x{};
+        if (t<b) {
+            buffer* a = buffer_.load(std::memory_order_acquire);
+            x = a->get(t);
+            if (!top_.compare_exchange_strong(t, t+1, std::memory_order_seq_cst, std::memory_order_relaxed)) {
+                return T{};
+            }
+        }
+        return x;
+    }
+
+    // An estimate of whether the deque is empty: exact only if no other
+    // thread is accessing the deque.
+    bool empty() const {
+        index_type b = bottom_.load(std::memory_order_relaxed);
+        index_type t = top_.load(std::memory_order_relaxed);
+        return b<=t;
+    }
+};
+
+} // namespace impl
+} // namespace threading
+} // namespace arb
@@ -1,4 +1,7 @@
+#include <algorithm>
+#include <cmath>
 #include <string>
+#include <utility>
 
 #include <pybind11/pybind11.h>
 #include <pybind11/numpy.h>
@@ -22,16 +25,29 @@ namespace pyarb {
 
 // Generic recorder classes for array-output sample data, corresponding
 // to cable_cell scalar- and vector-valued probes.
+//
+// If a reduction is requested, samples are accumulated over each time window,
+// and one row is recorded per window, with the window start time in the first
+// column. The row for the current, incomplete window is included by samples(),
+// but not by take_samples(), unless the window is first closed by flush().
 
 template <typename Meta>
 struct recorder_cable_base: sample_recorder {
     // Return stride-column array: first column is time, remainder correspond to sample.
 
     py::object samples() const override {
-        auto n_record = std::ptrdiff_t(sample_raw_.size()/stride_);
-        return py::array_t<double>(
-                    std::vector<std::ptrdiff_t>{n_record, stride_},
-                    sample_raw_.data());
+        if (!acc_count_) {
+            return as_array(sample_raw_);
+        }
+        auto rows = sample_raw_;
+        append_window(rows);
+        return as_array(rows);
+    }
+
+    py::object take_samples() override {
+        auto result = as_array(sample_raw_);
+        sample_raw_.clear();
+        return result;
     }
 
     py::object meta() const override {
@@ -40,6 +56,20 @@ struct recorder_cable_base: sample_recorder {
 
     void reset() override {
         sample_raw_.clear();
+        acc_count_ = 0;
+    }
+
+    void flush() override {
+        if (acc_count_) {
+            append_window(sample_raw_);
+            acc_count_ = 0;
+        }
+    }
+
+    void reserve(std::size_t n_sample) override {
+        // Reduced samples take at most one row per window; don't guess.
+        if (reduction_.kind!=sample_reduction_kind::none) return;
+        sample_raw_.reserve(sample_raw_.size()+n_sample*stride_);
     }
 
 protected:
@@ -47,72 +77,171 @@ protected:
     std::vector<double> sample_raw_;
     std::ptrdiff_t stride_;
 
-    recorder_cable_base(const Meta* meta_ptr, std::ptrdiff_t width):
-        meta_(*meta_ptr), stride_(1+width)
+    recorder_cable_base(const Meta* meta_ptr, std::ptrdiff_t width, const sample_reduction& reduction):
+        meta_(*meta_ptr), stride_(1+width), reduction_(reduction), acc_(width)
     {}
-};
 
-template <typename Meta>
-struct recorder_cable_scalar: recorder_cable_base<Meta> {
-    using recorder_cable_base<Meta>::sample_raw_;
+    // Record the samples of one sampler call, where values(r) is the range
+    // of values of the sample record r, or null pointers if the sample has an
+    // unexpected type.
+    template <typename Values>
+    void append_samples(std::size_t n_sample, const arb::sample_record* records, Values values) {
+        if (reduction_.kind!=sample_reduction_kind::none) {
+            for (std::size_t i = 0; i<n_sample; ++i) {
+                auto [first, last] = values(records[i]);
+                check_sample(first, last);
+                accumulate(records[i].time, first);
+            }
+            return;
+        }
 
-    void record(any_ptr, std::size_t n_sample, const arb::sample_record* records) override {
+        // Extend the storage once, then fill in place.
+        auto offset = sample_raw_.size();
+        sample_raw_.resize(offset+n_sample*stride_);
         for (std::size_t i = 0; i<n_sample; ++i) {
-            if (auto* v_ptr =any_cast<const double*>(records[i].data)) {
-                sample_raw_.push_back(records[i].time);
-                sample_raw_.push_back(*v_ptr);
+            auto [first, last] = values(records[i]);
+            if (!first || last-first+1!=stride_) {
+                sample_raw_.resize(offset);
+                check_sample(first, last);
+            }
+            auto k = offset+i*stride_;
+            sample_raw_[k] = records[i].time;
+            std::copy(first, last, sample_raw_.begin()+k+1);
+        }
+    }
+
+private:
+    sample_reduction reduction_;
+
+    // Accumulated values for the samples in the current window.
+    std::vector<double> acc_;
+    std::size_t acc_count_ = 0;
+    double acc_window_ = 0;
+
+    void check_sample(const double* first, const double* last) const {
+        if (!first) {
+            throw arb::arbor_internal_error("unexpected sample type");
+        }
+        if (last-first+1!=stride_) {
+            throw arb::arbor_internal_error("unexpected sample size");
+        }
+    }
+
+    // Accumulate the sample values starting at first, taken at time t, in
+    // the reduction of their window.
+    void accumulate(double t, const double* first) {
+        using kind = sample_reduction_kind;
+
+        auto window = std::floor(t/reduction_.window);
+        if (acc_count_ && window!=acc_window_) {
+            append_window(sample_raw_);
+            acc_count_ = 0;
+        }
+
+        auto n = acc_.size();
+        if (!acc_count_) {
+            acc_window_ = window;
+            for (std::size_t i = 0; i<n; ++i) {
+                acc_[i] = reduction_.kind==kind::rms? first[i]*first[i]: first[i];
             }
-            else {
-                throw arb::arbor_internal_error("unexpected sample type");
+        }
+        else {
+            switch (reduction_.kind) {
+            case kind::mean:
+                for (std::size_t i = 0; i<n; ++i) acc_[i] += first[i];
+                break;
+            case kind::rms:
+                for (std::size_t i = 0; i<n; ++i) acc_[i] += first[i]*first[i];
+                break;
+            case kind::min:
+                for (std::size_t i = 0; i<n; ++i) acc_[i] = std::min(acc_[i], first[i]);
+                break;
+            case kind::max:
+                for (std::size_t i = 0; i<n; ++i) acc_[i] = std::max(acc_[i], first[i]);
+                break;
+            default: ;
             }
         }
+        ++acc_count_;
+    }
+
+    // Append the row for the samples accumulated in the current window.
+    void append_window(std::vector<double>& rows) const {
+        using kind = sample_reduction_kind;
+
+        rows.push_back(acc_window_*reduction_.window);
+        for (double a: acc_) {
+            switch (reduction_.kind) {
+            case kind::mean:
+                rows.push_back(a/acc_count_);
+                break;
+            case kind::rms:
+                rows.push_back(std::sqrt(a/acc_count_));
+                break;
+            default:
+                rows.push_back(a);
+            }
+        }
+    }
+
+    py::object as_array(const std::vector<double>& rows) const {
+        auto n_record = std::ptrdiff_t(rows.size()/stride_);
+        return py::array_t<double>(
+                    std::vector<std::ptrdiff_t>{n_record, stride_},
+                    rows.data());
+    }
+};
+
+template <typename Meta>
+struct recorder_cable_scalar: recorder_cable_base<Meta> {
+    void record(any_ptr, std::size_t n_sample, const arb::sample_record* records) override {
+        this->append_samples(n_sample, records,
+            [](const arb::sample_record& r) -> std::pair<const double*, const double*> {
+                if (auto* v_ptr = any_cast<const double*>(r.data)) return {v_ptr, v_ptr+1};
+                return {nullptr, nullptr};
+            });
     }
 
 protected:
-    recorder_cable_scalar(const Meta* meta_ptr): recorder_cable_base<Meta>(meta_ptr, 1) {}
+    recorder_cable_scalar(const Meta* meta_ptr, const sample_reduction& reduction):
+        recorder_cable_base<Meta>(meta_ptr, 1, reduction) {}
 };
 
 template <typename Meta>
 struct recorder_cable_vector: recorder_cable_base<Meta> {
-    using recorder_cable_base<Meta>::sample_raw_;
-
     void record(any_ptr, std::size_t n_sample, const arb::sample_record* records) override {
-        for (std::size_t i = 0; i<n_sample; ++i) {
-            if (auto* v_ptr = any_cast<const arb::cable_sample_range*>(records[i].data)) {
-                sample_raw_.push_back(records[i].time);
-                sample_raw_.insert(sample_raw_.end(), v_ptr->first, v_ptr->second);
-            }
-            else {
-                throw arb::arbor_internal_error("unexpected sample type");
-            }
-        }
+        this->append_samples(n_sample, records,
+            [](const arb::sample_record& r) -> std::pair<const double*, const double*> {
+                if (auto* v_ptr = any_cast<const arb::cable_sample_range*>(r.data)) return *v_ptr;
+                return {nullptr, nullptr};
+            });
     }
 
 protected:
-    recorder_cable_vector(const Meta* meta_ptr, std::ptrdiff_t width):
-        recorder_cable_base<Meta>(meta_ptr, width) {}
+    recorder_cable_vector(const Meta* meta_ptr, std::ptrdiff_t width, const sample_reduction& reduction):
+        recorder_cable_base<Meta>(meta_ptr, width, reduction) {}
 };
 
 // Specific recorder classes:
 
 struct recorder_cable_scalar_mlocation: recorder_cable_scalar<arb::mlocation> {
-    explicit recorder_cable_scalar_mlocation(const arb::mlocation* meta_ptr):
-        recorder_cable_scalar(meta_ptr) {}
+    recorder_cable_scalar_mlocation(const arb::mlocation* meta_ptr, const sample_reduction& reduction):
+        recorder_cable_scalar(meta_ptr, reduction) {}
 };
 
 struct recorder_cable_scalar_point_info: recorder_cable_scalar<arb::cable_probe_point_info> {
-    explicit recorder_cable_scalar_point_info(const arb::cable_probe_point_info* meta_ptr):
-        recorder_cable_scalar(meta_ptr) {}
+    recorder_cable_scalar_point_info(const arb::cable_probe_point_info* meta_ptr, const sample_reduction& reduction):
+        recorder_cable_scalar(meta_ptr, reduction) {}
 };
 
 struct recorder_cable_vector_mcable: recorder_cable_vector<arb::mcable_list> {
-    explicit recorder_cable_vector_mcable(const arb::mcable_list* meta_ptr):
-        recorder_cable_vector(meta_ptr, std::ptrdiff_t(meta_ptr->size())) {}
+    recorder_cable_vector_mcable(const arb::mcable_list* meta_ptr, const sample_reduction& reduction):
+        recorder_cable_vector(meta_ptr, std::ptrdiff_t(meta_ptr->size()), reduction) {}
 };
 
 struct recorder_cable_vector_point_info: recorder_cable_vector<std::vector<arb::cable_probe_point_info>> {
-    explicit recorder_cable_vector_point_info(const std::vector<arb::cable_probe_point_info>* meta_ptr):
-        recorder_cable_vector(meta_ptr, std::ptrdiff_t(meta_ptr->size())) {}
+    recorder_cable_vector_point_info(const std::vector<arb::cable_probe_point_info>* meta_ptr, const sample_reduction& reduction):
+        recorder_cable_vector(meta_ptr, std::ptrdiff_t(meta_ptr->size()), reduction) {}
 };
 
 // Helper for registering sample recorder factories and (trivial) metadata conversions.
@@ -120,8 +249,8 @@ struct recorder_cable_vector_point_info: recorder_cable_vector<std::vector<arb::
 template <typename Meta, typename Recorder>
 void register_probe_meta_maps(pyarb_global_ptr g) {
     g->recorder_factories.assign<Meta>(
-        [](any_ptr meta_ptr) -> std::unique_ptr<sample_recorder> {
-            return std::unique_ptr<Recorder>(new Recorder(any_cast<const Meta*>(meta_ptr)));
+        [](any_ptr meta_ptr, const sample_reduction& reduction) -> std::unique_ptr<sample_recorder> {
+            return std::unique_ptr<Recorder>(new Recorder(any_cast<const Meta*>(meta_ptr), reduction));
         });
 
     g->probe_meta_converters.assign<Meta>(
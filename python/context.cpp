@@ -35,8 +35,15 @@ std::ostream& operator<<(std::ostream& o, const context_shim& ctx) {
 struct proc_allocation_shim {
     std::optional<int> gpu_id = {};
     int num_threads = 1;
-
-    proc_allocation_shim(int threads, pybind11::object gpu) {
+    arb::task_scheduler_kind scheduler = arb::task_scheduler_kind::queue;
+    arb::thread_binding_kind bind_threads = arb::thread_binding_kind::none;
+
+    proc_allocation_shim(int threads,
+                         pybind11::object gpu,
+                         arb::task_scheduler_kind sched = arb::task_scheduler_kind::queue,
+                         arb::thread_binding_kind binding = arb::thread_binding_kind::none):
+        scheduler(sched), bind_threads(binding)
+    {
         set_num_threads(threads);
         set_gpu_id(gpu);
     }
@@ -59,7 +66,9 @@ struct proc_allocation_shim {
 
     // helper function to use arb::make_context(arb::proc_allocation)
     arb::proc_allocation allocation() const {
-        return arb::proc_allocation(num_threads, gpu_id.value_or(-1));
+        arb::proc_allocation alloc(num_threads, gpu_id.value_or(-1), scheduler);
+        alloc.bind_threads = bind_threads;
+        return alloc;
     }
 };
 
@@ -71,17 +80,43 @@ void register_contexts(pybind11::module& m) {
     using namespace std::string_literals;
     using namespace pybind11::literals;
 
+    // task_scheduler
+    pybind11::enum_<arb::task_scheduler_kind>(m, "task_scheduler",
+        "Enumeration for the scheduling of tasks on the threads of a thread pool.")
+        .value("queue", arb::task_scheduler_kind::queue,
+            "One locked task queue per thread.")
+        .value("work_stealing", arb::task_scheduler_kind::work_stealing,
+            "One lock-free work-stealing deque per thread.");
+
+    // thread_binding
+    pybind11::enum_<arb::thread_binding_kind>(m, "thread_binding",
+        "Enumeration for the binding of the threads of a thread pool to cpus.")
+        .value("none", arb::thread_binding_kind::none,
+            "Threads are not bound.")
+        .value("cores", arb::thread_binding_kind::cores,
+            "Each thread is bound to one cpu.")
+        .value("numa", arb::thread_binding_kind::numa,
+            "Each thread is bound to the cpus of one NUMA node.");
+
     // proc_allocation
     pybind11::class_<proc_allocation_shim> proc_allocation(m, "proc_allocation",
         "Enumerates the computational resources on a node to be used for simulation.");
     proc_allocation
-        .def(pybind11::init<int, pybind11::object>(),
-            "threads"_a=1, "gpu_id"_a=pybind11::none(),
+        .def(pybind11::init<int, pybind11::object, arb::task_scheduler_kind, arb::thread_binding_kind>(),
+            "threads"_a=1, "gpu_id"_a=pybind11::none(), "scheduler"_a=arb::task_scheduler_kind::queue,
+            "bind_threads"_a=arb::thread_binding_kind::none,
             "Construct an allocation with arguments:\n"
-            "  threads: The number of threads available locally for execution, 1 by default.\n"
-            "  gpu_id:  The identifier of the GPU to use, None by default.\n")
+            "  threads:      The number of threads available locally for execution, 1 by default.\n"
+            "  gpu_id:       The identifier of the GPU to use, None by default.\n"
+            "  scheduler:    The scheduler of the thread pool, task_scheduler.queue by default.\n"
+            "  bind_threads: The binding of threads to cpus, thread_binding.none by default.\n")
         .def_property("threads", &proc_allocation_shim::get_num_threads, &proc_allocation_shim::set_num_threads,
             "The number of threads available locally for execution.")
+        .def_readwrite("scheduler", &proc_allocation_shim::scheduler,
+            "The scheduler of the thread pool.")
+        .def_readwrite("bind_threads", &proc_allocation_shim::bind_threads,
+            "The binding of the threads of the thread pool to cpus.\n"
+            "If threads are bound, each cell group is also assigned to a thread.")
         .def_property("gpu_id", &proc_allocation_shim::get_gpu_id, &proc_allocation_shim::set_gpu_id,
             "The identifier of the GPU to use.\n"
             "Corresponds to the integer parameter used to identify GPUs in CUDA API calls.")
@@ -91,6 +126,13 @@ void register_contexts(pybind11::module& m) {
         .def("__repr__", util::to_string<proc_allocation_shim>);
 
     // context
+    pybind11::enum_<arb::spike_encoding_kind>(m, "spike_encoding",
+        "Enumeration for the encoding of spikes exchanged between ranks.")
+        .value("plain", arb::spike_encoding_kind::plain,
+            "Send spikes as they are.")
+        .value("compact", arb::spike_encoding_kind::compact,
+            "Delta encode gids, and send spike times as single precision offsets.");
+
     pybind11::class_<context_shim> context(m, "context", "An opaque handle for the hardware resources used in a simulation.");
     context
         .def(pybind11::init<>(
@@ -159,10 +201,18 @@ void register_contexts(pybind11::module& m) {
             "Whether the context has a GPU.")
         .def_property_readonly("threads", [](const context_shim& ctx){return arb::num_threads(ctx.context);},
             "The number of threads in the context's thread pool.")
+        .def_property_readonly("scheduler", [](const context_shim& ctx){return arb::task_scheduler(ctx.context);},
+            "The scheduler of the context's thread pool.")
+        .def_property_readonly("bind_threads", [](const context_shim& ctx){return arb::thread_binding(ctx.context);},
+            "The binding of the threads of the context's thread pool to cpus.")
         .def_property_readonly("ranks", [](const context_shim& ctx){return arb::num_ranks(ctx.context);},
             "The number of distributed domains (equivalent to the number of MPI ranks).")
         .def_property_readonly("rank", [](const context_shim& ctx){return arb::rank(ctx.context);},
             "The numeric id of the local domain (equivalent to MPI rank).")
+        .def_property("spike_encoding",
+            [](const context_shim& ctx){return arb::spike_encoding(ctx.context);},
+            [](const context_shim& ctx, arb::spike_encoding_kind kind){arb::set_spike_encoding(ctx.context, kind);},
+            "The encoding of spikes exchanged between ranks.")
         .def("__str__", util::to_string<context_shim>)
         .def("__repr__", util::to_string<context_shim>);
 }
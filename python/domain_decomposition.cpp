@@ -2,6 +2,7 @@
 #include <string>
 #include <sstream>
 
+#include <pybind11/functional.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
@@ -117,6 +118,64 @@ void register_domain_decomposition(pybind11::module& m) {
         "over the distributed and local hardware resources described by context.\n"
         "Optionally, provide a dictionary of partition hints for certain cell kinds, by default empty.",
         "recipe"_a, "context"_a, "hints"_a=arb::partition_hint_map{});
+
+    m.def("partition_load_balance_weighted",
+        [](std::shared_ptr<py_recipe>& recipe, const context_shim& ctx, pybind11::object cost, arb::partition_hint_map hint_map) {
+            try {
+                py_recipe_shim rec(recipe);
+                arb::cell_cost_function cost_fn;
+                if (cost.is_none()) {
+                    cost_fn = [&rec](arb::cell_gid_type gid) { return arb::estimate_cell_cost(rec, gid); };
+                }
+                else {
+                    cost_fn = [&cost](arb::cell_gid_type gid) { return cost(gid).cast<double>(); };
+                }
+                return arb::partition_load_balance_weighted(rec, ctx.context, cost_fn, std::move(hint_map));
+            }
+            catch (...) {
+                py_reset_and_throw();
+                throw;
+            }
+        },
+        "Construct a domain_decomposition that distributes the cells in the model described by recipe\n"
+        "over the distributed and local hardware resources described by context, such that the\n"
+        "ranks and cell groups have about the same total cost.\n"
+        "The cost of the cell with a given gid is cost(gid), or if cost is None, an estimate\n"
+        "derived from the cell description.\n"
+        "Optionally, provide a dictionary of partition hints for certain cell kinds, by default empty.",
+        "recipe"_a, "context"_a, "cost"_a=pybind11::none(), "hints"_a=arb::partition_hint_map{});
+
+    m.def("measured_cell_cost",
+        [](const arb::domain_decomposition& decomp, const std::vector<double>& group_times, const context_shim& ctx) {
+            return arb::measured_cell_cost(decomp, group_times, ctx.context);
+        },
+        "Return a function that gives the cost of the cell with a given gid, measured in a simulation\n"
+        "with the domain_decomposition decomp: the advance time of its cell group in group_times,\n"
+        "as returned by simulation.group_advance_times, divided by the number of cells in the group.\n"
+        "The costs are gathered from all ranks, so this must be called on all ranks.",
+        "decomp"_a, "group_times"_a, "context"_a);
+
+    m.def("partition_load_balance_graph",
+        [](std::shared_ptr<py_recipe>& recipe, const context_shim& ctx, pybind11::object cost, arb::partition_hint_map hint_map) {
+            try {
+                arb::cell_cost_function cost_fn = [](arb::cell_gid_type) { return 1.; };
+                if (!cost.is_none()) {
+                    cost_fn = [&cost](arb::cell_gid_type gid) { return cost(gid).cast<double>(); };
+                }
+                return arb::partition_load_balance_graph(py_recipe_shim(recipe), ctx.context, cost_fn, std::move(hint_map));
+            }
+            catch (...) {
+                py_reset_and_throw();
+                throw;
+            }
+        },
+        "Construct a domain_decomposition that distributes the cells in the model described by recipe\n"
+        "over the distributed and local hardware resources described by context, such that few\n"
+        "connections are between cells on different ranks, and the ranks and cell groups have\n"
+        "about the same total cost.\n"
+        "The cost of the cell with a given gid is cost(gid), or 1 if cost is None.\n"
+        "Optionally, provide a dictionary of partition hints for certain cell kinds, by default empty.",
+        "recipe"_a, "context"_a, "cost"_a=pybind11::none(), "hints"_a=arb::partition_hint_map{});
 }
 
 } // namespace pyarb
@@ -1,3 +1,4 @@
+#include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/pytypes.h>
 #include <pybind11/stl.h>
@@ -5,8 +6,10 @@
 #include <arbor/common_types.hpp>
 #include <arbor/schedule.hpp>
 
+#include "error.hpp"
 #include "event_generator.hpp"
 #include "schedule.hpp"
+#include "strprintf.hpp"
 
 namespace pyarb {
 
@@ -30,6 +33,56 @@ void register_event_generators(pybind11::module& m) {
              "The weight of events to deliver.")
         .def("__str__", [](const event_generator_shim&){return "<arbor.event_generator>";})
         .def("__repr__", [](const event_generator_shim&){return "<arbor.event_generator>";});
+
+    auto population_str = [](const poisson_population_shim& p) {
+        return util::pprintf("<arbor.poisson_population_generator: gids [{}, {}), target {}, weight {}, seed {}>",
+            p.gid_begin, p.gid_end, p.target, p.weight, p.seed);
+    };
+
+    pybind11::class_<poisson_population_shim> poisson_population(m, "poisson_population_generator");
+
+    poisson_population
+        .def(pybind11::init<>(
+            [](std::pair<arb::cell_gid_type, arb::cell_gid_type> gids,
+               arb::cell_lid_type target,
+               double weight,
+               pybind11::array_t<arb::time_type, pybind11::array::c_style|pybind11::array::forcecast> rate,
+               poisson_population_shim::rng_type::result_type seed,
+               arb::time_type tstart)
+            {
+                auto [begin, end] = gids;
+                assert_throw(begin<=end, "the gid range must satisfy begin <= end");
+                assert_throw(rate.ndim()<=1, "rate must be a number or a one-dimensional array");
+                const auto n = std::size_t(rate.size());
+                assert_throw(n==1 || n==end-begin, "rate must have a single entry, or one entry for each cell in the gid range");
+                assert_throw(tstart>=0, "tstart must be a non-negative number");
+
+                std::vector<arb::time_type> rates(rate.data(), rate.data()+n);
+                for (auto r: rates) {
+                    assert_throw(r>=0, "rate must be non-negative");
+                }
+                return poisson_population_shim{begin, end, target, weight, std::move(rates), seed, tstart};
+            }),
+            "gids"_a, "target"_a, "weight"_a, "rate"_a, "seed"_a = 0, "tstart"_a = 0.,
+            "Construct Poisson event generators for a population of cells with arguments:\n"
+            "  gids:   The half-open range of gids (begin, end) of the cells.\n"
+            "  target: The index of the target synapse on each cell.\n"
+            "  weight: The weight of events to deliver.\n"
+            "  rate:   The expected frequency [Hz], either one for all cells or an array with one per cell.\n"
+            "  seed:   The seed of the generator on the first cell; cell gid uses seed+gid-begin, 0 by default.\n"
+            "  tstart: The earliest time of the events [ms], 0 by default.")
+        .def_readonly("gid_begin", &poisson_population_shim::gid_begin,
+             "The first gid in the population.")
+        .def_readonly("gid_end", &poisson_population_shim::gid_end,
+             "One past the last gid in the population.")
+        .def_readonly("target", &poisson_population_shim::target,
+             "The index of the target synapse on each cell.")
+        .def_readonly("weight", &poisson_population_shim::weight,
+             "The weight of events to deliver.")
+        .def_readonly("seed", &poisson_population_shim::seed,
+             "The seed of the generator on the first cell.")
+        .def("__str__", population_str)
+        .def("__repr__", population_str);
 }
 
 } // namespace pyarb
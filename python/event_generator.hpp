@@ -1,6 +1,11 @@
 #pragma once
 
+#include <cstdint>
+#include <random>
+#include <vector>
+
 #include <arbor/common_types.hpp>
+#include <arbor/event_generator.hpp>
 #include <arbor/schedule.hpp>
 
 namespace pyarb {
@@ -17,4 +22,34 @@ struct event_generator_shim {
     {}
 };
 
+// Describes Poisson event generators attached to each cell in the gid range
+// [gid_begin, gid_end), without a Python object per cell. The generator on
+// cell gid has rate rates[gid-gid_begin] (or rates[0] if there is a single
+// rate) and random seed seed+(gid-gid_begin). The generators are constructed in
+// C++ by the recipe shim.
+struct poisson_population_shim {
+    using rng_type = std::mt19937_64;
+
+    arb::cell_gid_type gid_begin;
+    arb::cell_gid_type gid_end;
+    arb::cell_lid_type target;
+    double weight;
+    std::vector<arb::time_type> rates; // Hz
+    rng_type::result_type seed;
+    arb::time_type tstart;
+
+    bool contains(arb::cell_gid_type gid) const {
+        return gid>=gid_begin && gid<gid_end;
+    }
+
+    // The event generator for cell gid, which must be in the gid range.
+    arb::event_generator generator(arb::cell_gid_type gid) const {
+        auto i = gid-gid_begin;
+        // convert frequency to kHz.
+        auto rate = (rates.size()==1? rates[0]: rates[i])/1000.;
+        return arb::schedule_generator({gid, target}, weight,
+                arb::poisson_schedule(tstart, rate, rng_type(seed+i)));
+    }
+};
+
 } // namespace pyarb
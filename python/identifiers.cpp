@@ -72,6 +72,13 @@ void register_identifiers(py::module& m) {
             "Round time down to multiple of binning interval.")
         .value("following", arb::binning_kind::following,
             "Round times down to previous event if within binning interval.");
+
+    py::enum_<arb::spike_exchange_kind>(m, "spike_exchange",
+        "Enumeration for the spike exchange policy.")
+        .value("dense", arb::spike_exchange_kind::dense,
+            "Gather every spike on every rank.")
+        .value("sparse", arb::spike_exchange_kind::sparse,
+            "Send spikes only to the ranks with connections from their source.");
 }
 
 } // namespace pyarb
@@ -6,6 +6,7 @@
 #include <arbor/version.hpp>
 
 #include "pyarb.hpp"
+#include "recipe.hpp"
 
 // Forward declarations of functions used to register API
 // types and functions to be exposed to Python.
@@ -39,6 +40,7 @@ PYBIND11_MODULE(_arbor, m) {
     // Register NumPy structured datatypes for Arbor structures used in NumPy array outputs.
     PYBIND11_NUMPY_DTYPE(arb::cell_member_type, gid, index);
     PYBIND11_NUMPY_DTYPE(arb::spike, source, time);
+    PYBIND11_NUMPY_DTYPE(pyarb::connection_record, source_gid, source_index, dest_index, weight, delay);
 
     m.doc() = "arbor: multicompartment neural network models.";
     m.attr("__version__") = ARB_VERSION;
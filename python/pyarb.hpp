@@ -8,6 +8,7 @@
 #include <unordered_map>
 
 #include <arbor/arbexcept.hpp>
+#include <arbor/common_types.hpp>
 #include <arbor/sampling.hpp>
 #include <arbor/util/any_ptr.hpp>
 
@@ -15,6 +16,18 @@
 
 namespace pyarb {
 
+// Reduction applied by a sample recorder to the samples in consecutive time
+// windows [k·window, (k+1)·window); none records every sample.
+
+enum class sample_reduction_kind {
+    none, mean, min, max, rms
+};
+
+struct sample_reduction {
+    sample_reduction_kind kind = sample_reduction_kind::none;
+    arb::time_type window = 0;
+};
+
 // Sample recorder object interface.
 
 struct sample_recorder {
@@ -22,13 +35,24 @@ struct sample_recorder {
     virtual pybind11::object samples() const = 0;
     virtual pybind11::object meta() const = 0;
     virtual void reset() = 0;
+    // Preallocate storage for n_sample further samples.
+    virtual void reserve(std::size_t n_sample) {}
+    // Complete the samples that are still being accumulated, if any, so that
+    // they are returned by take_samples().
+    virtual void flush() {}
+    // Return the samples that are complete, and remove them from the recorder.
+    virtual pybind11::object take_samples() {
+        auto s = samples();
+        reset();
+        return s;
+    }
     virtual ~sample_recorder() {}
 };
 
 // Recorder 'factory' type: given an any_ptr to probe metadata of a specific subset of types,
-// return a corresponding sample_recorder instance.
+// and the reduction to apply to the samples, return a corresponding sample_recorder instance.
 
-using sample_recorder_factory = std::function<std::unique_ptr<sample_recorder> (arb::util::any_ptr)>;
+using sample_recorder_factory = std::function<std::unique_ptr<sample_recorder> (arb::util::any_ptr, const sample_reduction&)>;
 
 // Holds map: probe metadata pointer type → recorder object factory.
 
@@ -40,9 +64,9 @@ struct recorder_factory_map {
         map_[typeid(const Meta*)] = std::move(rf);
     }
 
-    std::unique_ptr<sample_recorder> make_recorder(arb::util::any_ptr meta) const {
+    std::unique_ptr<sample_recorder> make_recorder(arb::util::any_ptr meta, const sample_reduction& reduction = {}) const {
         try {
-            return map_.at(meta.type())(meta);
+            return map_.at(meta.type())(meta, reduction);
         }
         catch (std::out_of_range&) {
             throw arb::arbor_internal_error("unrecognized probe metadata type");
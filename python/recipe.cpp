@@ -2,6 +2,7 @@
 #include <string>
 #include <vector>
 
+#include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/pytypes.h>
 #include <pybind11/stl.h>
@@ -55,7 +56,11 @@ static arb::util::unique_any convert_cell(pybind11::object o) {
 
 // The py::recipe::cell_decription returns a pybind11::object, that is
 // unwrapped and copied into a arb::util::unique_any.
- arb::util::unique_any py_recipe_shim::get_cell_description(arb::cell_gid_type gid) const {
+arb::util::unique_any py_recipe_shim::get_cell_description(arb::cell_gid_type gid) const {
+    // Descriptions are requested once per cell, so take them from the cache.
+    if (auto it = descriptions_.find(gid); it!=descriptions_.end() && it->second.has_value()) {
+        return std::move(it->second);
+    }
     return try_catch_pyexception([&](){
         pybind11::gil_scoped_acquire guard;
         return convert_cell(impl_->cell_description(gid));
@@ -76,6 +81,9 @@ static std::any convert_gprop(pybind11::object o) {
 // The py::recipe::global_properties returns a pybind11::object, that is
 // unwrapped and copied into an std::any.
 std::any py_recipe_shim::get_global_properties(arb::cell_kind kind) const {
+    if (auto it = global_properties_.find(kind); it!=global_properties_.end()) {
+        return it->second;
+    }
     return try_catch_pyexception([&](){
         pybind11::gil_scoped_acquire guard;
         return convert_gprop(impl_->global_properties(kind));
@@ -109,10 +117,184 @@ static std::vector<arb::event_generator> convert_gen(std::vector<pybind11::objec
     return gens;
 }
 
+// Convert the incoming connections of gid, supplied either as a list of
+// connections or as a NumPy array of connection_record, to the C++ type.
+// This helper is only to called while holding the GIL, see above.
+static std::vector<arb::cell_connection> convert_connections(pybind11::object o, arb::cell_gid_type gid) {
+    using record_array = pybind11::array_t<connection_record, pybind11::array::c_style|pybind11::array::forcecast>;
+
+    if (!pybind11::isinstance<pybind11::array>(o)) {
+        return o.cast<std::vector<arb::cell_connection>>();
+    }
+
+    // Convert in a single pass over the table; no Python objects are created
+    // for individual connections.
+    auto records = record_array::ensure(o);
+    if (!records || records.ndim()!=1) {
+        throw pyarb_error(
+            util::pprintf(
+                "recipe supplied an invalid connection table for gid {}: expected a one-dimensional array of dtype arbor.connection_dtype", gid));
+    }
+
+    const auto n = records.size();
+    const connection_record* r = records.data();
+
+    std::vector<arb::cell_connection> conns;
+    conns.reserve(n);
+    for (pybind11::ssize_t i = 0; i<n; ++i) {
+        conns.emplace_back(arb::cell_member_type{r[i].source_gid, r[i].source_index},
+                           arb::cell_member_type{gid, r[i].dest_index},
+                           r[i].weight, r[i].delay);
+    }
+    return conns;
+}
+
+std::vector<arb::cell_connection> py_recipe_shim::connections_on(arb::cell_gid_type gid) const {
+    if (auto it = connections_.find(gid); it!=connections_.end()) {
+        return it->second;
+    }
+    return try_catch_pyexception([&](){
+        pybind11::gil_scoped_acquire guard;
+        return convert_connections(impl_->connections_on(gid), gid);
+    },
+    "Python error already thrown");
+}
+
+// Convert the result of recipe.event_generator_populations.
+// This helper is only to called while holding the GIL.
+static std::vector<poisson_population_shim> convert_populations(pybind11::object o) {
+    std::vector<poisson_population_shim> pops;
+    for (auto p: o) {
+        if (!pybind11::isinstance<poisson_population_shim>(p)) {
+            throw pyarb_error(
+                util::pprintf(
+                    "recipe supplied an invalid event generator population: {}", pybind11::str(p)));
+        }
+        pops.push_back(p.cast<poisson_population_shim>());
+    }
+    return pops;
+}
+
+// Append the generators of the populations that include gid.
+static void append_population_generators(const std::vector<poisson_population_shim>& pops, arb::cell_gid_type gid, std::vector<arb::event_generator>& gens) {
+    for (auto& p: pops) {
+        if (p.contains(gid)) gens.push_back(p.generator(gid));
+    }
+}
+
 std::vector<arb::event_generator> py_recipe_shim::event_generators(arb::cell_gid_type gid) const {
+    if (auto it = event_generators_.find(gid); it!=event_generators_.end()) {
+        return it->second;
+    }
     return try_catch_pyexception([&](){
         pybind11::gil_scoped_acquire guard;
-        return convert_gen(impl_->event_generators(gid), gid);
+        auto gens = convert_gen(impl_->event_generators(gid), gid);
+        append_population_generators(convert_populations(impl_->event_generator_populations()), gid, gens);
+        return gens;
+    },
+    "Python error already thrown");
+}
+
+// Convert the result of a bulk count query, e.g. num_sources_array, to a vector
+// with one entry per gid in the model. Returns an empty vector if the recipe
+// does not implement the query.
+// This helper is only to called while holding the GIL.
+static std::vector<arb::cell_size_type> convert_counts(pybind11::object o, std::size_t n, const char* name) {
+    using count_array = pybind11::array_t<arb::cell_size_type, pybind11::array::c_style|pybind11::array::forcecast>;
+
+    if (o.is_none()) return {};
+
+    auto counts = count_array::ensure(o);
+    if (!counts || counts.ndim()!=1 || std::size_t(counts.size())!=n) {
+        throw pyarb_error(util::pprintf("recipe.{} must return an array with one entry for each of the {} cells in the model", name, n));
+    }
+    return std::vector<arb::cell_size_type>(counts.data(), counts.data()+n);
+}
+
+// Convert the result of a per-gid bulk query, e.g. connections_for, to a
+// sequence with one entry for each of the n requested gids.
+// This helper is only to called while holding the GIL.
+static pybind11::sequence bulk_sequence(pybind11::object o, std::size_t n, const char* name) {
+    if (!pybind11::isinstance<pybind11::sequence>(o) || pybind11::len(o)!=n) {
+        throw pyarb_error(util::pprintf("recipe.{} must return a sequence with one entry for each of the {} requested gids", name, n));
+    }
+    return o.cast<pybind11::sequence>();
+}
+
+void py_recipe_shim::prefetch(const std::vector<arb::cell_gid_type>& gids) {
+    try_catch_pyexception([&](){
+        pybind11::gil_scoped_acquire guard;
+
+        const std::size_t n_cells = impl_->num_cells();
+        num_sources_array_ = convert_counts(impl_->num_sources_array(), n_cells, "num_sources_array");
+        num_targets_array_ = convert_counts(impl_->num_targets_array(), n_cells, "num_targets_array");
+
+        const auto n = gids.size();
+        pybind11::array_t<arb::cell_gid_type> gid_array(n, gids.data());
+
+        if (auto o = impl_->connections_for(gid_array); !o.is_none()) {
+            auto conns = bulk_sequence(o, n, "connections_for");
+            for (std::size_t i = 0; i<n; ++i) {
+                connections_[gids[i]] = convert_connections(conns[i], gids[i]);
+            }
+        }
+        if (auto o = impl_->event_generators_for(gid_array); !o.is_none()) {
+            auto gens = bulk_sequence(o, n, "event_generators_for");
+            for (std::size_t i = 0; i<n; ++i) {
+                event_generators_[gids[i]] = convert_gen(gens[i].cast<std::vector<pybind11::object>>(), gids[i]);
+            }
+        }
+        if (auto o = impl_->gap_junctions_for(gid_array); !o.is_none()) {
+            auto gjs = bulk_sequence(o, n, "gap_junctions_for");
+            for (std::size_t i = 0; i<n; ++i) {
+                gap_junctions_[gids[i]] = gjs[i].cast<std::vector<arb::gap_junction_connection>>();
+            }
+        }
+
+        populations_ = convert_populations(impl_->event_generator_populations());
+
+        // Per-gid queries for everything not covered by a bulk query.
+        for (auto gid: gids) {
+            auto kind = impl_->cell_kind(gid);
+            cell_kinds_[gid] = kind;
+
+            if (!connections_.count(gid)) {
+                connections_[gid] = convert_connections(impl_->connections_on(gid), gid);
+            }
+            if (!event_generators_.count(gid)) {
+                event_generators_[gid] = convert_gen(impl_->event_generators(gid), gid);
+            }
+            append_population_generators(populations_, gid, event_generators_[gid]);
+            if (!gap_junctions_.count(gid)) {
+                gap_junctions_[gid] = impl_->gap_junctions_on(gid);
+            }
+            if (gid>=num_sources_array_.size()) {
+                num_sources_[gid] = impl_->num_sources(gid);
+            }
+            if (gid>=num_targets_array_.size()) {
+                num_targets_[gid] = impl_->num_targets(gid);
+            }
+            num_gap_junction_sites_[gid] = impl_->num_gap_junction_sites(gid);
+            probes_[gid] = impl_->probes(gid);
+            descriptions_[gid] = convert_cell(impl_->cell_description(gid));
+
+            if (!global_properties_.count(kind)) {
+                global_properties_[kind] = convert_gprop(impl_->global_properties(kind));
+            }
+        }
+
+        // The number of sources is queried for the source of every connection,
+        // so fetch it once for each distinct source cell.
+        if (num_sources_array_.empty()) {
+            for (auto& [gid, conns]: connections_) {
+                for (auto& c: conns) {
+                    auto src = c.source.gid;
+                    if (!num_sources_.count(src)) {
+                        num_sources_[src] = impl_->num_sources(src);
+                    }
+                }
+            }
+        }
     },
     "Python error already thrown");
 }
@@ -172,6 +354,9 @@ void register_recipe(pybind11::module& m) {
         .def("__str__",  &gj_to_string)
         .def("__repr__", &gj_to_string);
 
+    // NumPy record type for connection tables returned by recipe.connections_on.
+    m.attr("connection_dtype") = pybind11::dtype::of<connection_record>();
+
     // Recipes
     pybind11::class_<py_recipe,
                      py_recipe_trampoline,
@@ -201,7 +386,8 @@ void register_recipe(pybind11::module& m) {
             "A list of all the event generators that are attached to gid, [] by default.")
         .def("connections_on", &py_recipe::connections_on,
             "gid"_a,
-            "A list of all the incoming connections to gid, [] by default.")
+            "A list of all the incoming connections to gid, [] by default.\n"
+            "Alternatively, an array of dtype connection_dtype with one entry per connection.")
         .def("gap_junctions_on", &py_recipe::gap_junctions_on,
             "gid"_a,
             "A list of the gap junctions connected to gid, [] by default.")
@@ -211,6 +397,28 @@ void register_recipe(pybind11::module& m) {
         .def("global_properties", &py_recipe::global_properties,
             "kind"_a,
             "The default properties applied to all cells of type 'kind' in the model.")
+        .def("num_sources_array", &py_recipe::num_sources_array,
+            "An array with the number of spike sources on each gid in the model.\n"
+            "None by default, in which case num_sources is queried for each gid.")
+        .def("num_targets_array", &py_recipe::num_targets_array,
+            "An array with the number of post-synaptic sites on each gid in the model.\n"
+            "None by default, in which case num_targets is queried for each gid.")
+        .def("connections_for", &py_recipe::connections_for,
+            "gids"_a,
+            "A sequence with the incoming connections of each gid in the array gids.\n"
+            "None by default, in which case connections_on is queried for each gid.")
+        .def("event_generators_for", &py_recipe::event_generators_for,
+            "gids"_a,
+            "A sequence with the event generators attached to each gid in the array gids.\n"
+            "None by default, in which case event_generators is queried for each gid.")
+        .def("gap_junctions_for", &py_recipe::gap_junctions_for,
+            "gids"_a,
+            "A sequence with the gap junctions connected to each gid in the array gids.\n"
+            "None by default, in which case gap_junctions_on is queried for each gid.")
+        .def("event_generator_populations", &py_recipe::event_generator_populations,
+            "A list of poisson_population_generator, each attaching Poisson event generators\n"
+            "to a range of cells in addition to those returned by event_generators.\n"
+            "By default returns an empty list.")
         // TODO: py_recipe::global_properties
         .def("__str__",  [](const py_recipe&){return "<arbor.recipe>";})
         .def("__repr__", [](const py_recipe&){return "<arbor.recipe>";});
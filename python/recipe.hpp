@@ -1,7 +1,9 @@
 #pragma once
 
+#include <unordered_map>
 #include <vector>
 
+#include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/pytypes.h>
 #include <pybind11/stl.h>
@@ -11,10 +13,23 @@
 #include <arbor/recipe.hpp>
 
 #include "error.hpp"
+#include "event_generator.hpp"
 #include "strprintf.hpp"
 
 namespace pyarb {
 
+// Record type of the NumPy structured arrays that can be used to describe the
+// incoming connections of a cell, as an alternative to a list of connections.
+// The target gid of each connection is implicitly that of the cell.
+// The corresponding NumPy dtype is exposed as arbor.connection_dtype.
+struct connection_record {
+    arb::cell_gid_type source_gid;
+    arb::cell_lid_type source_index;
+    arb::cell_lid_type dest_index;
+    float weight;
+    float delay;
+};
+
 // pyarb::py_recipe is the recipe interface used by Python.
 // Calls that return generic types return pybind11::object, to avoid
 // having to wrap some C++ types used by the C++ interface (specifically
@@ -45,8 +60,9 @@ public:
     virtual std::vector<pybind11::object> event_generators(arb::cell_gid_type gid) const {
         return {};
     }
-    virtual std::vector<arb::cell_connection> connections_on(arb::cell_gid_type gid) const {
-        return {};
+    // Returns a list of arb::cell_connection or an array of connection_record.
+    virtual pybind11::object connections_on(arb::cell_gid_type gid) const {
+        return pybind11::list();
     }
     virtual std::vector<arb::gap_junction_connection> gap_junctions_on(arb::cell_gid_type) const {
         return {};
@@ -58,6 +74,35 @@ public:
         return pybind11::none();
     };
     //TODO: virtual pybind11::object global_properties(arb::cell_kind kind) const {return pybind11::none();};
+
+    // Optional bulk queries, used in preference to the per-gid queries above
+    // when building a simulation. Returning None (the default) signals that
+    // the recipe does not implement the bulk query.
+
+    // Array of num_sources(gid) for every gid in the model.
+    virtual pybind11::object num_sources_array() const {
+        return pybind11::none();
+    }
+    // Array of num_targets(gid) for every gid in the model.
+    virtual pybind11::object num_targets_array() const {
+        return pybind11::none();
+    }
+    // Sequences with one entry per gid in gids, each holding the
+    // result of the corresponding per-gid query.
+    virtual pybind11::object connections_for(pybind11::array_t<arb::cell_gid_type> gids) const {
+        return pybind11::none();
+    }
+    virtual pybind11::object event_generators_for(pybind11::array_t<arb::cell_gid_type> gids) const {
+        return pybind11::none();
+    }
+    virtual pybind11::object gap_junctions_for(pybind11::array_t<arb::cell_gid_type> gids) const {
+        return pybind11::none();
+    }
+    // Population-level event generators, expanded per cell in C++; in addition
+    // to those returned by event_generators.
+    virtual pybind11::object event_generator_populations() const {
+        return pybind11::list();
+    }
 };
 
 class py_recipe_trampoline: public py_recipe {
@@ -90,8 +135,8 @@ public:
         PYBIND11_OVERLOAD(std::vector<pybind11::object>, py_recipe, event_generators, gid);
     }
 
-    std::vector<arb::cell_connection> connections_on(arb::cell_gid_type gid) const override {
-        PYBIND11_OVERLOAD(std::vector<arb::cell_connection>, py_recipe, connections_on, gid);
+    pybind11::object connections_on(arb::cell_gid_type gid) const override {
+        PYBIND11_OVERLOAD(pybind11::object, py_recipe, connections_on, gid);
     }
 
     std::vector<arb::gap_junction_connection> gap_junctions_on(arb::cell_gid_type gid) const override {
@@ -105,6 +150,30 @@ public:
     pybind11::object global_properties(arb::cell_kind kind) const override {
         PYBIND11_OVERLOAD(pybind11::object, py_recipe, global_properties, kind);
     }
+
+    pybind11::object num_sources_array() const override {
+        PYBIND11_OVERLOAD(pybind11::object, py_recipe, num_sources_array);
+    }
+
+    pybind11::object num_targets_array() const override {
+        PYBIND11_OVERLOAD(pybind11::object, py_recipe, num_targets_array);
+    }
+
+    pybind11::object connections_for(pybind11::array_t<arb::cell_gid_type> gids) const override {
+        PYBIND11_OVERLOAD(pybind11::object, py_recipe, connections_for, gids);
+    }
+
+    pybind11::object event_generators_for(pybind11::array_t<arb::cell_gid_type> gids) const override {
+        PYBIND11_OVERLOAD(pybind11::object, py_recipe, event_generators_for, gids);
+    }
+
+    pybind11::object gap_junctions_for(pybind11::array_t<arb::cell_gid_type> gids) const override {
+        PYBIND11_OVERLOAD(pybind11::object, py_recipe, gap_junctions_for, gids);
+    }
+
+    pybind11::object event_generator_populations() const override {
+        PYBIND11_OVERLOAD(pybind11::object, py_recipe, event_generator_populations);
+    }
 };
 
 // A recipe shim that holds a pyarb::py_recipe implementation.
@@ -112,11 +181,42 @@ public:
 // to arb::recipe.
 // For example, unwrap cell descriptions stored in PyObject, and rewrap
 // in util::unique_any.
+//
+// Before a simulation is built, prefetch() collects the answers to all of the
+// queries made while building the local cells, in a single pass that holds the
+// GIL, using the optional bulk queries of pyarb::py_recipe where available.
+// Queries that hit the cache do not call back into Python, so that the
+// construction of the simulation can proceed in parallel.
 
 class py_recipe_shim: public arb::recipe {
     // pointer to the python recipe implementation
     std::shared_ptr<py_recipe> impl_;
 
+    template <typename V>
+    using gid_map = std::unordered_map<arb::cell_gid_type, V>;
+
+    // Answers to bulk queries over the whole model, indexed by gid;
+    // empty if not provided by the recipe.
+    std::vector<arb::cell_size_type> num_sources_array_;
+    std::vector<arb::cell_size_type> num_targets_array_;
+
+    // Answers to per-gid queries collected by prefetch().
+    gid_map<arb::cell_size_type> num_sources_;
+    gid_map<arb::cell_size_type> num_targets_;
+    gid_map<arb::cell_size_type> num_gap_junction_sites_;
+    gid_map<arb::cell_kind> cell_kinds_;
+    gid_map<std::vector<arb::cell_connection>> connections_;
+    gid_map<std::vector<arb::event_generator>> event_generators_;
+    gid_map<std::vector<arb::gap_junction_connection>> gap_junctions_;
+    gid_map<std::vector<arb::probe_info>> probes_;
+    std::unordered_map<arb::cell_kind, std::any> global_properties_;
+    std::vector<poisson_population_shim> populations_;
+
+    // Cell descriptions are moved out of the cache when first requested.
+    // The map itself is not modified after prefetch(), so that descriptions
+    // of different cells can be taken concurrently.
+    mutable gid_map<arb::util::unique_any> descriptions_;
+
 public:
     using recipe::recipe;
 
@@ -124,6 +224,10 @@ public:
 
     const char* msg = "Python error already thrown";
 
+    // Fill the caches with everything required to build the cells with the given gids.
+    // Acquires the GIL, and must be called before the shim is shared between threads.
+    void prefetch(const std::vector<arb::cell_gid_type>& gids);
+
     arb::cell_size_type num_cells() const override {
         return try_catch_pyexception([&](){ return impl_->num_cells(); }, msg);
     }
@@ -133,32 +237,38 @@ public:
     arb::util::unique_any get_cell_description(arb::cell_gid_type gid) const override;
 
     arb::cell_kind get_cell_kind(arb::cell_gid_type gid) const override {
+        if (auto it = cell_kinds_.find(gid); it!=cell_kinds_.end()) return it->second;
         return try_catch_pyexception([&](){ return impl_->cell_kind(gid); }, msg);
     }
 
     arb::cell_size_type num_sources(arb::cell_gid_type gid) const override {
+        if (gid<num_sources_array_.size()) return num_sources_array_[gid];
+        if (auto it = num_sources_.find(gid); it!=num_sources_.end()) return it->second;
         return try_catch_pyexception([&](){ return impl_->num_sources(gid); }, msg);
     }
 
     arb::cell_size_type num_targets(arb::cell_gid_type gid) const override {
+        if (gid<num_targets_array_.size()) return num_targets_array_[gid];
+        if (auto it = num_targets_.find(gid); it!=num_targets_.end()) return it->second;
         return try_catch_pyexception([&](){ return impl_->num_targets(gid); }, msg);
     }
 
     arb::cell_size_type num_gap_junction_sites(arb::cell_gid_type gid) const override {
+        if (auto it = num_gap_junction_sites_.find(gid); it!=num_gap_junction_sites_.end()) return it->second;
         return try_catch_pyexception([&](){ return impl_->num_gap_junction_sites(gid); }, msg);
     }
 
     std::vector<arb::event_generator> event_generators(arb::cell_gid_type gid) const override;
 
-    std::vector<arb::cell_connection> connections_on(arb::cell_gid_type gid) const override {
-        return try_catch_pyexception([&](){ return impl_->connections_on(gid); }, msg);
-    }
+    std::vector<arb::cell_connection> connections_on(arb::cell_gid_type gid) const override;
 
     std::vector<arb::gap_junction_connection> gap_junctions_on(arb::cell_gid_type gid) const override {
+        if (auto it = gap_junctions_.find(gid); it!=gap_junctions_.end()) return it->second;
         return try_catch_pyexception([&](){ return impl_->gap_junctions_on(gid); }, msg);
     }
 
     std::vector<arb::probe_info> get_probes(arb::cell_gid_type gid) const override {
+        if (auto it = probes_.find(gid); it!=probes_.end()) return it->second;
         return try_catch_pyexception([&](){ return impl_->probes(gid); }, msg);
     }
 
@@ -1,6 +1,7 @@
 #include <arbor/schedule.hpp>
 #include <arbor/common_types.hpp>
 
+#include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
@@ -30,8 +31,8 @@ std::ostream& operator<<(std::ostream& o, const poisson_schedule_shim& p) {
              << ", seed " << p.seed << ">";
 };
 
-static std::vector<arb::time_type> as_vector(std::pair<const arb::time_type*, const arb::time_type*> ts) {
-    return std::vector<arb::time_type>(ts.first, ts.second);
+static py::array_t<arb::time_type> as_array(arb::time_event_span ts) {
+    return py::array_t<arb::time_type>(py::ssize_t(ts.second-ts.first), ts.first);
 }
 
 //
@@ -83,13 +84,13 @@ arb::schedule regular_schedule_shim::schedule() const {
             tstop.value_or(arb::terminal_time));
 }
 
-std::vector<arb::time_type> regular_schedule_shim::events(arb::time_type t0, arb::time_type t1) {
+py::array_t<arb::time_type> regular_schedule_shim::events(arb::time_type t0, arb::time_type t1) {
     pyarb::assert_throw(is_nonneg()(t0), "t0 must be a non-negative number");
     pyarb::assert_throw(is_nonneg()(t1), "t1 must be a non-negative number");
 
     arb::schedule sched = regular_schedule_shim::schedule();
 
-    return as_vector(sched.events(t0, t1));
+    return as_array(sched.events(t0, t1));
 }
 
 //
@@ -125,13 +126,13 @@ arb::schedule explicit_schedule_shim::schedule() const {
     return arb::explicit_schedule(times);
 }
 
-std::vector<arb::time_type> explicit_schedule_shim::events(arb::time_type t0, arb::time_type t1) {
+py::array_t<arb::time_type> explicit_schedule_shim::events(arb::time_type t0, arb::time_type t1) {
     pyarb::assert_throw(is_nonneg()(t0), "t0 must be a non-negative number");
     pyarb::assert_throw(is_nonneg()(t1), "t1 must be a non-negative number");
 
     arb::schedule sched = explicit_schedule_shim::schedule();
 
-    return as_vector(sched.events(t0, t1));
+    return as_array(sched.events(t0, t1));
 }
 
 //
@@ -171,13 +172,60 @@ arb::schedule poisson_schedule_shim::schedule() const {
     return arb::poisson_schedule(tstart, freq/1000., rng_type(seed));
 }
 
-std::vector<arb::time_type> poisson_schedule_shim::events(arb::time_type t0, arb::time_type t1) {
+py::array_t<arb::time_type> poisson_schedule_shim::events(arb::time_type t0, arb::time_type t1) {
     pyarb::assert_throw(is_nonneg()(t0), "t0 must be a non-negative number");
     pyarb::assert_throw(is_nonneg()(t1), "t1 must be a non-negative number");
 
     arb::schedule sched = poisson_schedule_shim::schedule();
 
-    return as_vector(sched.events(t0, t1));
+    return as_array(sched.events(t0, t1));
+}
+
+// Generate the events in [t0, t1) of the Poisson schedules with start time tstart
+// and the given frequencies and seeds, one schedule per entry; either array may
+// have a single entry, which is then used for all schedules.
+py::list poisson_schedule_events(
+        arb::time_type tstart,
+        py::array_t<arb::time_type, py::array::c_style|py::array::forcecast> freq,
+        py::array_t<poisson_schedule_shim::rng_type::result_type, py::array::c_style|py::array::forcecast> seed,
+        arb::time_type t0,
+        arb::time_type t1)
+{
+    pyarb::assert_throw(is_nonneg()(tstart), "tstart must be a non-negative number");
+    pyarb::assert_throw(is_nonneg()(t0), "t0 must be a non-negative number");
+    pyarb::assert_throw(is_nonneg()(t1), "t1 must be a non-negative number");
+    pyarb::assert_throw(freq.ndim()==1 && seed.ndim()==1, "freq and seed must be one-dimensional");
+
+    const auto n_freq = std::size_t(freq.size());
+    const auto n_seed = std::size_t(seed.size());
+    pyarb::assert_throw(n_freq==n_seed || n_freq==1 || n_seed==1,
+            "freq and seed must have the same length, or length one");
+    const auto n = n_freq==1? n_seed: n_freq;
+
+    const auto* f = freq.data();
+    const auto* s = seed.data();
+    for (std::size_t i = 0; i<n_freq; ++i) {
+        pyarb::assert_throw(is_nonneg()(f[i]), "frequency must be a non-negative number");
+    }
+
+    std::vector<std::vector<arb::time_type>> events(n);
+    {
+        py::gil_scoped_release release;
+        for (std::size_t i = 0; i<n; ++i) {
+            // convert frequency to kHz.
+            auto fi = f[n_freq==1? 0: i]/1000.;
+            auto si = s[n_seed==1? 0: i];
+            auto sched = arb::poisson_schedule(tstart, fi, poisson_schedule_shim::rng_type(si));
+            auto ts = sched.events(t0, t1);
+            events[i].assign(ts.first, ts.second);
+        }
+    }
+
+    py::list result(n);
+    for (std::size_t i = 0; i<n; ++i) {
+        result[i] = py::array_t<arb::time_type>(py::ssize_t(events[i].size()), events[i].data());
+    }
+    return result;
 }
 
 void register_schedules(py::module& m) {
@@ -208,7 +256,7 @@ void register_schedules(py::module& m) {
         .def_property("dt", &regular_schedule_shim::get_dt, &regular_schedule_shim::set_dt,
             "The interval between time points [ms].")
         .def("events", &regular_schedule_shim::events,
-            "A view of monotonically increasing time values in the half-open interval [t0, t1).")
+            "A numpy array of monotonically increasing time values in the half-open interval [t0, t1).")
         .def("__str__",  util::to_string<regular_schedule_shim>)
         .def("__repr__", util::to_string<regular_schedule_shim>);
 
@@ -226,7 +274,7 @@ void register_schedules(py::module& m) {
         .def_property("times", &explicit_schedule_shim::get_times, &explicit_schedule_shim::set_times,
             "A list of times [ms].")
         .def("events", &explicit_schedule_shim::events,
-            "A view of monotonically increasing time values in the half-open interval [t0, t1).")
+            "A numpy array of monotonically increasing time values in the half-open interval [t0, t1).")
         .def("__str__",  util::to_string<explicit_schedule_shim>)
         .def("__repr__", util::to_string<explicit_schedule_shim>);
 
@@ -248,9 +296,19 @@ void register_schedules(py::module& m) {
         .def_readwrite("seed", &poisson_schedule_shim::seed,
             "The seed for the random number generator.")
         .def("events", &poisson_schedule_shim::events,
-            "A view of monotonically increasing time values in the half-open interval [t0, t1).")
+            "A numpy array of monotonically increasing time values in the half-open interval [t0, t1).")
         .def("__str__",  util::to_string<poisson_schedule_shim>)
         .def("__repr__", util::to_string<poisson_schedule_shim>);
+
+    m.def("poisson_schedule_events", &poisson_schedule_events,
+        "tstart"_a, "freq"_a, "seed"_a, "t0"_a, "t1"_a,
+        "Generate the events in the half-open interval [t0, t1) for many Poisson schedules\n"
+        "in one call, returning a list with a numpy array of times per schedule. Arguments:\n"
+        "  tstart: The delivery time of the first event in each sequence [ms].\n"
+        "  freq:   An array of expected frequencies [Hz], one per schedule.\n"
+        "  seed:   An array of seeds for the random number generators, one per schedule.\n"
+        "Either freq or seed may have a single entry, used for all schedules.\n"
+        "The events for entry i are those of poisson_schedule(tstart, freq[i], seed[i]).");
 }
 
 }
@@ -4,6 +4,7 @@
 #include <random>
 #include <vector>
 
+#include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
@@ -49,7 +50,7 @@ struct regular_schedule_shim: schedule_shim_base {
 
     arb::schedule schedule() const override;
 
-    std::vector<arb::time_type> events(arb::time_type t0, arb::time_type t1);
+    pybind11::array_t<arb::time_type> events(arb::time_type t0, arb::time_type t1);
 };
 
 // A Python shim for arb::explicit_schedule.
@@ -68,7 +69,7 @@ struct explicit_schedule_shim: schedule_shim_base {
 
     arb::schedule schedule() const override;
 
-    std::vector<arb::time_type> events(arb::time_type t0, arb::time_type t1);
+    pybind11::array_t<arb::time_type> events(arb::time_type t0, arb::time_type t1);
 };
 
 // A Python shim for arb::poisson_schedule.
@@ -93,7 +94,7 @@ struct poisson_schedule_shim: schedule_shim_base {
 
     arb::schedule schedule() const override;
 
-    std::vector<arb::time_type> events(arb::time_type t0, arb::time_type t1);
+    pybind11::array_t<arb::time_type> events(arb::time_type t0, arb::time_type t1);
 };
 
 }
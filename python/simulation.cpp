@@ -1,6 +1,10 @@
 #include <memory>
+#include <optional>
+#include <string>
+
 #include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
 
 #include <arbor/common_types.hpp>
 #include <arbor/sampling.hpp>
@@ -11,6 +15,7 @@
 #include "pyarb.hpp"
 #include "recipe.hpp"
 #include "schedule.hpp"
+#include "spikes.hpp"
 
 namespace py = pybind11;
 
@@ -22,12 +27,17 @@ enum class spike_recording {
     off, local, all
 };
 
+// Number of spikes buffered before they are handed to the writer thread
+// when recording spikes to file.
+constexpr std::size_t spike_file_buffer_size = 1<<16;
+
 // Wraps an arb::simulation object and in addition manages a set of
 // sampler callbacks for retrieving probe data.
 
 class simulation_shim {
     std::unique_ptr<arb::simulation> sim_;
     std::vector<arb::spike> spike_record_;
+    std::shared_ptr<spike_file_writer> spike_writer_;
     pyarb_global_ptr global_ptr_;
 
     using sample_recorder_ptr = std::unique_ptr<sample_recorder>;
@@ -36,9 +46,62 @@ class simulation_shim {
     // These are only used as the target sampler of a single probe id.
     struct sampler_callback {
         std::shared_ptr<sample_recorder_vec> recorders;
+        // A copy of the sampling schedule, used to predict the number of samples.
+        std::shared_ptr<arb::schedule> sched;
+        // Optional Python callable that is handed the samples as they are
+        // taken, instead of accumulating them in the recorders.
+        std::shared_ptr<py::object> sink;
 
         void operator()(arb::probe_metadata pm, std::size_t n_record, const arb::sample_record* records) {
-            recorders->at(pm.index)->record(pm.meta, n_record, records);
+            auto& rec = recorders->at(pm.index);
+            rec->record(pm.meta, n_record, records);
+
+            if (sink) {
+                // Called from the simulation's worker threads, once per epoch.
+                deliver(pm.index, *rec);
+            }
+        }
+
+        // Hand the complete samples of a recorder to the sink, if there are any.
+        void deliver(std::size_t index, sample_recorder& rec) const {
+            try_catch_pyexception([&]() {
+                py::gil_scoped_acquire guard;
+                auto samples = rec.take_samples();
+                if (py::len(samples)) {
+                    (*sink)(index, std::move(samples), rec.meta());
+                }
+            },
+            "Python error already thrown");
+        }
+
+        // Complete the reduction windows that are still open, and hand them
+        // to the sink.
+        void flush() const {
+            if (!sink) return;
+            for (std::size_t i = 0; i<recorders->size(); ++i) {
+                auto& rec = recorders->at(i);
+                rec->flush();
+                deliver(i, *rec);
+            }
+        }
+
+        // Preallocate recorder storage for the samples taken in [t0, t1).
+        // Recorders that pass their samples to a sink only hold one epoch of
+        // samples at a time, so are left alone.
+        void reserve(arb::time_type t0, arb::time_type t1) const {
+            if (sink) return;
+            auto times = sched->events(t0, t1);
+            auto n_sample = std::size_t(times.second-times.first);
+            for (auto& rec: *recorders) {
+                rec->reserve(n_sample);
+            }
+        }
+
+        void reset() const {
+            sched->reset();
+            for (auto& rec: *recorders) {
+                rec->reset();
+            }
         }
 
         py::list samples() const {
@@ -54,12 +117,25 @@ class simulation_shim {
 
     std::unordered_map<arb::sampler_association_handle, sampler_callback> sampler_map_;
 
+    // Simulation time reached by the last call to run().
+    arb::time_type t_ = 0;
+
 public:
     simulation_shim(std::shared_ptr<py_recipe>& rec, const arb::domain_decomposition& decomp, const context_shim& ctx, pyarb_global_ptr global_ptr):
         global_ptr_(global_ptr)
     {
         try {
-            sim_.reset(new arb::simulation(py_recipe_shim(rec), decomp, ctx.context));
+            // Query the recipe for everything needed to build the local cells
+            // up front, so that construction does not call back into Python.
+            py_recipe_shim shim(rec);
+            std::vector<arb::cell_gid_type> gids;
+            gids.reserve(decomp.num_local_cells);
+            for (const auto& g: decomp.groups) {
+                gids.insert(gids.end(), g.gids.begin(), g.gids.end());
+            }
+            shim.prefetch(gids);
+
+            sim_.reset(new arb::simulation(shim, decomp, ctx.context));
         }
         catch (...) {
             py_reset_and_throw();
@@ -67,28 +143,103 @@ public:
         }
     }
 
+    // Hand the open reduction windows to the sinks; an error raised by a
+    // sink can not be reported here, and is dropped.
+    ~simulation_shim() {
+        if (py_exception) return;
+        try {
+            for (auto&& [handle, cb]: sampler_map_) {
+                cb.flush();
+            }
+        }
+        catch (...) {
+            py_exception = nullptr;
+        }
+    }
+
     void reset() {
         sim_->reset();
+        t_ = 0;
         spike_record_.clear();
         for (auto&& [handle, cb]: sampler_map_) {
-            for (auto& rec: *cb.recorders) {
-                rec->reset();
-            }
+            cb.reset();
         }
     }
 
     arb::time_type run(arb::time_type tfinal, arb::time_type dt) {
-        return sim_->run(tfinal, dt);
+        // The sampling schedules are known, so size the recorders for the
+        // samples of the whole run up front.
+        if (tfinal>t_) {
+            for (auto&& [handle, cb]: sampler_map_) {
+                cb.reserve(t_, tfinal);
+            }
+        }
+
+        arb::time_type t;
+        try {
+            t = t_ = sim_->run(tfinal, dt);
+        }
+        catch (...) {
+            // Rethrow any exception raised by a Python sample sink.
+            py_reset_and_throw();
+            throw;
+        }
+        // Make sure that the spike file is complete when control returns to Python.
+        if (spike_writer_) spike_writer_->flush();
+        return t;
+    }
+
+    // Reduction windows that are open at the end of a run stay open, as the
+    // next run may add samples to them; they are only completed on request,
+    // or when the sampler is removed or the simulation destroyed.
+    void flush_samples() {
+        try {
+            for (auto&& [handle, cb]: sampler_map_) {
+                cb.flush();
+            }
+        }
+        catch (...) {
+            py_reset_and_throw();
+            throw;
+        }
     }
 
     void set_binning_policy(arb::binning_kind policy, arb::time_type bin_interval) {
         sim_->set_binning_policy(policy, bin_interval);
     }
 
-    void record(spike_recording policy) {
-        auto spike_recorder = [this](const std::vector<arb::spike>& spikes) {
-            spike_record_.insert(spike_record_.end(), spikes.begin(), spikes.end());
-        };
+    void set_spike_exchange(arb::spike_exchange_kind kind) {
+        sim_->set_spike_exchange(kind);
+    }
+
+    void set_spike_exchange_depth(unsigned depth) {
+        sim_->set_spike_exchange_depth(depth);
+    }
+
+    std::vector<double> group_advance_times() const {
+        return sim_->group_advance_times();
+    }
+
+    void record(spike_recording policy, std::optional<std::string> path) {
+        // Spikes are written to the file, if any, by a background thread.
+        // Replacing the writer closes the file of the previous one, after
+        // writing any outstanding spikes.
+        spike_writer_.reset();
+        if (path && policy!=spike_recording::off) {
+            spike_writer_ = std::make_shared<spike_file_writer>(*path, spike_file_buffer_size);
+        }
+
+        arb::spike_export_function spike_recorder;
+        if (spike_writer_) {
+            spike_recorder = [writer = spike_writer_](const std::vector<arb::spike>& spikes) {
+                writer->append(spikes);
+            };
+        }
+        else {
+            spike_recorder = [this](const std::vector<arb::spike>& spikes) {
+                spike_record_.insert(spike_record_.end(), spikes.begin(), spikes.end());
+            };
+        }
 
         switch (policy) {
         case spike_recording::off:
@@ -110,6 +261,19 @@ public:
         return py::array_t<arb::spike>(py::ssize_t(spike_record_.size()), spike_record_.data());
     }
 
+    // Hand over the spikes recorded since the last call, without copying: the
+    // returned array owns the buffer. Recording continues into a fresh buffer
+    // with the same capacity, so that memory use is bounded by the number of
+    // spikes between calls rather than by the total simulated time.
+    py::object drain_spikes() {
+        auto* buffer = new std::vector<arb::spike>(std::move(spike_record_));
+        spike_record_ = std::vector<arb::spike>();
+        spike_record_.reserve(buffer->capacity());
+
+        py::capsule owner(buffer, [](void* p) { delete static_cast<std::vector<arb::spike>*>(p); });
+        return py::array_t<arb::spike>(py::ssize_t(buffer->size()), buffer->data(), owner);
+    }
+
     py::list get_probe_metadata(arb::cell_member_type probe_id) const {
         py::list result;
         for (auto&& pm: sim_->get_probe_metadata(probe_id)) {
@@ -118,17 +282,28 @@ public:
         return result;
     }
 
-    arb::sampler_association_handle sample(arb::cell_member_type probe_id, const pyarb::schedule_shim_base& sched, arb::sampling_policy policy) {
+    arb::sampler_association_handle sample(arb::cell_member_type probe_id, const pyarb::schedule_shim_base& sched, arb::sampling_policy policy, py::object sink, sample_reduction_kind reduction, arb::time_type window) {
+        if (reduction!=sample_reduction_kind::none && !(window>0)) {
+            throw pyarb_error("a sample reduction requires a positive window length");
+        }
+
         std::shared_ptr<sample_recorder_vec> recorders{new sample_recorder_vec};
 
         for (const arb::probe_metadata& pm: sim_->get_probe_metadata(probe_id)) {
-            recorders->push_back(global_ptr_->recorder_factories.make_recorder(pm.meta));
+            recorders->push_back(global_ptr_->recorder_factories.make_recorder(pm.meta, {reduction, window}));
         }
 
         // Constructed callbacks are passed to the underlying simulator object, _and_ a copy
         // is kept in sampler_map_; the two copies share the same recorder data.
 
-        sampler_callback cb{std::move(recorders)};
+        // The sink is shared by all copies of the callback, and released with the GIL held.
+        std::shared_ptr<py::object> sink_ptr;
+        if (!sink.is_none()) {
+            sink_ptr.reset(new py::object(std::move(sink)),
+                [](py::object* p) { py::gil_scoped_acquire guard; delete p; });
+        }
+
+        sampler_callback cb{std::move(recorders), std::make_shared<arb::schedule>(sched.schedule()), std::move(sink_ptr)};
         auto sah = sim_->add_sampler(arb::one_probe(probe_id), sched.schedule(), cb, policy);
         sampler_map_.insert({sah, cb});
 
@@ -137,12 +312,32 @@ public:
 
     void remove_sampler(arb::sampler_association_handle sah) {
         sim_->remove_sampler(sah);
-        sampler_map_.erase(sah);
+        if (auto iter = sampler_map_.find(sah); iter!=sampler_map_.end()) {
+            auto cb = std::move(iter->second);
+            sampler_map_.erase(iter);
+            try {
+                cb.flush();
+            }
+            catch (...) {
+                py_reset_and_throw();
+                throw;
+            }
+        }
     }
 
     void remove_all_samplers() {
         sim_->remove_all_samplers();
+        auto samplers = std::move(sampler_map_);
         sampler_map_.clear();
+        try {
+            for (auto&& [handle, cb]: samplers) {
+                cb.flush();
+            }
+        }
+        catch (...) {
+            py_reset_and_throw();
+            throw;
+        }
     }
 
     py::list samples(arb::sampler_association_handle sah) {
@@ -162,6 +357,13 @@ void register_simulation(pybind11::module& m, pyarb_global_ptr global_ptr) {
        .value("lax", arb::sampling_policy::lax)
        .value("exact", arb::sampling_policy::exact);
 
+    py::enum_<sample_reduction_kind>(m, "sample_reduction")
+       .value("none", sample_reduction_kind::none)
+       .value("mean", sample_reduction_kind::mean)
+       .value("min", sample_reduction_kind::min)
+       .value("max", sample_reduction_kind::max)
+       .value("rms", sample_reduction_kind::rms);
+
     py::enum_<spike_recording>(m, "spike_recording")
        .value("off", spike_recording::off)
        .value("local", spike_recording::local)
@@ -192,6 +394,10 @@ void register_simulation(pybind11::module& m, pyarb_global_ptr global_ptr) {
         .def("reset", &simulation_shim::reset,
             pybind11::call_guard<pybind11::gil_scoped_release>(),
             "Reset the state of the simulation to its initial state.")
+        .def("flush_samples", &simulation_shim::flush_samples,
+            "Complete the sample reduction windows that are still open, and pass their rows to the\n"
+            "sinks of the samplers. This also happens when a sampler is removed, and when the\n"
+            "simulation is destroyed.")
         .def("run", &simulation_shim::run,
             pybind11::call_guard<pybind11::gil_scoped_release>(),
             "Run the simulation from current simulation time to tfinal [ms], with maximum time step size dt [ms].",
@@ -199,17 +405,38 @@ void register_simulation(pybind11::module& m, pyarb_global_ptr global_ptr) {
         .def("set_binning_policy", &simulation_shim::set_binning_policy,
             "Set the binning policy for event delivery, and the binning time interval if applicable [ms].",
             "policy"_a, "bin_interval"_a)
+        .def("set_spike_exchange", &simulation_shim::set_spike_exchange,
+            pybind11::call_guard<pybind11::gil_scoped_release>(),
+            "Set the policy for exchanging spikes between ranks; must be called with the same policy on all ranks.",
+            "policy"_a)
+        .def("set_spike_exchange_depth", &simulation_shim::set_spike_exchange_depth,
+            "Set the number of epochs over which each spike exchange overlaps with cell updates (default 1);\n"
+            "the epoch length is min_delay/(depth+1). Must be called with the same depth on all ranks.",
+            "depth"_a)
+        .def("group_advance_times", &simulation_shim::group_advance_times,
+            "The wall time [s] spent advancing each local cell group since construction or the last reset,\n"
+            "in the order of the groups in the domain decomposition.")
         .def("record", &simulation_shim::record,
-            "Disable or enable local or global spike recording.")
+            "Disable or enable local or global spike recording.\n"
+            "If a path is given, spikes are written to that file instead of being kept in memory;\n"
+            "the file can be read with arbor.read_spikes.",
+            "policy"_a, "path"_a=pybind11::none())
         .def("spikes", &simulation_shim::spikes,
             "Retrieve recorded spikes as numpy array.")
+        .def("drain_spikes", &simulation_shim::drain_spikes,
+            "Retrieve the spikes recorded since the last call as numpy array, and remove them from the simulation.")
         .def("probe_metadata", &simulation_shim::get_probe_metadata,
             "Retrieve metadata associated with given probe id.",
             "probe_id"_a)
         .def("sample", &simulation_shim::sample,
             "Record data from probes with given probe_id according to supplied schedule.\n"
-            "Returns handle for retrieving data or removing the sampling.",
-            "probe_id"_a, "schedule"_a, "policy"_a = arb::sampling_policy::lax)
+            "Returns handle for retrieving data or removing the sampling.\n"
+            "If a sink is given, it is called as sink(index, samples, meta) with the samples\n"
+            "of each epoch, which are then discarded instead of being retained for samples().\n"
+            "If a reduction is given, one row is recorded per time window of length window [ms],\n"
+            "holding the reduction of the samples in that window.",
+            "probe_id"_a, "schedule"_a, "policy"_a = arb::sampling_policy::lax, "sink"_a = pybind11::none(),
+            "reduction"_a = sample_reduction_kind::none, "window"_a = 0.)
         .def("samples", &simulation_shim::samples,
             "Retrieve sample data as a list, one element per probe associated with the query.",
             "handle"_a)
@@ -1,16 +1,156 @@
+#include <cstdint>
+#include <cstring>
 #include <memory>
 #include <vector>
 
+#include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
 #include <arbor/spike.hpp>
 #include <arbor/simulation.hpp>
 
+#include "error.hpp"
+#include "spikes.hpp"
 #include "strprintf.hpp"
 
 namespace pyarb {
 
+constexpr const char spike_file_writer::magic[8];
+
+spike_file_writer::spike_file_writer(const std::string& path, std::size_t buffer_size):
+    path_(path),
+    out_(path, std::ios::binary|std::ios::trunc),
+    buffer_size_(buffer_size)
+{
+    if (!out_) {
+        throw pyarb_error(util::pprintf("unable to open spike file \"{}\" for writing", path));
+    }
+    out_.write(magic, sizeof(magic));
+    pending_.reserve(buffer_size_);
+    worker_ = std::thread([this]() { run(); });
+}
+
+spike_file_writer::~spike_file_writer() {
+    {
+        std::lock_guard<std::mutex> lock(mutex_);
+        done_ = true;
+    }
+    cv_.notify_all();
+    worker_.join();
+}
+
+void spike_file_writer::append(const std::vector<arb::spike>& spikes) {
+    std::lock_guard<std::mutex> lock(mutex_);
+    if (error_) std::rethrow_exception(error_);
+
+    pending_.insert(pending_.end(), spikes.begin(), spikes.end());
+    if (pending_.size()>=buffer_size_) {
+        write_requested_ = true;
+        cv_.notify_all();
+    }
+}
+
+void spike_file_writer::flush() {
+    std::unique_lock<std::mutex> lock(mutex_);
+    write_requested_ = true;
+    cv_.notify_all();
+    cv_.wait(lock, [this]() { return !write_requested_ && !busy_ && pending_.empty(); });
+    if (error_) std::rethrow_exception(error_);
+}
+
+// The writer thread: swap out the pending spikes whenever a write is requested,
+// and write them without holding the lock, so that append() can proceed.
+void spike_file_writer::run() {
+    std::vector<arb::spike> block;
+    block.reserve(buffer_size_);
+
+    std::unique_lock<std::mutex> lock(mutex_);
+    for (;;) {
+        cv_.wait(lock, [this]() { return write_requested_ || done_; });
+        write_requested_ = false;
+
+        if (!pending_.empty()) {
+            std::swap(block, pending_);
+            busy_ = true;
+            lock.unlock();
+
+            std::exception_ptr err;
+            try {
+                write_block(block);
+            }
+            catch (...) {
+                err = std::current_exception();
+            }
+            block.clear();
+
+            lock.lock();
+            if (err && !error_) error_ = err;
+            busy_ = false;
+        }
+        cv_.notify_all();
+
+        if (done_ && pending_.empty()) return;
+    }
+}
+
+void spike_file_writer::write_block(const std::vector<arb::spike>& spikes) {
+    const std::uint64_t n = spikes.size();
+
+    std::vector<std::uint32_t> gid(n), index(n);
+    std::vector<double> time(n);
+    for (std::size_t i = 0; i<n; ++i) {
+        gid[i] = spikes[i].source.gid;
+        index[i] = spikes[i].source.index;
+        time[i] = spikes[i].time;
+    }
+
+    out_.write(reinterpret_cast<const char*>(&n), sizeof(n));
+    out_.write(reinterpret_cast<const char*>(gid.data()), n*sizeof(std::uint32_t));
+    out_.write(reinterpret_cast<const char*>(index.data()), n*sizeof(std::uint32_t));
+    out_.write(reinterpret_cast<const char*>(time.data()), n*sizeof(double));
+    out_.flush();
+
+    if (!out_) {
+        throw pyarb_error(util::pprintf("error writing to spike file \"{}\"", path_));
+    }
+}
+
+std::vector<arb::spike> read_spike_file(const std::string& path) {
+    std::ifstream in(path, std::ios::binary);
+    if (!in) {
+        throw pyarb_error(util::pprintf("unable to open spike file \"{}\"", path));
+    }
+
+    char header[sizeof(spike_file_writer::magic)];
+    if (!in.read(header, sizeof(header)) || std::memcmp(header, spike_file_writer::magic, sizeof(header))) {
+        throw pyarb_error(util::pprintf("\"{}\" is not an Arbor spike file", path));
+    }
+
+    std::vector<arb::spike> spikes;
+    std::vector<std::uint32_t> gid, index;
+    std::vector<double> time;
+
+    std::uint64_t n;
+    while (in.read(reinterpret_cast<char*>(&n), sizeof(n))) {
+        gid.resize(n);
+        index.resize(n);
+        time.resize(n);
+        in.read(reinterpret_cast<char*>(gid.data()), n*sizeof(std::uint32_t));
+        in.read(reinterpret_cast<char*>(index.data()), n*sizeof(std::uint32_t));
+        in.read(reinterpret_cast<char*>(time.data()), n*sizeof(double));
+        if (!in) {
+            throw pyarb_error(util::pprintf("spike file \"{}\" is truncated", path));
+        }
+
+        spikes.reserve(spikes.size()+n);
+        for (std::size_t i = 0; i<n; ++i) {
+            spikes.push_back({{gid[i], index[i]}, time[i]});
+        }
+    }
+    return spikes;
+}
+
 // A functor that models arb::spike_export_function.
 // Holds a shared pointer to the spike_vec used to store the spikes, so that if
 // the spike_vec in spike_recorder is garbage collected in Python, stores will
@@ -82,6 +222,14 @@ void register_spike_handling(pybind11::module& m) {
         .def(pybind11::init<>())
         .def_property_readonly("spikes", &spike_recorder::spikes, "A list of the recorded spikes.");
 
+    m.def("read_spikes",
+          [](const std::string& path) {
+              auto spikes = read_spike_file(path);
+              return pybind11::array_t<arb::spike>(pybind11::ssize_t(spikes.size()), spikes.data());
+          },
+          "path"_a,
+          "Read the spikes in a file written by simulation.record as numpy array.");
+
     m.def("attach_spike_recorder", &attach_spike_recorder,
           "sim"_a,
           "Attach a spike recorder to an arbor simulation.\n"
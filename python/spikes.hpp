@@ -0,0 +1,75 @@
+#pragma once
+
+#include <condition_variable>
+#include <cstddef>
+#include <exception>
+#include <fstream>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include <arbor/spike.hpp>
+
+namespace pyarb {
+
+// Writes spikes to a binary file on a background thread.
+//
+// Spikes passed to append() are buffered in memory, and handed to the writer
+// thread once the buffer holds at least buffer_size spikes, so that the caller,
+// typically a spike callback called from the simulation's epoch loop, does not
+// wait on I/O.
+//
+// The file starts with the 8 byte magic string spike_file_writer::magic,
+// followed by blocks of spikes. Each block is stored in columnar form:
+//
+//     uint64 n           number of spikes in the block
+//     uint32 gid[n]      gids of the spike sources
+//     uint32 index[n]    indices of the spike sources
+//     float64 time[n]    spike times [ms]
+//
+// All values are stored in native byte order.
+
+class spike_file_writer {
+public:
+    static constexpr const char magic[8] = {'A', 'R', 'B', 'S', 'P', 'K', '0', '1'};
+
+    spike_file_writer(const std::string& path, std::size_t buffer_size);
+    ~spike_file_writer();
+
+    spike_file_writer(const spike_file_writer&) = delete;
+    spike_file_writer& operator=(const spike_file_writer&) = delete;
+
+    // Buffer spikes for writing.
+    void append(const std::vector<arb::spike>& spikes);
+
+    // Block until all spikes appended so far have been written to the file.
+    // Rethrows any error encountered by the writer thread.
+    void flush();
+
+    const std::string& path() const { return path_; }
+
+private:
+    std::string path_;
+    std::ofstream out_;
+    std::size_t buffer_size_;
+
+    std::mutex mutex_;
+    std::condition_variable cv_;
+    std::vector<arb::spike> pending_;
+    bool write_requested_ = false;
+    bool busy_ = false;
+    bool done_ = false;
+    std::exception_ptr error_;
+
+    std::thread worker_;
+
+    void run();
+    void write_block(const std::vector<arb::spike>& spikes);
+};
+
+// Read all spikes from a file written by spike_file_writer.
+std::vector<arb::spike> read_spike_file(const std::string& path);
+
+} // namespace pyarb
@@ -18,6 +18,7 @@ try:
     import test_schedules
     import test_cable_probes
     import test_morphology
+    import test_simulator
     # add more if needed
 except ModuleNotFoundError:
     from test import options
@@ -28,6 +29,7 @@ except ModuleNotFoundError:
     from test.unit import test_schedules
     from test.unit import test_cable_probes
     from test.unit import test_morphology
+    from test.unit import test_simulator
     # add more if needed
 
 test_modules = [\
@@ -37,7 +39,8 @@ test_modules = [\
     test_identifiers,\
     test_schedules,\
     test_cable_probes,\
-    test_morphology\
+    test_morphology,\
+    test_simulator\
 ] # add more if needed
 
 def suite():
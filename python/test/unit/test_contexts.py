@@ -77,6 +77,34 @@ class Contexts(unittest.TestCase):
         self.assertEqual(ctx.ranks, 1)
         self.assertEqual(ctx.rank, 0)
 
+    def test_task_scheduler(self):
+        alloc = arb.proc_allocation(threads = 4)
+        self.assertEqual(alloc.scheduler, arb.task_scheduler.queue)
+        self.assertEqual(arb.context(alloc).scheduler, arb.task_scheduler.queue)
+
+        alloc.scheduler = arb.task_scheduler.work_stealing
+        ctx = arb.context(alloc)
+        self.assertEqual(ctx.threads, 4)
+        self.assertEqual(ctx.scheduler, arb.task_scheduler.work_stealing)
+
+    def test_thread_binding(self):
+        alloc = arb.proc_allocation(threads = 2)
+        self.assertEqual(alloc.bind_threads, arb.thread_binding.none)
+        self.assertEqual(arb.context(alloc).bind_threads, arb.thread_binding.none)
+
+        for binding in [arb.thread_binding.cores, arb.thread_binding.numa]:
+            alloc = arb.proc_allocation(threads = 2, bind_threads = binding)
+            ctx = arb.context(alloc)
+            self.assertEqual(ctx.threads, 2)
+            self.assertEqual(ctx.bind_threads, binding)
+
+    def test_spike_encoding(self):
+        ctx = arb.context()
+
+        self.assertEqual(ctx.spike_encoding, arb.spike_encoding.plain)
+        ctx.spike_encoding = arb.spike_encoding.compact
+        self.assertEqual(ctx.spike_encoding, arb.spike_encoding.compact)
+
     def test_context_allocation(self):
         alloc = arb.proc_allocation()
 
@@ -56,6 +56,27 @@ class hetero_recipe (arb.recipe):
         else:
             return arb.cell_kind.cable
 
+# Cable cells connected by gap junctions in pairs (0, 1), (2, 3), ...
+class gj_pair_recipe (arb.recipe):
+    def __init__(self, n=4):
+        arb.recipe.__init__(self)
+        self.ncells = n
+
+    def num_cells(self):
+        return self.ncells
+
+    def cell_description(self, gid):
+        return []
+
+    def cell_kind(self, gid):
+        return arb.cell_kind.cable
+
+    def gap_junctions_on(self, gid):
+        peer = gid^1
+        if peer >= self.ncells:
+            return []
+        return [arb.gap_junction_connection(arb.cell_member(gid, 0), arb.cell_member(peer, 0), 0.1)]
+
 class Domain_Decompositions(unittest.TestCase):
     # 1 cpu core, no gpus; assumes all cells will be put into cell groups of size 1
     def test_domain_decomposition_homogenous_CPU(self):
@@ -243,6 +264,69 @@ class Domain_Decompositions(unittest.TestCase):
             "unable to perform load balancing because cell_kind::spike_source has invalid suggested gpu_cell_group size of 0"):
             decomp = arb.partition_load_balance(recipe, context, hints)
 
+    def test_domain_decomposition_weighted(self):
+        n_cells = 12
+        recipe = homo_recipe(n_cells)
+        context = arb.context()
+        hint = arb.partition_hint()
+        hint.prefer_gpu = False
+        hint.cpu_group_size = 4
+        hints = dict([(arb.cell_kind.cable, hint)])
+
+        # One expensive cell is given a group of its own.
+        decomp = arb.partition_load_balance_weighted(recipe, context, lambda gid: 6 if gid == 0 else 1, hints)
+
+        self.assertEqual(decomp.num_local_cells, n_cells)
+        self.assertEqual(decomp.num_global_cells, n_cells)
+        self.assertEqual([g.gids for g in decomp.groups], [[0], [1, 3, 5, 7, 9, 11], [2, 4, 6, 8, 10]])
+        for gid in range(n_cells):
+            self.assertEqual(decomp.gid_domain(gid), 0)
+
+        with self.assertRaisesRegex(RuntimeError,
+            "unable to perform load balancing because cell 0 has invalid cost -1"):
+            decomp = arb.partition_load_balance_weighted(recipe, context, lambda gid: -1, hints)
+
+    def test_domain_decomposition_graph(self):
+        n_cells = 12
+        recipe = homo_recipe(n_cells)
+        context = arb.context()
+        hint = arb.partition_hint()
+        hint.prefer_gpu = False
+        hint.cpu_group_size = 4
+        hints = dict([(arb.cell_kind.cable, hint)])
+
+        # On a single rank the groups are those of the weighted balancer.
+        cost = lambda gid: 6 if gid == 0 else 1
+        decomp = arb.partition_load_balance_graph(recipe, context, cost, hints)
+        weighted = arb.partition_load_balance_weighted(recipe, context, cost, hints)
+
+        self.assertEqual(decomp.num_local_cells, n_cells)
+        self.assertEqual(decomp.num_global_cells, n_cells)
+        self.assertEqual([g.gids for g in decomp.groups], [g.gids for g in weighted.groups])
+        for gid in range(n_cells):
+            self.assertEqual(decomp.gid_domain(gid), 0)
+
+        decomp = arb.partition_load_balance_graph(recipe, context)
+        self.assertEqual(decomp.num_local_cells, n_cells)
+
+    def test_domain_decomposition_gap_junctions(self):
+        # The gap junctions of a Python recipe are queried with a thread pool.
+        n_cells = 2000
+        recipe = gj_pair_recipe(n_cells)
+        context = arb.context(threads=4)
+
+        cost = lambda gid: 1
+        for decomp in [arb.partition_load_balance(recipe, context),
+                       arb.partition_load_balance_weighted(recipe, context, cost),
+                       arb.partition_load_balance_graph(recipe, context, cost)]:
+            self.assertEqual(decomp.num_local_cells, n_cells)
+            group = {}
+            for i, g in enumerate(decomp.groups):
+                for gid in g.gids:
+                    group[gid] = i
+            for gid in range(0, n_cells, 2):
+                self.assertEqual(group[gid], group[gid+1])
+
 def suite():
     # specify class and test functions in tuple (here: all tests starting with 'test' from class Contexts
     suite = unittest.makeSuite(Domain_Decompositions, ('test'))
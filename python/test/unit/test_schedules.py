@@ -4,6 +4,7 @@
 
 import unittest
 
+import numpy as np
 import arbor as arb
 
 # to be able to run .py file from child directory
@@ -43,9 +44,10 @@ class RegularSchedule(unittest.TestCase):
     def test_events_regular_schedule(self):
         expected = [0, 0.25, 0.5, 0.75, 1.0]
         rs = arb.regular_schedule(tstart=0., dt=0.25, tstop=1.25)
-        self.assertEqual(expected, rs.events(0., 1.25))
-        self.assertEqual(expected, rs.events(0., 5.))
-        self.assertEqual([], rs.events(5., 10.))
+        self.assertEqual(expected, rs.events(0., 1.25).tolist())
+        self.assertEqual(expected, rs.events(0., 5.).tolist())
+        self.assertEqual([], rs.events(5., 10.).tolist())
+        self.assertIsInstance(rs.events(0., 1.25), np.ndarray)
 
     def test_exceptions_regular_schedule(self):
         with self.assertRaisesRegex(RuntimeError,
@@ -138,6 +140,27 @@ class PoissonSchedule(unittest.TestCase):
         for i in range(len(expected)):
             self.assertAlmostEqual(expected[i], ps.events(5000., 6000.)[i], places = 2)
 
+    def test_batch_events_poisson_schedule(self):
+        freqs = np.array([5., 10., 20.])
+        seeds = np.array([0, 7, 42])
+        batch = arb.poisson_schedule_events(1., freqs, seeds, 0., 1000.)
+        self.assertEqual(3, len(batch))
+        for f, s, events in zip(freqs, seeds, batch):
+            expected = arb.poisson_schedule(1., f, s).events(0., 1000.)
+            self.assertEqual(expected.tolist(), events.tolist())
+
+        # A single frequency is used for all seeds.
+        batch = arb.poisson_schedule_events(0., [10.], seeds, 0., 1000.)
+        for s, events in zip(seeds, batch):
+            self.assertEqual(arb.poisson_schedule(0., 10., s).events(0., 1000.).tolist(), events.tolist())
+
+        with self.assertRaisesRegex(RuntimeError,
+            "freq and seed must have the same length, or length one"):
+            arb.poisson_schedule_events(0., [1., 2.], [1, 2, 3], 0., 1.)
+        with self.assertRaisesRegex(RuntimeError,
+            "frequency must be a non-negative number"):
+            arb.poisson_schedule_events(0., [-1.], [1, 2, 3], 0., 1.)
+
     def test_exceptions_poisson_schedule(self):
         with self.assertRaisesRegex(RuntimeError,
             "tstart must be a non-negative number"):
@@ -2,6 +2,8 @@
 #
 # test_simulator.py
 
+import os
+import tempfile
 import unittest
 import numpy as np
 import arbor as A
@@ -77,12 +79,12 @@ class cc2_recipe(A.recipe):
             return []
 
     def cell_description(self, gid):
-        c = A.cable_cell(self.the_morphology, A.label_dict())
-        c.set_properties(Vm=0.0, cm=0.01, rL=30, tempK=300)
-        c.paint('(all)', "pas")
-        c.place('(location 0 0)', A.iclamp(current=10 if gid==0 else 20))
-        c.place('(sum (on-branches 0.3) (location 0 0.6))', "expsyn")
-        return c
+        d = A.decor()
+        d.set_property(Vm=0.0, cm=0.01, rL=30, tempK=300)
+        d.paint('(all)', "pas")
+        d.place('(location 0 0)', A.iclamp(current=10 if gid==0 else 20))
+        d.place('(sum (on-branches 0.3) (location 0 0.6))', "expsyn")
+        return A.cable_cell(self.the_morphology, A.label_dict(), d)
 
 # Test recipe lif2 comprises two independent LIF cells driven by a regular, rapid
 # sequence of incoming spikes. The cells have differing refactory periods.
@@ -122,6 +124,117 @@ class lif2_recipe(A.recipe):
             c.t_ref = 4
         return c
 
+# Test recipe lif_chain comprises a chain of LIF cells, where each cell is
+# connected to its predecessor and the first cell is driven by a regular
+# sequence of incoming spikes.
+
+class lif_chain_recipe(A.recipe):
+    def __init__(self, n):
+        A.recipe.__init__(self)
+        self.ncells = n
+
+    def num_cells(self):
+        return self.ncells
+
+    def num_targets(self, gid):
+        return 1
+
+    def num_sources(self, gid):
+        return 1
+
+    def cell_kind(self, gid):
+        return A.cell_kind.lif
+
+    def connections_on(self, gid):
+        return [A.connection((gid-1, 0), (gid, 0), 400, 1)] if gid>0 else []
+
+    def event_generators(self, gid):
+        return [A.event_generator((0, 0), 400, A.regular_schedule(5))] if gid==0 else []
+
+    def cell_description(self, gid):
+        return A.lif_cell()
+
+# Recipe lif_chain_bulk describes the same model as lif_chain, using only the
+# bulk queries for the connectivity.
+
+class lif_chain_bulk_recipe(lif_chain_recipe):
+    def __init__(self, n):
+        lif_chain_recipe.__init__(self, n)
+
+    def num_targets(self, gid):
+        raise RuntimeError("num_targets called")
+
+    def num_sources(self, gid):
+        raise RuntimeError("num_sources called")
+
+    def connections_on(self, gid):
+        raise RuntimeError("connections_on called")
+
+    def event_generators(self, gid):
+        raise RuntimeError("event_generators called")
+
+    def num_sources_array(self):
+        return np.ones(self.ncells, dtype=np.uint32)
+
+    def num_targets_array(self):
+        return np.ones(self.ncells, dtype=np.uint32)
+
+    def connections_for(self, gids):
+        return [lif_chain_recipe.connections_on(self, gid) for gid in gids]
+
+    def event_generators_for(self, gids):
+        return [lif_chain_recipe.event_generators(self, gid) for gid in gids]
+
+# Recipe lif_chain_table describes the same model as lif_chain, with the
+# connections supplied as NumPy connection tables.
+
+class lif_chain_table_recipe(lif_chain_recipe):
+    def __init__(self, n):
+        lif_chain_recipe.__init__(self, n)
+
+    def connections_on(self, gid):
+        conns = np.zeros(1 if gid>0 else 0, dtype=A.connection_dtype)
+        conns['source_gid'] = max(gid-1, 0)
+        conns['weight'] = 400
+        conns['delay'] = 1
+        return conns
+
+# Recipe lif_poisson describes unconnected LIF cells, each driven by a Poisson
+# generator, supplied either per cell or as a population.
+
+class lif_poisson_recipe(A.recipe):
+    def __init__(self, n, population):
+        A.recipe.__init__(self)
+        self.ncells = n
+        self.population = population
+        self.rates = 200.+100.*np.arange(n)
+
+    def num_cells(self):
+        return self.ncells
+
+    def num_targets(self, gid):
+        return 1
+
+    def num_sources(self, gid):
+        return 1
+
+    def cell_kind(self, gid):
+        return A.cell_kind.lif
+
+    def event_generators(self, gid):
+        if self.population:
+            return []
+        sched = A.poisson_schedule(0., self.rates[gid], 17+gid)
+        return [A.event_generator((gid, 0), 400, sched)]
+
+    def event_generator_populations(self):
+        if self.population:
+            return [A.poisson_population_generator((0, self.ncells), 0, 400, self.rates, seed=17)]
+        return []
+
+    def cell_description(self, gid):
+        return A.lif_cell()
+
 class Simulator(unittest.TestCase):
     def init_sim(self, recipe):
         context = A.context()
@@ -172,6 +285,145 @@ class Simulator(unittest.TestCase):
             self.assertEqual(t, ts[i])
 
 
+    def test_probe_preallocated_recorders(self):
+        sim = self.init_sim(cc2_recipe())
+        sched = A.regular_schedule(0.1)
+        chunks = {}
+        def sink(probe):
+            return lambda index, samples, meta: chunks[probe].append(samples)
+
+        # The recorders are sized for each run; those with a sink are not,
+        # and must record the same samples.
+        handles = {}
+        for probe in [(0, 0), (1, 0)]:
+            chunks[probe] = []
+            handles[probe] = sim.sample(probe, sched, A.sampling_policy.exact)
+            sim.sample(probe, sched, A.sampling_policy.exact, sink=sink(probe))
+
+        for tfinal in [2.5, 2.5, 7.25, 10.]:
+            sim.run(tfinal, 0.01)
+            for probe, h in handles.items():
+                samples, _ = sim.samples(h)[0]
+                self.assertEqual(sum(1 for k in range(200) if k*0.1<tfinal), len(samples))
+                self.assertTrue(np.array_equal(samples, np.concatenate(chunks[probe])))
+
+        self.assertEqual(2, sim.samples(handles[(0, 0)])[0][0].shape[1])
+        self.assertEqual(1+len(sim.probe_metadata((1, 0))[0]), sim.samples(handles[(1, 0)])[0][0].shape[1])
+
+    def test_probe_sample_sink(self):
+        sim = self.init_sim(cc2_recipe())
+        chunks = []
+        def sink(index, samples, meta):
+            chunks.append((index, samples, meta))
+
+        # There are no connections, so each call to run is a single epoch.
+        h = sim.sample((0, 0), A.regular_schedule(0.1), sink=sink)
+        sim.run(5., 0.01)
+        sim.run(10., 0.01)
+
+        # Samples are handed over per epoch, and not retained.
+        self.assertEqual(2, len(chunks))
+        self.assertEqual(0, len(sim.samples(h)[0][0]))
+
+        self.assertTrue(all(i==0 and meta==A.location(1, 1) for i, _, meta in chunks))
+        ts = np.concatenate([s[:,0] for _, s, _ in chunks])
+        self.assertEqual(100, len(ts))
+        self.assertTrue(np.all(np.diff(ts)>0))
+
+    def test_probe_reduced_sample_sink(self):
+        sim = self.init_sim(cc2_recipe())
+        sched = A.regular_schedule(0.1)
+        chunks = []
+        def sink(index, samples, meta):
+            chunks.append(samples)
+
+        # The run does not end on a window boundary: the last, partial window
+        # is passed to the sink when the samples are flushed.
+        h = sim.sample((0, 0), sched, A.sampling_policy.exact, reduction=A.sample_reduction.mean, window=1.0)
+        sim.sample((0, 0), sched, A.sampling_policy.exact, sink=sink, reduction=A.sample_reduction.mean, window=1.0)
+        sim.run(5.5, 0.01)
+        self.assertEqual(5, len(np.concatenate(chunks)))
+        sim.flush_samples()
+
+        expected, _ = sim.samples(h)[0]
+        self.assertEqual(6, len(expected))
+        self.assertTrue(all(len(c)>0 for c in chunks))
+        self.assertTrue(np.array_equal(expected, np.concatenate(chunks)))
+
+        # The sink is not called for epochs without a complete window, and
+        # the open window is passed to it when the sampler is removed.
+        sim = self.init_sim(cc2_recipe())
+        chunks.clear()
+        h = sim.sample((0, 0), sched, A.sampling_policy.exact, sink=sink, reduction=A.sample_reduction.max, window=20.0)
+        sim.run(5., 0.01)
+        self.assertEqual(0, len(chunks))
+        sim.remove_sampler(h)
+        self.assertEqual(1, len(chunks))
+        self.assertEqual(1, len(chunks[0]))
+
+    def test_probe_reduced_sample_sink_across_runs(self):
+        sim = self.init_sim(cc2_recipe())
+        sched = A.regular_schedule(0.1)
+        reductions = {
+            A.sample_reduction.mean: lambda x: np.mean(x),
+            A.sample_reduction.min:  lambda x: np.min(x),
+            A.sample_reduction.max:  lambda x: np.max(x),
+            A.sample_reduction.rms:  lambda x: np.sqrt(np.mean(x**2)),
+        }
+        chunks = {r: [] for r in reductions}
+        def sink(r):
+            return lambda index, samples, meta: chunks[r].append(samples)
+
+        # The window [4, 6) spans two runs, and is reduced as one window.
+        h = sim.sample((0, 0), sched, A.sampling_policy.exact)
+        for r in reductions:
+            sim.sample((0, 0), sched, A.sampling_policy.exact, sink=sink(r), reduction=r, window=2.0)
+        sim.run(5., 0.01)
+        sim.run(10., 0.01)
+        sim.flush_samples()
+
+        full, _ = sim.samples(h)[0]
+        windows = np.floor(full[:,0]/2.0)
+        for r, f in reductions.items():
+            rows = np.concatenate(chunks[r])
+            self.assertTrue(np.array_equal(2.0*np.arange(5), rows[:,0]))
+            for w, row in enumerate(rows):
+                self.assertAlmostEqual(f(full[windows==w, 1]), row[1])
+
+    def test_probe_sample_sink_error(self):
+        sim = self.init_sim(cc2_recipe())
+        def sink(index, samples, meta):
+            raise RuntimeError('sink failed')
+
+        sim.sample((0, 0), A.regular_schedule(0.1), sink=sink)
+        with self.assertRaises(RuntimeError):
+            sim.run(10., 0.01)
+
+    def test_probe_reducing_recorders(self):
+        sim = self.init_sim(cc2_recipe())
+        sched = A.regular_schedule(0.1)
+        h = sim.sample((0, 0), sched, A.sampling_policy.exact)
+        reductions = {
+            A.sample_reduction.mean: lambda x: np.mean(x),
+            A.sample_reduction.min:  lambda x: np.min(x),
+            A.sample_reduction.max:  lambda x: np.max(x),
+            A.sample_reduction.rms:  lambda x: np.sqrt(np.mean(x**2)),
+        }
+        handles = {r: sim.sample((0, 0), sched, A.sampling_policy.exact, reduction=r, window=1.0) for r in reductions}
+        sim.run(10., 0.01)
+
+        full, _ = sim.samples(h)[0]
+        windows = np.floor(full[:,0]/1.0)
+        for r, f in reductions.items():
+            reduced, _ = sim.samples(handles[r])[0]
+            self.assertEqual(10, len(reduced))
+            for k, (t, v) in enumerate(reduced):
+                self.assertAlmostEqual(k*1.0, t)
+                self.assertAlmostEqual(f(full[windows==k, 1]), v)
+
+        with self.assertRaises(RuntimeError):
+            sim.sample((0, 0), sched, reduction=A.sample_reduction.mean)
+
     def test_probe_multi_scalar_recorders(self):
         sim = self.init_sim(cc2_recipe())
         ts = [0, 0.1, 0.3, 0.7]
@@ -250,6 +502,118 @@ class Simulator(unittest.TestCase):
         self.assertEqual([0, 2, 4, 6, 8, 10, 12, 14, 16, 18, 20], s0)
         self.assertEqual([0, 4, 8, 12, 16, 20], s1)
 
+    def test_drain_spikes(self):
+        sim = self.init_sim(lif2_recipe())
+        sim.record(A.spike_recording.all)
+
+        sim.run(11, 0.01)
+        first = sim.drain_spikes().tolist()
+        self.assertEqual(0, len(sim.spikes()))
+
+        sim.run(21, 0.01)
+        second = sim.drain_spikes().tolist()
+        self.assertEqual(0, len(sim.drain_spikes()))
+
+        s0 = sorted([t for s, t in first+second if s==(0, 0)])
+        self.assertEqual([0, 2, 4, 6, 8, 10, 12, 14, 16, 18, 20], s0)
+        self.assertTrue(all(t<11 for s, t in first))
+        self.assertTrue(all(t>=11 for s, t in second))
+
+    def test_spikes_to_file(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, 'spikes.bin')
+
+            sim = self.init_sim(lif2_recipe())
+            sim.record(A.spike_recording.all, path)
+            sim.run(21, 0.01)
+            self.assertEqual(0, len(sim.spikes()))
+
+            spikes = A.read_spikes(path).tolist()
+            s0 = sorted([t for s, t in spikes if s==(0, 0)])
+            s1 = sorted([t for s, t in spikes if s==(1, 0)])
+
+            self.assertEqual([0, 2, 4, 6, 8, 10, 12, 14, 16, 18, 20], s0)
+            self.assertEqual([0, 4, 8, 12, 16, 20], s1)
+
+    def test_population_generators(self):
+        def run_spikes(recipe):
+            sim = self.init_sim(recipe)
+            sim.record(A.spike_recording.all)
+            sim.run(50, 0.01)
+            return sorted((s[0], s[1], t) for s, t in sim.spikes().tolist())
+
+        spikes = run_spikes(lif_poisson_recipe(4, False))
+        self.assertTrue(len(spikes)>0)
+        self.assertEqual(spikes, run_spikes(lif_poisson_recipe(4, True)))
+
+        with self.assertRaises(RuntimeError):
+            A.poisson_population_generator((0, 4), 0, 400, [1., 2.])
+
+    def test_bulk_recipe(self):
+        def run_spikes(recipe):
+            sim = self.init_sim(recipe)
+            sim.record(A.spike_recording.all)
+            sim.run(20, 0.01)
+            return sorted((s[0], s[1], t) for s, t in sim.spikes().tolist())
+
+        spikes = run_spikes(lif_chain_recipe(4))
+        self.assertTrue(len(spikes)>0)
+        self.assertEqual(spikes, run_spikes(lif_chain_bulk_recipe(4)))
+        self.assertEqual(spikes, run_spikes(lif_chain_table_recipe(4)))
+
+    def test_sparse_spike_exchange(self):
+        def run_spikes(exchange):
+            sim = self.init_sim(lif_chain_recipe(4))
+            sim.set_spike_exchange(exchange)
+            # In sparse mode, the global spike record only holds spikes that
+            # were delivered to this rank; the local record holds all.
+            sim.record(A.spike_recording.local)
+            sim.run(20, 0.01)
+            return sorted((s[0], s[1], t) for s, t in sim.spikes().tolist())
+
+        spikes = run_spikes(A.spike_exchange.dense)
+        self.assertTrue(len(spikes)>0)
+        self.assertEqual(spikes, run_spikes(A.spike_exchange.sparse))
+
+    def test_spike_exchange_depth(self):
+        def run_spikes(depth):
+            sim = self.init_sim(lif_chain_recipe(4))
+            sim.set_spike_exchange_depth(depth)
+            sim.record(A.spike_recording.all)
+            sim.run(10, 0.01)
+            sim.run(20, 0.01)
+            return sorted((s[0], s[1], t) for s, t in sim.spikes().tolist())
+
+        spikes = run_spikes(1)
+        self.assertTrue(len(spikes)>0)
+        self.assertEqual(spikes, run_spikes(3))
+
+    def test_group_advance_times(self):
+        sim = self.init_sim(lif_chain_recipe(4))
+        times = sim.group_advance_times()
+        self.assertTrue(len(times)>0)
+        self.assertTrue(all(t==0 for t in times))
+
+        sim.run(10, 0.01)
+        times = sim.group_advance_times()
+        self.assertTrue(all(t>0 for t in times))
+
+        sim.reset()
+        self.assertTrue(all(t==0 for t in sim.group_advance_times()))
+
+    def test_measured_cell_cost(self):
+        recipe = lif_chain_recipe(4)
+        context = A.context()
+        decomp = A.partition_load_balance(recipe, context)
+        sim = A.simulation(recipe, decomp, context)
+        sim.run(10, 0.01)
+
+        cost = A.measured_cell_cost(decomp, sim.group_advance_times(), context)
+        self.assertTrue(all(cost(gid)>0 for gid in range(recipe.num_cells())))
+
+        balanced = A.partition_load_balance_weighted(recipe, context, cost)
+        self.assertEqual(balanced.num_global_cells, recipe.num_cells())
+
 def suite():
     # specify class and test functions in tuple (here: all tests starting with 'test' from class Contexts
     suite = unittest.makeSuite(Simulator, ('test'))
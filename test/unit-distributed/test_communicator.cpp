@@ -140,6 +140,26 @@ TEST(communicator, gather_spikes_variant) {
     }
 }
 
+// A rank that abandons a non-blocking spike gather, as it does when it unwinds
+// after an exception, must not leave the other ranks waiting for it.
+TEST(communicator, abandoned_spike_gather) {
+    const auto num_domains = g_context->distributed->size();
+    const auto rank = g_context->distributed->id();
+
+    std::vector<spike> local_spikes = {gen_spike(rank, rank)};
+    auto request = g_context->distributed->start_gather_spikes(local_spikes);
+    if (rank==0) {
+        request.reset();
+    }
+    else {
+        auto global_spikes = request->wait();
+        EXPECT_EQ(std::size_t(num_domains), global_spikes.values().size());
+    }
+
+    // All ranks are able to continue with further collectives.
+    EXPECT_EQ(num_domains, g_context->distributed->sum(1));
+}
+
 // Test low level gids_gather function when the number of gids per domain
 // are not equal.
 TEST(communicator, gather_gids_variant) {
@@ -330,8 +350,10 @@ test_ring(const domain_decomposition& D, communicator& C, F&& f) {
     std::reverse(local_spikes.begin(), local_spikes.end());
 
     // gather the global set of spikes
+    // (a sparse exchange only gathers the spikes with local targets)
     auto global_spikes = C.exchange(local_spikes);
-    if (global_spikes.size()!=g_context->distributed->sum(local_spikes.size())) {
+    if (C.exchange_kind()==spike_exchange_kind::dense &&
+        global_spikes.size()!=g_context->distributed->sum(local_spikes.size())) {
         return ::testing::AssertionFailure() << "the number of gathered spikes "
             << global_spikes.size() << " doesn't match the expected "
             << g_context->distributed->sum(local_spikes.size());
@@ -401,6 +423,34 @@ TEST(communicator, ring)
     EXPECT_TRUE(test_ring(D, C, [](cell_gid_type g){return g%2==1;}));
 }
 
+TEST(communicator, ring_sparse)
+{
+    unsigned N = g_context->distributed->size();
+
+    unsigned n_local = 10u;
+    unsigned n_global = n_local*N;
+
+    auto R = ring_recipe(n_global);
+    const auto D = partition_load_balance(R, g_context);
+    auto C = communicator(R, D, *g_context);
+    C.set_exchange_kind(spike_exchange_kind::sparse);
+
+    // every cell fires
+    EXPECT_TRUE(test_ring(D, C, [](cell_gid_type g){return true;}));
+    // last cell in each domain fires
+    EXPECT_TRUE(test_ring(D, C, [n_local](cell_gid_type g){return (g+1)%n_local == 0u;}));
+    // even-numbered cells fire
+    EXPECT_TRUE(test_ring(D, C, [](cell_gid_type g){return g%2==0;}));
+    // odd-numbered cells fire
+    EXPECT_TRUE(test_ring(D, C, [](cell_gid_type g){return g%2==1;}));
+
+    // every spike is counted once, whether or not it was sent anywhere
+    EXPECT_EQ(C.num_spikes(), n_global*2u + N);
+
+    C.reset();
+    EXPECT_EQ(0u, C.num_spikes());
+}
+
 template <typename F>
 ::testing::AssertionResult
 test_all2all(const domain_decomposition& D, communicator& C, F&& f) {
@@ -421,8 +471,10 @@ test_all2all(const domain_decomposition& D, communicator& C, F&& f) {
         filter(make_span(0, D.num_global_cells), f));
 
     // gather the global set of spikes
+    // (a sparse exchange only gathers the spikes with local targets)
     auto global_spikes = C.exchange(local_spikes);
-    if (global_spikes.size()!=g_context->distributed->sum(local_spikes.size())) {
+    if (C.exchange_kind()==spike_exchange_kind::dense &&
+        global_spikes.size()!=g_context->distributed->sum(local_spikes.size())) {
         return ::testing::AssertionFailure() << "the number of gathered spikes "
             << global_spikes.size() << " doesn't match the expected "
             << g_context->distributed->sum(local_spikes.size());
@@ -495,3 +547,25 @@ TEST(communicator, all2all)
     // odd-numbered cells fire
     EXPECT_TRUE(test_all2all(D, C, [](cell_gid_type g){return g%2==1;}));
 }
+
+TEST(communicator, all2all_sparse)
+{
+    unsigned N = g_context->distributed->size();
+
+    unsigned n_local = 10u;
+    unsigned n_global = n_local*N;
+
+    auto R = all2all_recipe(n_global);
+    const auto D = partition_load_balance(R, g_context);
+    auto C = communicator(R, D, *g_context);
+    C.set_exchange_kind(spike_exchange_kind::sparse);
+
+    // every cell fires
+    EXPECT_TRUE(test_all2all(D, C, [](cell_gid_type g){return true;}));
+    // only cell 0 fires
+    EXPECT_TRUE(test_all2all(D, C, [](cell_gid_type g){return g==0u;}));
+    // even-numbered cells fire
+    EXPECT_TRUE(test_all2all(D, C, [](cell_gid_type g){return g%2==0;}));
+    // odd-numbered cells fire
+    EXPECT_TRUE(test_all2all(D, C, [](cell_gid_type g){return g%2==1;}));
+}
@@ -1,5 +1,6 @@
 #include "../gtest.h"
 
+#include <cmath>
 #include <cstdio>
 #include <fstream>
 #include <iostream>
@@ -141,6 +142,39 @@ namespace {
         unsigned groups_;
         cell_size_type size_;
     };
+
+    // One module of cells per rank, where the cell with gid is in module
+    // gid%num_ranks, and every cell receives connections from the preceding
+    // three cells in its module.
+    class modular_recipe: public recipe {
+    public:
+        modular_recipe(unsigned num_ranks): num_modules_(num_ranks) {}
+
+        cell_size_type num_cells() const override {
+            return size_*num_modules_;
+        }
+
+        arb::util::unique_any get_cell_description(cell_gid_type) const override {
+            return {};
+        }
+
+        cell_kind get_cell_kind(cell_gid_type gid) const override {
+            return cell_kind::cable;
+        }
+
+        std::vector<cell_connection> connections_on(cell_gid_type gid) const override {
+            std::vector<cell_connection> conns;
+            for (unsigned i = 1; i <= 3; ++i) {
+                auto src = (gid + (size_ - i)*num_modules_) % num_cells();
+                conns.push_back(cell_connection({src, 0}, {gid, 0}, 1.f, 1.f));
+            }
+            return conns;
+        }
+
+    private:
+        cell_size_type size_ = 20;
+        unsigned num_modules_;
+    };
 }
 
 TEST(domain_decomposition, homogeneous_population_mc) {
@@ -186,6 +220,155 @@ TEST(domain_decomposition, homogeneous_population_mc) {
     }
 }
 
+TEST(domain_decomposition, weighted_population_mc) {
+    proc_allocation resources{1, -1};
+#ifdef TEST_MPI
+    auto ctx = make_context(resources, MPI_COMM_WORLD);
+#else
+    auto ctx = make_context(resources);
+#endif
+
+    const unsigned N = arb::num_ranks(ctx);
+    const unsigned I = arb::rank(ctx);
+
+    // The first half of the cells is five times as expensive as the rest.
+    unsigned n_global = 10*N;
+    auto cost = [n_global](cell_gid_type gid) { return gid<n_global/2? 5.: 1.; };
+    const auto D = partition_load_balance_weighted(homo_recipe(n_global, dummy_cell{}), ctx, cost);
+
+    EXPECT_EQ(D.num_global_cells, n_global);
+
+    // The local cells are exactly those that gid_domain maps to this rank.
+    std::vector<int> local(n_global, 0);
+    double local_cost = 0;
+    for (auto& grp: D.groups) {
+        EXPECT_EQ(grp.backend, backend_kind::multicore);
+        EXPECT_EQ(grp.kind, cell_kind::cable);
+        for (auto gid: grp.gids) {
+            ++local[gid];
+            local_cost += cost(gid);
+        }
+    }
+    unsigned n_local = 0;
+    for (auto gid: util::make_span(n_global)) {
+        EXPECT_EQ(local[gid], (unsigned)D.gid_domain(gid)==I);
+        n_local += local[gid];
+    }
+    EXPECT_EQ(D.num_local_cells, n_local);
+
+    // The cost of each rank differs from the average by at most the cost
+    // of one cell.
+    EXPECT_LE(std::abs(local_cost-30.), 5.);
+}
+
+TEST(domain_decomposition, measured_cost_population_mc) {
+    proc_allocation resources{1, -1};
+#ifdef TEST_MPI
+    auto ctx = make_context(resources, MPI_COMM_WORLD);
+#else
+    auto ctx = make_context(resources);
+#endif
+
+    const unsigned N = arb::num_ranks(ctx);
+    const unsigned I = arb::rank(ctx);
+
+    // Measured times of a decomposition in which the first half of the cells
+    // is five times as expensive as the rest.
+    unsigned n_global = 10*N;
+    auto expected = [n_global](cell_gid_type gid) { return gid<n_global/2? 5.: 1.; };
+    auto R = homo_recipe(n_global, dummy_cell{});
+    const auto D = partition_load_balance(R, ctx);
+
+    std::vector<double> times;
+    for (auto& grp: D.groups) {
+        double t = 0;
+        for (auto gid: grp.gids) t += expected(gid);
+        times.push_back(t);
+    }
+    auto cost = measured_cell_cost(D, times, ctx);
+
+    // Each rank holds the measured costs of its equal share of the gids.
+    for (auto gid: util::make_span(10*I, 10*(I+1))) {
+        EXPECT_EQ(expected(gid), cost(gid));
+    }
+
+    const auto W = partition_load_balance_weighted(R, ctx, cost);
+    double local_cost = 0;
+    for (auto& grp: W.groups) {
+        for (auto gid: grp.gids) local_cost += expected(gid);
+    }
+    EXPECT_LE(std::abs(local_cost-30.), 5.);
+}
+
+TEST(domain_decomposition, measured_cost_packing_population_mc) {
+    proc_allocation resources{1, -1};
+#ifdef TEST_MPI
+    auto ctx = make_context(resources, MPI_COMM_WORLD);
+#else
+    auto ctx = make_context(resources);
+#endif
+
+    const unsigned N = arb::num_ranks(ctx);
+
+    // In the first half of the cells every fifth cell is expensive, so that
+    // the ranks are assigned gids outside their equal share of the gids.
+    unsigned n_global = 20*N;
+    auto expected = [n_global](cell_gid_type gid) { return gid<n_global/2 && gid%5==0? 10.: 1.; };
+    auto R = homo_recipe(n_global, dummy_cell{});
+    const auto D = partition_load_balance(R, ctx);
+
+    std::vector<double> times;
+    for (auto& grp: D.groups) {
+        double t = 0;
+        for (auto gid: grp.gids) t += expected(gid);
+        times.push_back(t);
+    }
+    auto cost = measured_cell_cost(D, times, ctx);
+
+    // The cells are packed into groups by their measured costs, as if the
+    // costs were known on every rank.
+    partition_hint_map hints = {{cell_kind::cable, partition_hint{4}}};
+    const auto W = partition_load_balance_weighted(R, ctx, cost, hints);
+    const auto E = partition_load_balance_weighted(R, ctx, expected, hints);
+
+    ASSERT_EQ(E.groups.size(), W.groups.size());
+    for (auto i: util::count_along(E.groups)) {
+        EXPECT_EQ(E.groups[i].gids, W.groups[i].gids);
+    }
+}
+
+TEST(domain_decomposition, graph_population_mc) {
+    proc_allocation resources{1, -1};
+#ifdef TEST_MPI
+    auto ctx = make_context(resources, MPI_COMM_WORLD);
+#else
+    auto ctx = make_context(resources);
+#endif
+
+    const unsigned N = arb::num_ranks(ctx);
+    const unsigned I = arb::rank(ctx);
+
+    auto R = modular_recipe(N);
+    const auto D = partition_load_balance_graph(R, ctx, [](cell_gid_type) { return 1.; });
+
+    EXPECT_EQ(D.num_global_cells, 20*N);
+    EXPECT_EQ(D.num_local_cells, 20u);
+
+    // The local cells are exactly those that gid_domain maps to this rank,
+    // and all connections are between cells on the same rank.
+    unsigned n_local = 0;
+    for (auto& grp: D.groups) {
+        for (auto gid: grp.gids) {
+            EXPECT_EQ(I, (unsigned)D.gid_domain(gid));
+            for (auto& c: R.connections_on(gid)) {
+                EXPECT_EQ(I, (unsigned)D.gid_domain(c.source.gid));
+            }
+            ++n_local;
+        }
+    }
+    EXPECT_EQ(D.num_local_cells, n_local);
+}
+
 #ifdef ARB_GPU_ENABLED
 TEST(domain_decomposition, homogeneous_population_gpu) {
     //  TODO: skip this test
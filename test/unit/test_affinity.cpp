@@ -0,0 +1,69 @@
+#include "../gtest.h"
+
+#include <algorithm>
+#include <mutex>
+#include <vector>
+
+#include <arbor/context.hpp>
+
+#include "hardware/affinity.hpp"
+#include "threading/threading.hpp"
+
+using namespace arb;
+
+using ivec = std::vector<int>;
+
+TEST(affinity, parse_cpu_list) {
+    EXPECT_EQ(ivec{}, hw::parse_cpu_list(""));
+    EXPECT_EQ(ivec{}, hw::parse_cpu_list("\n"));
+    EXPECT_EQ(ivec{3}, hw::parse_cpu_list("3\n"));
+    EXPECT_EQ((ivec{0, 1, 2, 3}), hw::parse_cpu_list("0-3"));
+    EXPECT_EQ((ivec{0, 1, 2, 3, 8, 10, 11}), hw::parse_cpu_list("10-11,0-3,8\n"));
+    EXPECT_EQ((ivec{1, 2}), hw::parse_cpu_list("1,1-2"));
+
+    // Malformed lists.
+    EXPECT_EQ(ivec{}, hw::parse_cpu_list("a"));
+    EXPECT_EQ(ivec{}, hw::parse_cpu_list("0-"));
+    EXPECT_EQ(ivec{}, hw::parse_cpu_list("3-1"));
+    EXPECT_EQ(ivec{}, hw::parse_cpu_list("1;2"));
+}
+
+TEST(affinity, bind_threads) {
+    auto allowed = hw::get_thread_affinity();
+    if (allowed.empty()) return;
+
+    for (auto binding: {thread_binding_kind::cores, thread_binding_kind::numa}) {
+        const int nthreads = 4;
+        std::vector<ivec> cpus;
+        {
+            threading::task_system ts(nthreads, task_scheduler_kind::queue, binding);
+            EXPECT_EQ(binding, ts.binding());
+
+            // Each thread, except for the calling thread, is bound to a
+            // subset of the allowed cpus.
+            std::mutex m;
+            threading::task_group g(&ts);
+            for (int i = 0; i < 8*nthreads; ++i) {
+                if (i%nthreads==0) continue;
+                g.run([&] {
+                    auto c = hw::get_thread_affinity();
+                    std::lock_guard<std::mutex> l(m);
+                    cpus.push_back(c);
+                }, i);
+            }
+            g.wait();
+            EXPECT_EQ(allowed, hw::get_thread_affinity());
+
+            for (auto& c: cpus) {
+                EXPECT_FALSE(c.empty());
+                EXPECT_TRUE(std::includes(allowed.begin(), allowed.end(), c.begin(), c.end()));
+                if (binding==thread_binding_kind::cores) {
+                    EXPECT_EQ(1u, c.size());
+                }
+            }
+        }
+
+        // The affinity of the calling thread is unchanged.
+        EXPECT_EQ(allowed, hw::get_thread_affinity());
+    }
+}
@@ -1,8 +1,11 @@
 #include "../gtest.h"
 
+#include <algorithm>
 #include <stdexcept>
 
+#include <arbor/arbexcept.hpp>
 #include <arbor/context.hpp>
+#include <arbor/cv_policy.hpp>
 #include <arbor/domain_decomposition.hpp>
 #include <arbor/load_balance.hpp>
 
@@ -355,3 +358,194 @@ TEST(domain_decomposition, compulsory_groups)
     EXPECT_EQ(expected_groups2, D2.groups[0].gids);
 
 }
+
+TEST(domain_decomposition, dry_run_gid_domain)
+{
+    proc_allocation resources;
+    resources.num_threads = 1;
+    resources.gpu_id = -1; // disable GPU if available
+
+    // Each rank holds a contiguous range of gids, so gid_domain needs no
+    // information about the cells on other ranks.
+    const unsigned num_ranks = 4, cells_per_rank = 10;
+    auto ctx = make_context(resources, dry_run_info(num_ranks, cells_per_rank));
+    auto R = homo_recipe(num_ranks*cells_per_rank, dummy_cell{});
+
+    auto cost = [](cell_gid_type) { return 1.; };
+
+    for (const auto& D: {partition_load_balance(R, ctx), partition_load_balance_weighted(R, ctx, cost)}) {
+        EXPECT_EQ(int(num_ranks), D.num_domains);
+        EXPECT_EQ(cells_per_rank, D.num_local_cells);
+        for (auto gid: make_span(num_ranks*cells_per_rank)) {
+            EXPECT_EQ(int(gid/cells_per_rank), D.gid_domain(gid));
+        }
+    }
+}
+
+TEST(domain_decomposition, weighted_groups)
+{
+    proc_allocation resources;
+    resources.num_threads = 1;
+    resources.gpu_id = -1; // disable GPU if available
+    auto ctx = make_context(resources);
+
+    partition_hint_map hints;
+    hints[cell_kind::cable].cpu_group_size = 4;
+    hints[cell_kind::cable].prefer_gpu = false;
+
+    // One expensive cell: it is given a group of its own, and the remaining
+    // cells are shared over the other groups.
+    auto cost = [](cell_gid_type gid) { return gid==0? 6.: 1.; };
+    const auto D = partition_load_balance_weighted(homo_recipe(12, dummy_cell{}), ctx, cost, hints);
+
+    EXPECT_EQ(1, D.num_domains);
+    EXPECT_EQ(0, D.domain_id);
+    EXPECT_EQ(12u, D.num_local_cells);
+    EXPECT_EQ(12u, D.num_global_cells);
+
+    std::vector<std::vector<cell_gid_type>> expected_groups =
+        { {0}, {1, 3, 5, 7, 9, 11}, {2, 4, 6, 8, 10} };
+
+    ASSERT_EQ(expected_groups.size(), D.groups.size());
+    for (unsigned i = 0; i < expected_groups.size(); ++i) {
+        EXPECT_EQ(cell_kind::cable, D.groups[i].kind);
+        EXPECT_EQ(backend_kind::multicore, D.groups[i].backend);
+        EXPECT_EQ(expected_groups[i], D.groups[i].gids);
+    }
+    for (auto gid: make_span(12)) {
+        EXPECT_EQ(0, D.gid_domain(gid));
+    }
+
+    // With equal costs the cells are dealt round-robin over the groups.
+    const auto E = partition_load_balance_weighted(homo_recipe(6, dummy_cell{}), ctx, [](cell_gid_type) { return 1.; }, hints);
+    expected_groups = { {0, 2, 4}, {1, 3, 5} };
+
+    ASSERT_EQ(expected_groups.size(), E.groups.size());
+    for (unsigned i = 0; i < expected_groups.size(); ++i) {
+        EXPECT_EQ(expected_groups[i], E.groups[i].gids);
+    }
+
+    // Costs must be non-negative.
+    EXPECT_THROW(partition_load_balance_weighted(homo_recipe(6, dummy_cell{}), ctx, [](cell_gid_type) { return -1.; }, hints), arbor_exception);
+}
+
+TEST(domain_decomposition, weighted_compulsory_groups)
+{
+    proc_allocation resources;
+    resources.num_threads = 1;
+    resources.gpu_id = -1; // disable GPU if available
+    auto ctx = make_context(resources);
+
+    partition_hint_map hints;
+    hints[cell_kind::cable].cpu_group_size = 3;
+    hints[cell_kind::cable].prefer_gpu = false;
+
+    auto R = gap_recipe();
+    const auto D = partition_load_balance_weighted(R, ctx, [](cell_gid_type) { return 1.; }, hints);
+
+    // Each group holds 3 cells on average, and cells connected by gap
+    // junctions are in the same group.
+    EXPECT_EQ(5u, D.groups.size());
+
+    std::vector<std::vector<cell_gid_type>> super_cells = { {0, 13}, {2, 7, 11}, {3, 4, 8, 9} };
+    std::vector<int> seen(R.num_cells(), 0);
+    for (auto& g: D.groups) {
+        for (auto gid: g.gids) ++seen[gid];
+        for (auto& sc: super_cells) {
+            auto it = std::search(g.gids.begin(), g.gids.end(), sc.begin(), sc.end());
+            EXPECT_TRUE(it!=g.gids.end() || std::find(g.gids.begin(), g.gids.end(), sc.front())==g.gids.end());
+        }
+    }
+    EXPECT_EQ(std::vector<int>(R.num_cells(), 1), seen);
+}
+
+TEST(domain_decomposition, estimate_cell_cost)
+{
+    // Cable cells with a single branch with 10 CVs, hh painted on the
+    // soma, and a given number of synapses.
+    struct cost_recipe: public recipe {
+        cell_size_type num_cells() const override { return 4; }
+
+        util::unique_any get_cell_description(cell_gid_type gid) const override {
+            if (gid==3) return {};
+            auto c = make_cell_soma_only(false);
+            c.decorations.set_default(cv_policy_fixed_per_branch(10));
+            for (auto i: make_span(gid)) {
+                c.decorations.place(mlocation{0, 0.1*i}, "expsyn");
+            }
+            return cable_cell(c);
+        }
+
+        cell_kind get_cell_kind(cell_gid_type gid) const override {
+            return gid==3? cell_kind::spike_source: cell_kind::cable;
+        }
+    };
+
+    cost_recipe R;
+    double c0 = estimate_cell_cost(R, 0);
+    EXPECT_EQ(20., c0);
+    EXPECT_EQ(c0+1, estimate_cell_cost(R, 1));
+    EXPECT_EQ(c0+2, estimate_cell_cost(R, 2));
+    EXPECT_EQ(1., estimate_cell_cost(R, 3));
+}
+
+TEST(domain_decomposition, graph_groups)
+{
+    proc_allocation resources;
+    resources.num_threads = 1;
+    resources.gpu_id = -1; // disable GPU if available
+    auto ctx = make_context(resources);
+
+    partition_hint_map hints;
+    hints[cell_kind::cable].cpu_group_size = 3;
+    hints[cell_kind::cable].prefer_gpu = false;
+
+    // On a single domain all cells are local, and are packed into groups
+    // as by partition_load_balance_weighted.
+    auto R = gap_recipe();
+    auto cost = [](cell_gid_type) { return 1.; };
+    const auto D = partition_load_balance_graph(R, ctx, cost, hints);
+    const auto W = partition_load_balance_weighted(R, ctx, cost, hints);
+
+    EXPECT_EQ(1, D.num_domains);
+    EXPECT_EQ(15u, D.num_local_cells);
+    EXPECT_EQ(15u, D.num_global_cells);
+    ASSERT_EQ(W.groups.size(), D.groups.size());
+    for (unsigned i = 0; i < D.groups.size(); ++i) {
+        EXPECT_EQ(W.groups[i].gids, D.groups[i].gids);
+    }
+    for (auto gid: make_span(15)) {
+        EXPECT_EQ(0, D.gid_domain(gid));
+    }
+    EXPECT_THROW(D.gid_domain(15), std::out_of_range);
+
+    EXPECT_THROW(partition_load_balance_graph(R, ctx, [](cell_gid_type) { return -1.; }, hints), arbor_exception);
+}
+
+TEST(domain_decomposition, measured_cell_cost)
+{
+    proc_allocation resources;
+    resources.num_threads = 1;
+    resources.gpu_id = -1; // disable GPU if available
+    auto ctx = make_context(resources);
+
+    partition_hint_map hints;
+    hints[cell_kind::cable].cpu_group_size = 2;
+    hints[cell_kind::cable].prefer_gpu = false;
+
+    const auto D = partition_load_balance(homo_recipe(6, dummy_cell{}), ctx, hints);
+    ASSERT_EQ(3u, D.groups.size());
+
+    auto cost = measured_cell_cost(D, {4., 2., 0.}, ctx);
+    EXPECT_EQ(2., cost(0));
+    EXPECT_EQ(2., cost(1));
+    EXPECT_EQ(1., cost(2));
+    EXPECT_EQ(1., cost(3));
+    EXPECT_EQ(0., cost(4));
+    EXPECT_EQ(0., cost(5));
+
+    // Cells that are not in the decomposition have the mean cost.
+    EXPECT_EQ(1., cost(6));
+
+    EXPECT_THROW(measured_cell_cost(D, {1., 2.}, ctx), arbor_exception);
+}
@@ -56,6 +56,25 @@ TEST(dry_run_context, sum)
     EXPECT_EQ(unsigned(42 * num_ranks), ctx->sum(42u));
 }
 
+TEST(dry_run_context, gather_all)
+{
+    distributed_context_handle ctx = arb::make_dry_run_context(num_ranks, num_cells_per_rank);
+
+    EXPECT_EQ(std::vector<double>(num_ranks, 42.), ctx->gather_all(42.));
+    EXPECT_EQ(std::vector<unsigned>(num_ranks, 42u), ctx->gather_all(42u));
+
+    std::vector<double> values = {1., 2., 3.};
+    auto gathered = ctx->gather_all(values);
+    ASSERT_EQ(num_ranks*3, gathered.values().size());
+    ASSERT_EQ(num_ranks+1, gathered.partition().size());
+    for (unsigned i = 0; i < num_ranks; i++) {
+        EXPECT_EQ(3*i, gathered.partition()[i]);
+        for (unsigned j = 0; j < 3; j++) {
+            EXPECT_EQ(values[j], gathered.values()[3*i+j]);
+        }
+    }
+}
+
 TEST(dry_run_context, gather_spikes)
 {
     distributed_context_handle ctx = arb::make_dry_run_context(4, 4);
@@ -117,3 +136,64 @@ TEST(dry_run_context, gather_gids)
     EXPECT_EQ(part[3], gids.size()*3);
     EXPECT_EQ(part[4], gids.size()*4);
 }
+
+TEST(dry_run_context, all_to_all_gids)
+{
+    distributed_context_handle ctx = arb::make_dry_run_context(4, 4);
+    using gvec = std::vector<arb::cell_gid_type>;
+
+    // Rank 0 sends {1} to itself, {5, 6} to rank 1, nothing to rank 2
+    // and {14} to rank 3.
+    gvec gids = {1, 5, 6, 14};
+    std::vector<unsigned> send_part = {0, 1, 3, 3, 4};
+
+    // Every rank j sends the same, shifted by j tiles, so rank 0 receives
+    // from rank j what it sends to rank (4-j)%4, shifted by j tiles.
+    gvec received_gids = {1, 2, 1, 2};
+    std::vector<unsigned> received_part = {0, 1, 2, 2, 4};
+
+    auto s = ctx->all_to_all_gids(gids, send_part);
+
+    EXPECT_EQ(s.values(), received_gids);
+    EXPECT_EQ(s.partition(), received_part);
+}
+
+TEST(dry_run_context, all_to_all)
+{
+    distributed_context_handle ctx = arb::make_dry_run_context(4, 4);
+
+    // As for all_to_all_gids, but the values are not shifted.
+    std::vector<double> values = {1., 5., 6., 14.};
+    std::vector<unsigned> send_part = {0, 1, 3, 3, 4};
+
+    auto s = ctx->all_to_all(values, send_part);
+
+    EXPECT_EQ(s.values(), (std::vector<double>{1., 14., 5., 6.}));
+    EXPECT_EQ(s.partition(), (std::vector<unsigned>{0, 1, 2, 2, 4}));
+}
+
+TEST(dry_run_context, all_to_all_spikes)
+{
+    distributed_context_handle ctx = arb::make_dry_run_context(4, 4);
+    using svec = std::vector<arb::spike>;
+
+    // Spikes from gid 0 are sent to ranks 1 and 2, spikes from gid 3 to rank 1.
+    svec spikes = {
+        {{0u,0u}, 1.f},
+        {{3u,1u}, 2.f},
+        {{0u,0u}, 1.f},
+    };
+    std::vector<unsigned> send_part = {0, 0, 2, 3, 3};
+
+    svec received_spikes = {
+        {{8u,0u}, 1.f},
+        {{12u,0u}, 1.f},
+        {{15u,1u}, 2.f},
+    };
+    std::vector<unsigned> received_part = {0, 0, 0, 1, 3};
+
+    auto s = ctx->all_to_all_spikes(spikes, send_part);
+
+    EXPECT_EQ(s.values(), received_spikes);
+    EXPECT_EQ(s.partition(), received_part);
+}
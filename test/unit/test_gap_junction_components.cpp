@@ -0,0 +1,95 @@
+#include "../gtest.h"
+
+#include <utility>
+#include <vector>
+
+#include <arbor/arbexcept.hpp>
+#include <arbor/recipe.hpp>
+
+#include "gap_junction_components.hpp"
+#include "threading/threading.hpp"
+
+using namespace arb;
+
+namespace {
+    // Cells connected by gap junctions between the given pairs of gids.
+    class gj_pair_recipe: public recipe {
+    public:
+        gj_pair_recipe(cell_size_type n, std::vector<std::pair<cell_gid_type, cell_gid_type>> pairs):
+            n_(n), pairs_(std::move(pairs)) {}
+
+        cell_size_type num_cells() const override { return n_; }
+        util::unique_any get_cell_description(cell_gid_type) const override { return {}; }
+        cell_kind get_cell_kind(cell_gid_type) const override { return cell_kind::cable; }
+
+        std::vector<gap_junction_connection> gap_junctions_on(cell_gid_type gid) const override {
+            std::vector<gap_junction_connection> conns;
+            for (auto [a, b]: pairs_) {
+                if (a==gid) conns.push_back(gap_junction_connection({a, 0}, {b, 0}, 0.1));
+                if (b==gid) conns.push_back(gap_junction_connection({b, 0}, {a, 0}, 0.1));
+            }
+            return conns;
+        }
+
+    private:
+        cell_size_type n_;
+        std::vector<std::pair<cell_gid_type, cell_gid_type>> pairs_;
+    };
+
+    struct bad_gid_recipe: gj_pair_recipe {
+        bad_gid_recipe(): gj_pair_recipe(3, {}) {}
+
+        std::vector<gap_junction_connection> gap_junctions_on(cell_gid_type gid) const override {
+            if (gid==1) return {gap_junction_connection({0, 0}, {2, 0}, 0.1)};
+            return {};
+        }
+    };
+}
+
+TEST(gap_junction_components, closed) {
+    task_system_handle ts(new threading::task_system(4));
+
+    // Components {0, 3, 5}, {1}, {2, 4} and {6}.
+    auto rec = gj_pair_recipe(7, {{0, 3}, {5, 3}, {4, 2}, {5, 0}});
+    std::vector<cell_gid_type> gids = {6, 0, 1, 2, 3, 4, 5};
+
+    auto gj = find_gap_junction_components(rec, gids, true, ts);
+    EXPECT_EQ(gids, gj.gids);
+    EXPECT_EQ(4u, gj.num_components);
+    EXPECT_EQ((std::vector<unsigned>{0, 1, 2, 3, 1, 3, 1}), gj.component);
+
+    ASSERT_EQ(gids.size(), gj.gap_junctions.size());
+    EXPECT_EQ(0u, gj.gap_junctions[0].size());
+    EXPECT_EQ(2u, gj.gap_junctions[1].size());
+    EXPECT_EQ(1u, gj.gap_junctions[3].size());
+
+    // A gap junction to a cell that is not in the set.
+    EXPECT_THROW(find_gap_junction_components(rec, {0, 1, 3}, true, ts), gj_unsupported_domain_decomposition);
+    EXPECT_THROW(find_gap_junction_components(bad_gid_recipe(), {0, 1, 2}, true, ts), bad_gj_connection_gid);
+}
+
+TEST(gap_junction_components, open) {
+    task_system_handle ts(new threading::task_system(4));
+
+    // A chain 2-8-5-9-1, which is reached from cell 2 in four steps.
+    auto rec = gj_pair_recipe(10, {{2, 8}, {8, 5}, {5, 9}, {9, 1}, {3, 4}});
+
+    auto gj = find_gap_junction_components(rec, {2, 3}, false, ts);
+    EXPECT_EQ((std::vector<cell_gid_type>{2, 3, 4, 8, 5, 9, 1}), gj.gids);
+    EXPECT_EQ(2u, gj.num_components);
+    EXPECT_EQ((std::vector<unsigned>{0, 1, 1, 0, 0, 0, 0}), gj.component);
+
+    // Cells without gap junctions form components of their own.
+    gj = find_gap_junction_components(rec, {0, 6, 7}, false, ts);
+    EXPECT_EQ((std::vector<cell_gid_type>{0, 6, 7}), gj.gids);
+    EXPECT_EQ(3u, gj.num_components);
+
+    // A large ring, which is found from a single cell.
+    const unsigned n = 1000;
+    std::vector<std::pair<cell_gid_type, cell_gid_type>> ring;
+    for (unsigned i = 0; i<n; ++i) ring.push_back({i, (i+1)%n});
+    gj = find_gap_junction_components(gj_pair_recipe(n, ring), {500}, false, ts);
+    EXPECT_EQ(n, gj.gids.size());
+    EXPECT_EQ(1u, gj.num_components);
+    EXPECT_EQ(std::vector<unsigned>(n, 0), gj.component);
+}
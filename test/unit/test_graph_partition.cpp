@@ -0,0 +1,139 @@
+#include "../gtest.h"
+
+#include <algorithm>
+#include <utility>
+#include <vector>
+
+#include "graph_partition.hpp"
+
+using namespace arb;
+
+namespace {
+    using edge_list = std::vector<std::pair<unsigned, unsigned>>;
+
+    std::vector<double> part_weights(const weighted_graph& g, const std::vector<unsigned>& part, unsigned num_parts) {
+        std::vector<double> w(num_parts, 0.);
+        for (unsigned v = 0; v<g.num_vertices(); ++v) {
+            w[part.at(v)] += g.vertex_weights[v];
+        }
+        return w;
+    }
+
+    // num_modules modules of module_size vertices each, where vertex v is in
+    // module v%num_modules. The vertices of each module form a ring in
+    // scrambled order, in which every vertex is connected to the next three,
+    // and consecutive modules are connected by a single edge.
+    edge_list modular_edges(unsigned num_modules, unsigned module_size) {
+        edge_list edges;
+        for (unsigned m = 0; m<num_modules; ++m) {
+            auto vertex = [&](unsigned i) { return (i*97%module_size)*num_modules + m; };
+            for (unsigned i = 0; i<module_size; ++i) {
+                for (unsigned j = 1; j<=3; ++j) {
+                    edges.push_back({vertex(i), vertex(i+j)});
+                }
+            }
+            edges.push_back({m, (m+1)%num_modules});
+        }
+        return edges;
+    }
+}
+
+TEST(graph_partition, make_weighted_graph) {
+    auto g = make_weighted_graph({1., 2., 3.}, {{0, 1}, {1, 0}, {1, 2}, {2, 2}});
+
+    EXPECT_EQ(3u, g.num_vertices());
+    EXPECT_EQ((std::vector<double>{1., 2., 3.}), g.vertex_weights);
+    EXPECT_EQ((std::vector<std::size_t>{0, 1, 3, 4}), g.offsets);
+    EXPECT_EQ((std::vector<unsigned>{1, 0, 2, 1}), g.adjacency);
+    EXPECT_EQ((std::vector<double>{2., 2., 1., 1.}), g.edge_weights);
+
+    EXPECT_EQ(0., edge_cut(g, {0, 0, 0}));
+    EXPECT_EQ(2., edge_cut(g, {0, 1, 1}));
+    EXPECT_EQ(3., edge_cut(g, {0, 1, 0}));
+}
+
+TEST(graph_partition, trivial) {
+    auto g = make_weighted_graph(std::vector<double>(5, 1.), {{0, 1}, {2, 3}});
+
+    EXPECT_EQ(std::vector<unsigned>(5, 0), partition_graph(g, 1));
+    EXPECT_TRUE(partition_graph(make_weighted_graph({}, {}), 4).empty());
+
+    // More parts than vertices.
+    auto part = partition_graph(g, 8);
+    ASSERT_EQ(5u, part.size());
+    for (auto p: part) EXPECT_LT(p, 8u);
+}
+
+TEST(graph_partition, two_cliques) {
+    // Two cliques of 8 vertices, with interleaved vertex indices, connected
+    // by a single edge.
+    edge_list edges;
+    for (unsigned u = 0; u<16; ++u) {
+        for (unsigned v = u+2; v<16; v += 2) {
+            edges.push_back({u, v});
+        }
+    }
+    edges.push_back({0, 1});
+    auto g = make_weighted_graph(std::vector<double>(16, 1.), edges);
+
+    auto part = partition_graph(g, 2);
+    EXPECT_EQ(1., edge_cut(g, part));
+    EXPECT_EQ((std::vector<double>{8., 8.}), part_weights(g, part, 2));
+    for (unsigned v = 2; v<16; ++v) {
+        EXPECT_EQ(part[v%2], part[v]);
+    }
+}
+
+TEST(graph_partition, modular) {
+    const unsigned num_modules = 8;
+    const unsigned module_size = 250;
+    const unsigned n = num_modules*module_size;
+    const auto edges = modular_edges(num_modules, module_size);
+    auto g = make_weighted_graph(std::vector<double>(n, 1.), edges);
+
+    for (unsigned num_parts: {2u, 4u, 8u}) {
+        auto part = partition_graph(g, num_parts);
+        ASSERT_EQ(n, part.size());
+
+        // The cut of the partition into contiguous ranges of vertices.
+        std::vector<unsigned> block(n);
+        for (unsigned v = 0; v<n; ++v) block[v] = v*num_parts/n;
+
+        // Only the edges between modules need to be cut.
+        EXPECT_LE(edge_cut(g, part), num_modules);
+        EXPECT_LT(edge_cut(g, part), edge_cut(g, block)/100);
+
+        auto w = part_weights(g, part, num_parts);
+        EXPECT_LE(*std::max_element(w.begin(), w.end()), 1.03*n/num_parts);
+    }
+}
+
+TEST(graph_partition, balance) {
+    // A path of 100 vertices, with increasing weights.
+    const unsigned n = 100;
+    std::vector<double> weights;
+    edge_list edges;
+    double total = 0;
+    for (unsigned v = 0; v<n; ++v) {
+        weights.push_back(v+1);
+        total += v+1;
+        if (v) edges.push_back({v-1, v});
+    }
+    auto g = make_weighted_graph(weights, edges);
+
+    const unsigned num_parts = 5;
+    auto part = partition_graph(g, num_parts);
+    auto w = part_weights(g, part, num_parts);
+    for (auto x: w) {
+        EXPECT_LE(x, 1.05*total/num_parts);
+        EXPECT_GT(x, 0.);
+    }
+
+    // A single vertex heavier than the average part.
+    weights[0] = total;
+    auto h = make_weighted_graph(weights, edges);
+    part = partition_graph(h, num_parts);
+    for (unsigned v = 1; v<n; ++v) {
+        EXPECT_NE(part[0], part[v]);
+    }
+}
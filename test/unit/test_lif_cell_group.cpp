@@ -11,6 +11,8 @@
 #include <arbor/spike_source_cell.hpp>
 
 #include "lif_cell_group.hpp"
+#include "util/rangeutil.hpp"
+#include "util/span.hpp"
 
 using namespace arb;
 // Simple ring network of LIF neurons.
@@ -243,3 +245,118 @@ TEST(lif_cell_group, ring)
     }
 }
 
+TEST(lif_cell_group, ring_exchange_depth)
+{
+    auto context = make_context();
+    auto recipe = ring_recipe(99, 1000, 1);
+    auto decomp = partition_load_balance(recipe, context);
+
+    auto run_ring = [&](unsigned depth) {
+        simulation sim(recipe, decomp, context);
+        sim.set_spike_exchange_depth(depth);
+
+        std::vector<spike> spike_buffer;
+        sim.set_global_spike_callback(
+            [&spike_buffer](const std::vector<spike>& spikes) {
+                spike_buffer.insert(spike_buffer.end(), spikes.begin(), spikes.end());
+            }
+        );
+
+        // Events in flight at the end of the first run are delivered in the second.
+        sim.run(50, 0.01);
+        sim.run(100, 0.01);
+        EXPECT_EQ(spike_buffer.size(), sim.num_spikes());
+
+        util::sort_by(spike_buffer, [](const spike& s) { return s.source; });
+        return spike_buffer;
+    };
+
+    auto expected = run_ring(1);
+    EXPECT_EQ(100u, expected.size());
+    EXPECT_EQ(expected, run_ring(2));
+    EXPECT_EQ(expected, run_ring(4));
+
+    simulation sim(recipe, decomp, context);
+    EXPECT_THROW(sim.set_spike_exchange_depth(0), arbor_exception);
+}
+
+TEST(lif_cell_group, group_advance_times)
+{
+    auto context = make_context(proc_allocation(2, -1));
+    auto recipe = ring_recipe(99, 1000, 1);
+    partition_hint_map hints = {{cell_kind::lif, partition_hint{10}}};
+    auto decomp = partition_load_balance(recipe, context, hints);
+    simulation sim(recipe, decomp, context);
+
+    auto times = sim.group_advance_times();
+    ASSERT_EQ(decomp.groups.size(), times.size());
+    for (auto t: times) EXPECT_EQ(0., t);
+
+    sim.run(100, 0.01);
+    times = sim.group_advance_times();
+    ASSERT_EQ(decomp.groups.size(), times.size());
+    for (auto t: times) EXPECT_LT(0., t);
+
+    // Scheduling the groups by their advance times does not change the result.
+    sim.run(200, 0.01);
+    auto more_times = sim.group_advance_times();
+    for (auto i: util::count_along(times)) EXPECT_LE(times[i], more_times[i]);
+    EXPECT_EQ(200u, sim.num_spikes());
+
+    sim.reset();
+    for (auto t: sim.group_advance_times()) EXPECT_EQ(0., t);
+}
+
+TEST(lif_cell_group, measured_cell_cost)
+{
+    auto context = make_context(proc_allocation(2, -1));
+    auto recipe = ring_recipe(99, 1000, 1);
+    partition_hint_map hints = {{cell_kind::lif, partition_hint{10}}};
+    auto decomp = partition_load_balance(recipe, context, hints);
+    simulation sim(recipe, decomp, context);
+    sim.run(100, 0.01);
+
+    // Rebuild the simulation with a decomposition balanced by the measured costs.
+    auto cost = measured_cell_cost(decomp, sim.group_advance_times(), context);
+    for (auto gid: util::make_span(99)) {
+        EXPECT_LT(0., cost(gid));
+    }
+    auto balanced = partition_load_balance_weighted(recipe, context, cost, hints);
+    EXPECT_EQ(decomp.groups.size(), balanced.groups.size());
+
+    simulation balanced_sim(recipe, balanced, context);
+    balanced_sim.run(100, 0.01);
+    EXPECT_EQ(sim.num_spikes(), balanced_sim.num_spikes());
+}
+
+TEST(lif_cell_group, ring_thread_binding)
+{
+    auto recipe = ring_recipe(99, 1000, 1);
+
+    auto run_ring = [&](task_scheduler_kind scheduler, thread_binding_kind binding) {
+        auto context = make_context(proc_allocation(4, -1, scheduler, binding));
+        EXPECT_EQ(binding, thread_binding(context));
+
+        simulation sim(recipe, partition_load_balance(recipe, context), context);
+        std::vector<spike> spike_buffer;
+        sim.set_global_spike_callback(
+            [&spike_buffer](const std::vector<spike>& spikes) {
+                spike_buffer.insert(spike_buffer.end(), spikes.begin(), spikes.end());
+            }
+        );
+        // The groups are rebalanced over the threads between the runs.
+        sim.run(50, 0.01);
+        sim.run(100, 0.01);
+
+        util::sort_by(spike_buffer, [](const spike& s) { return s.source; });
+        return spike_buffer;
+    };
+
+    auto expected = run_ring(task_scheduler_kind::queue, thread_binding_kind::none);
+    EXPECT_EQ(100u, expected.size());
+    for (auto scheduler: {task_scheduler_kind::queue, task_scheduler_kind::work_stealing}) {
+        for (auto binding: {thread_binding_kind::none, thread_binding_kind::cores, thread_binding_kind::numa}) {
+            EXPECT_EQ(expected, run_ring(scheduler, binding));
+        }
+    }
+}
@@ -93,3 +93,25 @@ TEST(local_context, gather_gids)
     EXPECT_EQ(part[0], 0u);
     EXPECT_EQ(part[1], gids.size());
 }
+
+TEST(local_context, all_to_all)
+{
+    arb::local_context ctx;
+    using svec = std::vector<arb::spike>;
+    using gvec = std::vector<arb::cell_gid_type>;
+
+    svec spikes = {
+        {{0u,3u}, 42.f},
+        {{1u,2u}, 42.f},
+    };
+    auto s = ctx.all_to_all_spikes(spikes, {0u, 2u});
+
+    EXPECT_EQ(s.values(), spikes);
+    EXPECT_EQ(s.partition(), (std::vector<unsigned>{0u, 2u}));
+
+    gvec gids = {0, 1, 2, 3, 4};
+    auto g = ctx.all_to_all_gids(gids, {0u, 5u});
+
+    EXPECT_EQ(g.values(), gids);
+    EXPECT_EQ(g.partition(), (std::vector<unsigned>{0u, 5u}));
+}
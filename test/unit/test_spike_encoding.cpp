@@ -0,0 +1,102 @@
+#include "../gtest.h"
+
+#include <cmath>
+#include <vector>
+
+#include <arbor/arbexcept.hpp>
+#include <arbor/context.hpp>
+#include <arbor/spike.hpp>
+
+#include "communication/spike_encoding.hpp"
+#include "distributed_context.hpp"
+
+using namespace arb;
+
+namespace {
+std::vector<spike> round_trip(const std::vector<spike>& spikes) {
+    std::vector<char> buf;
+    encode_spikes(spikes, buf);
+
+    std::vector<spike> out;
+    auto end = decode_spikes(buf.data(), buf.data()+buf.size(), out);
+    EXPECT_EQ(buf.data()+buf.size(), end);
+    return out;
+}
+}
+
+TEST(spike_encoding, empty) {
+    std::vector<char> buf;
+    encode_spikes({}, buf);
+    EXPECT_EQ(1u, buf.size());
+
+    EXPECT_TRUE(round_trip({}).empty());
+}
+
+TEST(spike_encoding, round_trip) {
+    // Sorted and unsorted gids, large gids and indices, and times that are
+    // exactly representable as offsets from the earliest spike.
+    std::vector<spike> spikes = {
+        {{0u, 0u}, 10.5},
+        {{0u, 3u}, 10.25},
+        {{7u, 1u}, 11.},
+        {{4000000000u, 70000u}, 10.75},
+        {{2u, 0u}, 12.},
+    };
+
+    auto out = round_trip(spikes);
+    EXPECT_EQ(spikes, out);
+
+    // Sorted gids with small differences encode compactly.
+    std::vector<spike> sorted;
+    for (unsigned i = 0; i<100; ++i) {
+        sorted.push_back({{1000000u+2*i, 0u}, 5.+0.01*i});
+    }
+    std::vector<char> buf;
+    encode_spikes(sorted, buf);
+    EXPECT_LT(buf.size(), 8*sorted.size());
+}
+
+TEST(spike_encoding, rounding) {
+    // Times are rounded to single precision relative to the earliest spike.
+    std::vector<spike> spikes = {
+        {{1u, 0u}, 1000.1},
+        {{2u, 0u}, 1001.123456789},
+    };
+
+    auto out = round_trip(spikes);
+    ASSERT_EQ(2u, out.size());
+    EXPECT_EQ(spikes[0].time, out[0].time);
+    EXPECT_NEAR(spikes[1].time, out[1].time, 1e-6);
+}
+
+TEST(spike_encoding, malformed) {
+    std::vector<char> buf;
+    encode_spikes({{{1u, 0u}, 1.}, {{2u, 0u}, 2.}}, buf);
+
+    std::vector<spike> out;
+    buf.pop_back();
+    EXPECT_THROW(decode_spikes(buf.data(), buf.data()+buf.size(), out), arbor_internal_error);
+}
+
+TEST(spike_encoding, dry_run_context) {
+    auto ctx = make_dry_run_context(2, 10);
+    EXPECT_EQ(spike_encoding_kind::plain, ctx->spike_encoding());
+
+    std::vector<spike> spikes = {
+        {{1u, 0u}, 1.},
+        {{2u, 0u}, 1.123456789},
+    };
+
+    auto plain = ctx->gather_spikes(spikes);
+
+    ctx->set_spike_encoding(spike_encoding_kind::compact);
+    EXPECT_EQ(spike_encoding_kind::compact, ctx->spike_encoding());
+    auto compact = ctx->gather_spikes(spikes);
+
+    EXPECT_EQ(plain.partition(), compact.partition());
+    ASSERT_EQ(plain.size(), compact.size());
+    for (std::size_t i = 0; i<plain.size(); ++i) {
+        EXPECT_EQ(plain.values()[i].source, compact.values()[i].source);
+        EXPECT_NEAR(plain.values()[i].time, compact.values()[i].time, 1e-6);
+    }
+}
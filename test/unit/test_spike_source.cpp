@@ -1,6 +1,15 @@
 #include "../gtest.h"
 
+#include <chrono>
+#include <memory>
+#include <thread>
+#include <vector>
+
+#include <arbor/context.hpp>
+#include <arbor/load_balance.hpp>
+#include <arbor/recipe.hpp>
 #include <arbor/schedule.hpp>
+#include <arbor/simulation.hpp>
 #include <arbor/spike.hpp>
 #include <arbor/spike_source_cell.hpp>
 #include <arbor/util/unique_any.hpp>
@@ -111,3 +120,153 @@ TEST(spike_source, exhaust)
     test_seq(regular_schedule(0, 1, 5));
     test_seq(explicit_schedule({0.3, 2.3, 4.7}));
 }
+
+namespace {
+    // A schedule without events that records the thread on which it is
+    // queried, and which is slow to query if delay is positive.
+    struct thread_recording_schedule {
+        std::shared_ptr<std::vector<std::thread::id>> threads;
+        std::chrono::milliseconds delay;
+
+        time_event_span events(time_type, time_type) {
+            threads->push_back(std::this_thread::get_id());
+            std::this_thread::sleep_for(delay);
+            return {nullptr, nullptr};
+        }
+
+        void reset() {}
+    };
+
+    // Spike sources, of which the first two are slow to advance.
+    struct thread_recording_recipe: recipe {
+        std::vector<std::shared_ptr<std::vector<std::thread::id>>> threads;
+
+        explicit thread_recording_recipe(cell_size_type n) {
+            for (cell_size_type i = 0; i<n; ++i) {
+                threads.push_back(std::make_shared<std::vector<std::thread::id>>());
+            }
+        }
+
+        cell_size_type num_cells() const override { return threads.size(); }
+        cell_kind get_cell_kind(cell_gid_type) const override { return cell_kind::spike_source; }
+
+        util::unique_any get_cell_description(cell_gid_type gid) const override {
+            auto delay = std::chrono::milliseconds(gid<2? 20: 0);
+            return spike_source_cell{schedule(thread_recording_schedule{threads[gid], delay})};
+        }
+    };
+}
+
+// Test that with bound threads each cell group is advanced on the thread it
+// is assigned to, and that the slow groups are moved apart between runs.
+TEST(spike_source, thread_binding)
+{
+    for (auto scheduler: {task_scheduler_kind::queue, task_scheduler_kind::work_stealing}) {
+        proc_allocation resources(4, -1, scheduler);
+        resources.bind_threads = thread_binding_kind::cores;
+        auto context = make_context(resources);
+
+        // One cell per group, with groups assigned to threads in blocks of
+        // two, the first of them to the calling thread.
+        thread_recording_recipe rec(8);
+        simulation sim(rec, partition_load_balance(rec, context), context);
+
+        auto thread_in_run = [&](cell_gid_type gid) {
+            auto& threads = *rec.threads[gid];
+            EXPECT_FALSE(threads.empty());
+            for (auto t: threads) EXPECT_EQ(threads.front(), t);
+            auto t = threads.front();
+            threads.clear();
+            return t;
+        };
+
+        sim.run(10, 0.1);
+        std::vector<std::thread::id> first;
+        for (cell_gid_type gid = 0; gid<8; ++gid) first.push_back(thread_in_run(gid));
+        EXPECT_EQ(std::this_thread::get_id(), first[0]);
+        EXPECT_EQ(first[0], first[1]);
+        EXPECT_EQ(first[2], first[3]);
+        EXPECT_NE(first[0], first[2]);
+
+        sim.run(20, 0.1);
+        EXPECT_NE(thread_in_run(0), thread_in_run(1));
+    }
+}
+
+// Test that a simulation with bound threads can be run from a thread other
+// than the one that created the context, which then advances the groups
+// assigned to thread 0.
+TEST(spike_source, thread_binding_other_thread)
+{
+    for (auto scheduler: {task_scheduler_kind::queue, task_scheduler_kind::work_stealing}) {
+        proc_allocation resources(4, -1, scheduler);
+        resources.bind_threads = thread_binding_kind::cores;
+        auto context = make_context(resources);
+
+        thread_recording_recipe rec(8);
+        simulation sim(rec, partition_load_balance(rec, context), context);
+
+        std::thread::id runner;
+        std::thread t([&] {
+            runner = std::this_thread::get_id();
+            sim.run(10, 0.1);
+        });
+        t.join();
+
+        for (cell_gid_type gid: {0, 1}) {
+            ASSERT_FALSE(rec.threads[gid]->empty());
+            for (auto id: *rec.threads[gid]) EXPECT_EQ(runner, id);
+        }
+    }
+}
+
+namespace {
+    // A schedule without events that records the gid of its cell in a
+    // sequence shared by all cells when it is queried, and that is slow to
+    // query by a delay that depends on the gid.
+    struct order_recording_schedule {
+        std::shared_ptr<std::vector<cell_gid_type>> order;
+        cell_gid_type gid;
+        std::chrono::milliseconds delay;
+
+        time_event_span events(time_type, time_type) {
+            order->push_back(gid);
+            std::this_thread::sleep_for(delay);
+            return {nullptr, nullptr};
+        }
+
+        void reset() {}
+    };
+
+    struct order_recording_recipe: recipe {
+        std::vector<int> delays;
+        std::shared_ptr<std::vector<cell_gid_type>> order = std::make_shared<std::vector<cell_gid_type>>();
+
+        explicit order_recording_recipe(std::vector<int> delays): delays(std::move(delays)) {}
+
+        cell_size_type num_cells() const override { return delays.size(); }
+        cell_kind get_cell_kind(cell_gid_type) const override { return cell_kind::spike_source; }
+
+        util::unique_any get_cell_description(cell_gid_type gid) const override {
+            auto delay = std::chrono::milliseconds(delays[gid]);
+            return spike_source_cell{schedule(order_recording_schedule{order, gid, delay})};
+        }
+    };
+}
+
+// Test that the cell groups are started in order of their advance times,
+// longest first, once they have been advanced.
+TEST(spike_source, longest_first_order)
+{
+    // With one thread the groups are advanced in the order they are started.
+    auto context = make_context(proc_allocation(1, -1));
+    order_recording_recipe rec({2, 8, 4, 6});
+    simulation sim(rec, partition_load_balance(rec, context), context);
+
+    sim.run(10, 0.1);
+    EXPECT_EQ((std::vector<cell_gid_type>{0, 1, 2, 3}), *rec.order);
+
+    rec.order->clear();
+    sim.run(20, 0.1);
+    EXPECT_EQ((std::vector<cell_gid_type>{1, 3, 2, 0}), *rec.order);
+}
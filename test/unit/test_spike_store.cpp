@@ -114,3 +114,37 @@ TEST(spike_store, gather)
         EXPECT_EQ(spikes[i].time, gathered_spikes[i].time);
     }
 }
+
+TEST(spike_store, gather_sorted)
+{
+    using store_type = arb::thread_private_spike_store;
+
+    arb::proc_allocation resources;
+    if (auto nt = arbenv::get_env_num_threads()) {
+        resources.num_threads = nt;
+    }
+    else {
+        resources.num_threads = arbenv::thread_concurrency();
+    }
+
+    arb::execution_context context(resources);
+    store_type store(context.thread_pool);
+
+    // insert spikes in descending order of source from many tasks, so that
+    // they are spread over the thread private buffers in no particular order.
+    const int n = 100;
+    arb::threading::parallel_for::apply(0, n, context.thread_pool.get(),
+        [&](int i) {
+            arb::cell_gid_type gid = (7*i)%n;
+            store.insert({{{gid, 1}, 2.f}, {{gid, 0}, 1.f}});
+        });
+
+    auto gathered_spikes = store.gather();
+
+    ASSERT_EQ(2u*n, gathered_spikes.size());
+    for (auto i=0u; i<gathered_spikes.size(); ++i) {
+        EXPECT_EQ(i/2, gathered_spikes[i].source.gid);
+        EXPECT_EQ(i%2, gathered_spikes[i].source.index);
+        EXPECT_EQ(float(i%2+1), gathered_spikes[i].time);
+    }
+}
@@ -8,6 +8,7 @@
 
 #include "threading/threading.hpp"
 #include "threading/enumerable_thread_specific.hpp"
+#include "threading/work_stealing_deque.hpp"
 
 using namespace arb::threading::impl;
 using namespace arb::threading;
@@ -176,6 +177,35 @@ TEST(task_group, parallel_for) {
     }
 }
 
+TEST(task_group, parallel_for_grain) {
+    task_system ts(4);
+    for (int grain: {-1, 0, 1, 3, 64, 10000}) {
+        for (int n = 0; n < 1000; n=!n?1:2*n) {
+            std::vector<std::atomic<int>> v(n);
+            for (auto& x: v) x = 0;
+            parallel_for::apply(5, n+5, grain, &ts, [&](int i) {++v[i-5];});
+            for (int i = 0; i < n; i++) {
+                EXPECT_EQ(1, v[i]);
+            }
+        }
+    }
+}
+
+TEST(task_group, parallel_for_chunks) {
+    // Each task of the automatically partitioned range covers a contiguous
+    // chunk of indices, so it is run by a single thread.
+    task_system ts(4);
+    const int n = 10000;
+    std::vector<std::thread::id> ids(n);
+    parallel_for::apply(0, n, &ts, [&](int i) {ids[i] = std::this_thread::get_id();});
+
+    const int num_chunks = parallel_for::chunks_per_thread*ts.get_num_threads();
+    const int grain = (n+num_chunks-1)/num_chunks;
+    for (int i = 0; i < n; i++) {
+        EXPECT_EQ(ids[i/grain*grain], ids[i]);
+    }
+}
+
 TEST(task_group, nested_parallel_for) {
     task_system ts;
     for (int m = 1; m < 512; m*=2) {
@@ -194,6 +224,130 @@ TEST(task_group, nested_parallel_for) {
     }
 }
 
+TEST(work_stealing_deque, owner) {
+    work_stealing_deque<int*> d(2);
+    std::vector<int> v(10);
+
+    EXPECT_EQ(nullptr, d.pop());
+    EXPECT_EQ(nullptr, d.steal());
+
+    // Push more items than the initial capacity.
+    for (auto& x: v) d.push(&x);
+    EXPECT_FALSE(d.empty());
+
+    // Owner pops in LIFO order, thieves steal in FIFO order.
+    EXPECT_EQ(&v[9], d.pop());
+    EXPECT_EQ(&v[0], d.steal());
+    EXPECT_EQ(&v[1], d.steal());
+    for (int i = 8; i > 1; --i) {
+        EXPECT_EQ(&v[i], d.pop());
+    }
+    EXPECT_EQ(nullptr, d.pop());
+    EXPECT_EQ(nullptr, d.steal());
+    EXPECT_TRUE(d.empty());
+}
+
+TEST(work_stealing_deque, concurrent_steal) {
+    // Each item must be taken exactly once by either the owner or a thief.
+    const int n = 100000;
+    const int nthieves = 3;
+    std::vector<int> v(n, 0);
+    work_stealing_deque<int*> d;
+    std::atomic<bool> done{false};
+
+    std::vector<std::thread> thieves;
+    for (int t = 0; t < nthieves; ++t) {
+        thieves.emplace_back([&] {
+            while (!done || !d.empty()) {
+                if (int* x = d.steal()) ++*x;
+            }
+        });
+    }
+
+    for (int i = 0; i < n; ++i) {
+        d.push(&v[i]);
+        if (i%3==0) {
+            if (int* x = d.pop()) ++*x;
+        }
+    }
+    while (int* x = d.pop()) ++*x;
+    done = true;
+    for (auto& t: thieves) t.join();
+
+    for (int i = 0; i < n; ++i) {
+        EXPECT_EQ(1, v[i]);
+    }
+}
+
+TEST(task_system, work_stealing) {
+    task_system ts(4, task_scheduler_kind::work_stealing);
+    EXPECT_EQ(task_scheduler_kind::work_stealing, ts.scheduler());
+    EXPECT_EQ(4, ts.get_num_threads());
+
+    {
+        // Simple check for deadlock.
+        task_group g(&ts);
+        ftor_wait f;
+        for (int i = 0; i < 32 * ts.get_num_threads(); i++) {
+            g.run(f);
+        }
+        g.wait();
+    }
+
+    for (int m = 1; m < 512; m*=4) {
+        for (int n = 0; n < 1000; n=!n?1:2*n) {
+            std::vector<std::vector<int>> v(n, std::vector<int>(m, -1));
+            parallel_for::apply(0, n, &ts, [&](int i) {
+                auto &w = v[i];
+                parallel_for::apply(0, m, &ts, [&](int j) { w[j] = i + j; });
+            });
+            for (int i = 0; i < n; i++) {
+                for (int j = 0; j < m; j++) {
+                    EXPECT_EQ(i + j, v[i][j]);
+                }
+            }
+        }
+    }
+}
+
+TEST(task_system, work_stealing_external_thread) {
+    // Tasks submitted from a thread outside the pool are run too.
+    task_system ts(3, task_scheduler_kind::work_stealing);
+    std::atomic<int> count{0};
+
+    std::thread outside([&] {
+        parallel_for::apply(0, 1000, &ts, [&](int) { ++count; });
+    });
+    outside.join();
+
+    EXPECT_EQ(1000, count);
+}
+
+TEST(task_group, bound_tasks) {
+    // Tasks run for a given thread run on that thread only, while other
+    // threads are idle or busy with unbound tasks.
+    for (auto scheduler: {task_scheduler_kind::queue, task_scheduler_kind::work_stealing}) {
+        task_system ts(4, scheduler);
+        auto ids = ts.get_thread_ids();
+        const int n = 64;
+        std::vector<int> ran_on(n, -1);
+
+        task_group g(&ts);
+        for (int i = 0; i < n; i++) {
+            g.run([&, i] {
+                std::this_thread::sleep_for(std::chrono::microseconds(100));
+                ran_on[i] = ids.at(std::this_thread::get_id());
+            }, i);
+            g.run(ftor_wait());
+        }
+        g.wait();
+
+        for (int i = 0; i < n; i++) {
+            EXPECT_EQ(i % ts.get_num_threads(), ran_on[i]);
+        }
+    }
+}
+
 TEST(enumerable_thread_specific, test) {
     task_system_handle ts = task_system_handle(new task_system);
     enumerable_thread_specific<int> buffers(ts);